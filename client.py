@@ -8,6 +8,7 @@ import wave
 import asyncio
 from pathlib import Path
 import argparse
+from urllib.parse import quote
 
 import numpy as np
 import websockets
@@ -19,10 +20,13 @@ from pipecat.serializers.protobuf import ProtobufFrameSerializer
 
 
 class WAVClient:
-    def __init__(self, server_url: str = "ws://localhost:8100/ws"):
+    def __init__(
+        self, server_url: str = "ws://localhost:8100/ws", vehicle_token: str | None = None
+    ):
         self.server_url = server_url
         self.websocket = None
         self.stream_id = str(uuid.uuid4())
+        self.vehicle_token = vehicle_token
         self.serializer = ProtobufFrameSerializer()
         self.clock = SystemClock()
         self.task_manager = TaskManager()
@@ -43,6 +47,9 @@ class WAVClient:
 
             # Use stream_id in the URL path
             websocket_url = f"{self.server_url}/{self.stream_id}"
+            if self.vehicle_token:
+                # AC settings of a vehicle with a signed token outlive the connection
+                websocket_url += f"?vehicle_token={quote(self.vehicle_token)}"
             print(f"Attempting to connect to {websocket_url} with headers: {headers}")
 
             self.websocket = await websockets.connect(
@@ -326,6 +333,11 @@ async def main() -> None:
         default="ws://localhost:8100/ws",
         help="WebSocket server URL (default: ws://localhost:8100/ws)",
     )
+    parser.add_argument(
+        "--vehicle-token",
+        help="Signed token of the vehicle whose AC settings to use, see POST"
+        " /api/vehicles/token. A fresh vehicle for this run if omitted",
+    )
 
     args = parser.parse_args()
 
@@ -333,7 +345,7 @@ async def main() -> None:
         print("Usage: python wav_client.py <wav_file_path>")
         sys.exit(1)
 
-    client = WAVClient(args.server)
+    client = WAVClient(args.server, vehicle_token=args.vehicle_token)
     await client.process_wav_file(args.wav_file)
 
 
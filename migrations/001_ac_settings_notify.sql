@@ -0,0 +1,14 @@
+-- Publish every change of ac_settings on the `ac_settings_changed` channel so that
+-- ACSettingsCache (src/llm/state.py) can follow writes made outside this process.
+
+CREATE OR REPLACE FUNCTION notify_ac_settings_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('ac_settings_changed', row_to_json(NEW)::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS ac_settings_changed ON ac_settings;
+CREATE TRIGGER ac_settings_changed
+    AFTER INSERT OR UPDATE ON ac_settings
+    FOR EACH ROW EXECUTE FUNCTION notify_ac_settings_changed();
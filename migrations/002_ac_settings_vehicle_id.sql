@@ -0,0 +1,10 @@
+-- Give every vehicle (stream) its own ac_settings row instead of one global row.
+-- The existing row becomes the `default` vehicle, new vehicles are seeded from it
+-- by ACSettingsCache (src/llm/state.py) on first use.
+
+ALTER TABLE ac_settings ADD COLUMN IF NOT EXISTS vehicle_id TEXT;
+UPDATE ac_settings SET vehicle_id = 'default' WHERE vehicle_id IS NULL;
+ALTER TABLE ac_settings ALTER COLUMN vehicle_id SET NOT NULL;
+
+-- Backs the per-vehicle lookups and the ON CONFLICT of the seeding INSERT
+CREATE UNIQUE INDEX IF NOT EXISTS ac_settings_vehicle_id_idx ON ac_settings (vehicle_id);
@@ -0,0 +1,7 @@
+-- Track when each ac_settings row was last written or used, so that stream-scoped rows
+-- left behind by a process that died are swept by ACSettingsCache (src/llm/state.py).
+
+ALTER TABLE ac_settings ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+-- Backs the sweep of idle stream-scoped rows
+CREATE INDEX IF NOT EXISTS ac_settings_updated_at_idx ON ac_settings (updated_at);
@@ -0,0 +1,92 @@
+"""Compare the compiled intent matcher with the substring scans it replaced.
+
+Checks the primary intent of every labelled utterance, shows where the two matchers
+disagree and times both. Exits with status 1 when the compiled matcher gets any
+utterance wrong, so it doubles as the accuracy check.
+
+    python scripts/benchmark_intent_matcher.py --repeat 2000
+"""
+
+import sys
+import timeit
+import argparse
+
+from src.llm.intent import INTENT_KEYWORDS, match_intent
+
+# Keyword lists as FillerProcessor scanned them, " ac " relied on surrounding spaces
+LEGACY_KEYWORDS = {
+    **INTENT_KEYWORDS,
+    "temperature": tuple(
+        " ac " if word == "ac" else word for word in INTENT_KEYWORDS["temperature"]
+    ),
+}
+
+LABELLED_UTTERANCES = [
+    ("Set the temperature to 22", "temperature"),
+    ("It's really hot in here", "temperature"),
+    ("I'm cold", "temperature"),
+    ("Turn on the AC please", "temperature"),
+    ("Make it a little warmer", "temperature"),
+    ("Can you turn the heating up", "temperature"),
+    ("Turn on the air conditioning", "temperature"),
+    ("Is the A/C on?", "temperature"),
+    ("Set the fan speed to 3", "fan"),
+    ("Turn the fans off", "fan"),
+    ("More airflow please", "fan"),
+    ("It's blowing too hard", "fan"),
+    ("Turn on the defroster", "defrost"),
+    ("The windshield is fogged up", "defrost"),
+    ("I can't see out the windows", "defrost"),
+    ("Navigate to the nearest gas station", "navigation"),
+    ("Show me the route home", "navigation"),
+    ("Get me directions to the airport", "navigation"),
+    # Substring scans matched these inside longer words
+    ("Move my chair back", None),
+    ("That's a nice song", None),
+    ("I want to attempt a different road", None),
+    ("Call my mom", None),
+    ("Play some jazz", None),
+    ("What's the weather tomorrow", None),
+    ("Thanks, that's great", None),
+]
+
+
+def legacy_intent(text: str) -> str | None:
+    text_lower = text.lower()
+    for intent, keywords in LEGACY_KEYWORDS.items():
+        if any(word in text_lower for word in keywords):
+            return intent
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000, help="Passes over the corpus.")
+    args = parser.parse_args()
+
+    texts = [text for text, _ in LABELLED_UTTERANCES]
+    compiled_correct = legacy_correct = 0
+    for text, expected in LABELLED_UTTERANCES:
+        match = match_intent(text)
+        legacy = legacy_intent(text)
+        compiled_correct += match.intent == expected
+        legacy_correct += legacy == expected
+        if match.intent != expected or legacy != expected:
+            spans = [text[start:end] for _, start, end in match.spans]
+            print(
+                f"{'✅' if match.intent == expected else '❌'} {text!r}: expected {expected},"
+                f" compiled {match.intent} {spans}, legacy {legacy}"
+            )
+
+    count = len(LABELLED_UTTERANCES)
+    compiled_time = timeit.timeit(lambda: [match_intent(t) for t in texts], number=args.repeat)
+    legacy_time = timeit.timeit(lambda: [legacy_intent(t) for t in texts], number=args.repeat)
+    calls = count * args.repeat
+    print(f"🎯 Accuracy: compiled {compiled_correct}/{count}, legacy {legacy_correct}/{count}")
+    print(f"⏱️  Compiled: {compiled_time / calls * 1e6:.2f} us per utterance")
+    print(f"⏱️  Legacy:   {legacy_time / calls * 1e6:.2f} us per utterance")
+    sys.exit(0 if compiled_correct == count else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Time the streaming polyphase resampler per audio chunk, as the /tts output path uses it.
+
+Resamples a second of synthetic 16 kHz speech-band audio to each target rate in chunks of
+the given durations and prints the CPU cost per chunk, with and without the conversion to
+float32, and the share of real time it takes. Exits with status 1 when the chunked output
+differs from resampling the same audio in one piece, i.e. when state is lost at a chunk
+boundary, so it doubles as a continuity check.
+
+    python scripts/benchmark_resampler.py --rates 24000 44100 48000 --chunk-ms 20 40 100
+"""
+
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from src.tts.resample import PolyphaseResampler, pcm16_to_float32
+
+INPUT_RATE = 16000
+REPEATS = 20
+
+
+def make_audio(seconds: float = 1.0, seed: int = 0) -> bytes:
+    """Harmonics of a gliding pitch with noise, a rough stand-in for a voice."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(INPUT_RATE * seconds)) / INPUT_RATE
+    pitch = 2 * np.pi * np.cumsum(120 + 60 * np.sin(2 * np.pi * 0.7 * t)) / INPUT_RATE
+    signal = sum(np.sin(k * pitch) / k for k in range(1, 30)) + 0.05 * rng.standard_normal(len(t))
+    return (signal / np.abs(signal).max() * 20000).astype("<i2").tobytes()
+
+
+def split(audio: bytes, chunk_ms: int) -> list[bytes]:
+    size = INPUT_RATE * 2 * chunk_ms // 1000
+    return [audio[start : start + size] for start in range(0, len(audio), size)]
+
+
+def time_per_chunk(resampler: PolyphaseResampler, chunks: list[bytes], to_float: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        resampler.reset()
+        for chunk in chunks:
+            out = resampler.process(chunk)
+            if to_float:
+                pcm16_to_float32(out)
+    return (time.perf_counter() - start) / (REPEATS * len(chunks))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", type=int, nargs="+", default=[8000, 24000, 44100, 48000])
+    parser.add_argument("--chunk-ms", type=int, nargs="+", default=[20, 40, 100])
+    args = parser.parse_args()
+    audio = make_audio()
+
+    ok = True
+    for rate in args.rates:
+        resampler = PolyphaseResampler(INPUT_RATE, rate)
+        whole = resampler.process(audio)
+        for chunk_ms in args.chunk_ms:
+            chunks = split(audio, chunk_ms)
+            resampler.reset()
+            if b"".join(resampler.process(chunk) for chunk in chunks) != whole:
+                print(f"❌ {rate} Hz, {chunk_ms} ms chunks: output differs at chunk boundaries")
+                ok = False
+
+            int16_time = time_per_chunk(resampler, chunks, to_float=False)
+            float32_time = time_per_chunk(resampler, chunks, to_float=True)
+            print(
+                f"⏱️  16000 -> {rate:>5} Hz, {chunk_ms:>3} ms chunks:"
+                f" int16 {int16_time * 1e6:7.1f} us/chunk,"
+                f" float32 {float32_time * 1e6:7.1f} us/chunk,"
+                f" {float32_time / (chunk_ms / 1000):.2%} of real time"
+            )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Time the incremental text segmenter against the buffer rescans it replaced.
+
+Streams LLM-like tokens of increasing length through both and prints the cost per token,
+which stays flat for the segmenter however long the stream gets. Exits with status 1
+when the segmenter loses or reorders any text, so it doubles as a correctness check.
+
+    python scripts/benchmark_segmenter.py --tokens 1000 4000 16000
+"""
+
+import sys
+import time
+import random
+import argparse
+from collections.abc import Callable
+
+from src.tts.segmenter import SegmentRules, TextSegmenter
+
+WORDS = (
+    *("the", "cabin", "is", "set", "to", "twenty", "two", "degrees", "and", "fan", "runs"),
+    *("at", "level", "three", "while", "route", "airport", "avoids", "highway", "traffic"),
+)
+PUNCTUATION = ("", "", "", "", "", "", ",", ".", "!", "?")
+
+
+class LegacySegmenter:
+    """StreamingTTSHandler's text handling before the incremental segmenter."""
+
+    def __init__(self):
+        self.buffer = ""
+        self.last_sent_length = 0
+        self.sentence_endings = {".", "!", "?", "。", "！", "？"}
+        self.pause_chars = {",", ";", "，", "；", "\n"}
+        self.min_chunk_length = 3
+
+    def should_process_chunk(self, text: str) -> bool:
+        if any(char in self.sentence_endings for char in text):
+            return True
+        if any(char in self.pause_chars for char in text) and len(text) >= self.min_chunk_length:
+            return True
+        return len(text) >= self.min_chunk_length * 2
+
+    def extract_processable_text(self) -> str | None:
+        if len(self.buffer) <= self.last_sent_length:
+            return None
+        new_text = self.buffer[self.last_sent_length :]
+        if not self.should_process_chunk(new_text):
+            return None
+        cut_point = len(new_text)
+        for i, char in enumerate(new_text):
+            if char in self.sentence_endings:
+                cut_point = i + 1
+                break
+        if cut_point == len(new_text):
+            for i, char in enumerate(new_text):
+                if char in self.pause_chars and i >= self.min_chunk_length:
+                    cut_point = i + 1
+                    break
+        text_to_process = new_text[:cut_point].strip()
+        if text_to_process:
+            self.last_sent_length += cut_point
+            return text_to_process
+        return None
+
+    def push(self, text: str) -> list[str]:
+        self.buffer += text
+        # The handler formatted the whole buffer into a debug message on every token
+        _ = f"📝 Buffer updated: '{self.buffer}' (length: {len(self.buffer)})"
+        segment = self.extract_processable_text()
+        return [segment] if segment else []
+
+
+def make_tokens(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)  # noqa: S311
+    return [f" {rng.choice(WORDS)}{rng.choice(PUNCTUATION)}" for _ in range(count)]
+
+
+def time_per_token(push: Callable[[str], list], tokens: list[str]) -> float:
+    start = time.perf_counter()
+    for token in tokens:
+        push(token)
+    return (time.perf_counter() - start) / len(tokens)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, nargs="+", default=[1000, 4000, 16000])
+    parser.add_argument(
+        "--max-chars", type=int, default=0, help="Length rule, 0 cuts at punctuation only."
+    )
+    args = parser.parse_args()
+    rules = SegmentRules(max_chars=args.max_chars)
+
+    ok = True
+    for count in args.tokens:
+        tokens = make_tokens(count)
+        segmenter = TextSegmenter(rules)
+        segments = [segment for token in tokens for segment in segmenter.push(token)]
+        if (last := segmenter.flush()) is not None:
+            segments.append(last)
+        stream = "".join(tokens)
+        if [stream[s.start : s.end] for s in segments] != [s.text for s in segments] or (
+            " ".join(s.text for s in segments).split() != stream.split()
+        ):
+            print(f"❌ {count} tokens: segments do not add up to the stream")
+            ok = False
+
+        segmenter_time = time_per_token(TextSegmenter(rules).push, tokens)
+        legacy_time = time_per_token(LegacySegmenter().push, tokens)
+        print(
+            f"⏱️  {count:>6} tokens, {len(segments):>5} segments:"
+            f" segmenter {segmenter_time * 1e6:6.2f} us/token,"
+            f" legacy {legacy_time * 1e6:6.2f} us/token"
+        )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Measure the prompt tokens saved by per-turn tool selection and its accuracy.
+
+Every utterance is labelled with the tools a correct answer needs under the rules of the
+system prompt, e.g. rule f: feeling cold raises the temperature and lowers the fan speed.
+An utterance counts as covered when all of them are among the selected tools; utterances
+that need no tool are always covered. Recorded utterances can be passed as a JSON Lines
+file with one `{"text": ..., "tools": [...]}` object per line.
+
+The utterances are then replayed as one conversation to estimate the prefill cost of
+always sending every tool, of always sending the selection, and of the cost-aware choice
+`ToolSelectionProcessor` makes, with and without prefix caching on the LLM server.
+
+    python scripts/benchmark_tool_subset.py --utterances recorded.jsonl
+"""
+
+import json
+import time
+import argparse
+
+from src.llm.tools import handler  # noqa: F401  # registers the tools
+from src.llm.prompt import SYSTEM_PROMPT
+from src.llm.context import (
+    ToolSelectionProcessor,
+    select_tools,
+    estimate_tokens,
+    estimate_tool_tokens,
+    estimate_prefill_tokens,
+)
+from src.llm.tools.registry import registry
+
+CLIMATE = ["set_temp", "set_fan_speed"]
+
+# Labels follow the rules of SYSTEM_PROMPT_TEMPLATE, not the selector
+UTTERANCES = [
+    {"text": "Set the fan speed to 3", "tools": ["set_fan_speed"]},
+    {"text": "Turn the fan off", "tools": ["set_fan_speed"]},
+    {"text": "Can you blow some more air", "tools": ["set_fan_speed"]},
+    {"text": "Max airflow please", "tools": ["set_fan_speed"]},
+    {"text": "It's too windy in here", "tools": ["set_fan_speed"]},
+    {"text": "Set the temperature to 22", "tools": ["set_temp"]},
+    {"text": "Temp 24 please", "tools": ["set_temp"]},
+    # Rule f: temperature higher and fan speed lower
+    {"text": "I'm cold", "tools": CLIMATE},
+    {"text": "I'm feeling cold", "tools": CLIMATE},
+    {"text": "Make it a bit warmer", "tools": CLIMATE},
+    # Rule g: temperature lower and fan speed higher
+    {"text": "It's really hot in here", "tools": CLIMATE},
+    {"text": "It's so hot today", "tools": CLIMATE},
+    # Rule h: turning the AC off sets the fan speed to zero, turning it on undoes that
+    {"text": "Turn off the AC", "tools": ["set_fan_speed"]},
+    {"text": "Turn on the AC", "tools": ["set_fan_speed"]},
+    {"text": "Turn on the defroster", "tools": ["front_windshield_defroster"]},
+    {"text": "I can't see through the windshield", "tools": ["front_windshield_defroster"]},
+    {"text": "There's ice on the front glass", "tools": ["front_windshield_defroster"]},
+    {"text": "Defrost off", "tools": ["front_windshield_defroster"]},
+    {"text": "Set temperature to 20 and fan speed to 2", "tools": CLIMATE},
+    {
+        "text": "It's cold and the windshield is fogged up",
+        "tools": [*CLIMATE, "front_windshield_defroster"],
+    },
+    {"text": "Turn it up a little", "tools": CLIMATE},
+    {"text": "Navigate to the nearest gas station", "tools": []},
+    {"text": "What's the route to the airport", "tools": []},
+    {"text": "Tell me a joke", "tools": []},
+    {"text": "Thanks, that's great", "tools": []},
+    {"text": "What is the current status of the car", "tools": []},
+]
+
+
+def load_utterances(path: str | None) -> list[dict]:
+    if path is None:
+        return UTTERANCES
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def simulate_prefill(utterances: list[dict], prefix_caching: bool) -> dict[str, int]:
+    """Estimated prefill tokens of the utterances as one conversation, per strategy."""
+    full = registry.schemas()
+    processor = ToolSelectionProcessor(prefix_caching=prefix_caching)
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    totals = {"full": 0, "subset": 0}
+    previous_subset = None
+    previous_history = 0
+    for index, utterance in enumerate(utterances):
+        messages.append({"role": "user", "content": utterance["text"]})
+        history = sum(estimate_tokens(message) for message in messages[1:])
+        new = history - previous_history
+        subset = select_tools(utterance["text"])
+        totals["full"] += estimate_prefill_tokens(
+            full, full if index else None, history, new, prefix_caching
+        )
+        totals["subset"] += estimate_prefill_tokens(
+            subset, previous_subset, history, new, prefix_caching
+        )
+        processor.choose_tools(utterance["text"], messages)
+        previous_subset = subset
+        messages.append({"role": "assistant", "content": "Done, anything else I can do?"})
+        previous_history = history
+    totals["cost-aware"] = processor.prefill_tokens
+    totals["cost-aware subset requests"] = processor.subset_requests
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--utterances", type=str, default=None, help="JSON Lines file.")
+    args = parser.parse_args()
+
+    utterances = load_utterances(args.utterances)
+    all_tools = registry.schemas()
+    full_tokens = estimate_tool_tokens(all_tools)
+
+    selected_tokens = 0
+    covered = 0
+    fallbacks = 0
+    elapsed = 0.0
+    for utterance in utterances:
+        start = time.perf_counter()
+        tools = select_tools(utterance["text"])
+        elapsed += time.perf_counter() - start
+
+        names = {tool["function"]["name"] for tool in tools}
+        selected_tokens += estimate_tool_tokens(tools)
+        fallbacks += len(tools) == len(all_tools)
+        if set(utterance["tools"]) <= names:
+            covered += 1
+        else:
+            print(f"❌ Missed {sorted(set(utterance['tools']) - names)}: {utterance['text']!r}")
+
+    count = len(utterances)
+    average = selected_tokens / count
+    print(f"📊 Utterances: {count}")
+    print(f"🔧 Tool tokens per request: {full_tokens} full, {average:.1f} selected")
+    print(f"💰 Savings: {(1 - average / full_tokens) * 100:.1f}%")
+    print(f"🎯 Coverage: {covered / count * 100:.1f}% ({count - covered} missed)")
+    print(f"↩️  Fallback to all tools: {fallbacks / count * 100:.1f}%")
+    print(f"⏱️  Selection time: {elapsed / count * 1e6:.1f} us per utterance")
+    for prefix_caching in (True, False):
+        totals = simulate_prefill(utterances, prefix_caching)
+        print(
+            f"🧮 Prefill over the conversation, prefix caching {'on' if prefix_caching else 'off'}:"
+            f" full {totals['full']}, subset {totals['subset']},"
+            f" cost-aware {totals['cost-aware']} tokens"
+            f" ({totals['cost-aware subset requests']}/{count} requests with a subset)"
+        )
+
+
+if __name__ == "__main__":
+    main()
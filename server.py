@@ -1,13 +1,16 @@
 """Speech-to-speech conversation bot with weather and time functions."""
 
 import os
+import asyncio
 import argparse
+from functools import partial
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 import uvicorn
 from pydantic import BaseModel
 from fastapi.staticfiles import StaticFiles
@@ -22,7 +25,6 @@ from nvidia_pipecat.utils.logging import setup_default_ace_logging
 from pipecat.audio.vad.vad_analyzer import VADParams
 
 # from nvidia_pipecat.services.nvidia_llm import NvidiaLLMService
-from nvidia_pipecat.services.riva_speech import RivaASRService, RivaTTSService
 from nvidia_pipecat.pipeline.ace_pipeline_runner import PipelineMetadata, ACEPipelineRunner
 from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
 
@@ -41,18 +43,34 @@ from nvidia_pipecat.transports.services.ace_controller.routers.websocket_router
 )
 
 from src.routers import tts
-from src.llm.prompt import (
-    SYSTEM_PROMPT_TEMPLATE,
-    BROADCAST_PROMPT_TEMPLATE,
-    GREETING_PROMPT,
-    VLLM_CHAT_PROMPT_FIX,
+from src.llm.prompt import SYSTEM_PROMPT, GREETING_PROMPT, BROADCAST_PROMPT_TEMPLATE
+from src.llm.context import (
+    LLM_PREFIX_CACHING,
+    LLM_TOOL_SUBSETTING,
+    CarStatusProcessor,
+    ContextWindowProcessor,
+    ToolSelectionProcessor,
+    warm_up_prefix_cache,
+    build_car_status_prompt,
 )
-from src.llm.tools.fan import get_fan_speed, set_fan_speed_tool
-from src.llm.tools.handler import handle_function
-from src.llm.tools.google_map import google_map_tool
-from src.llm.tools.temperature import get_temp, set_temp_tool
-from src.llm.tools.front_windshield import front_defrost_on_tool, get_front_defrost_status
-from src.tts.filler import FillerProcessor
+from src.llm.state import pg_pool, ac_settings_cache
+from src.llm.vehicles import (
+    STREAM_VEHICLE_PREFIX,
+    VehicleTokenError,
+    issue_vehicle_token,
+    verify_vehicle_token,
+)
+from src.llm.latency import LLMResponseMonitor, ttft_stats
+from src.llm.fast_path import FastPathProcessor
+from src.llm.tools.handler import start_function, handle_function
+from src.llm.tools.registry import registry
+from src.tts.filler import FILLER_PHRASES, FillerProcessor
+from src.tts.pool import tts_pool, create_riva_tts_service
+from src.tts.cache import tts_audio_cache
+from src.tts.packetizer import AudioPacketizerProcessor
+from src.tts.filler_audio import filler_audio_cache
+from src.speech.asr import ASRCapacityMiddleware, AdmittedRivaASRService
+from src.speech.admission import admission_stats
 
 # setup_default_ace_logging(level="DEBUG")
 from loguru import logger
@@ -62,12 +80,26 @@ logger.remove()
 RECORDING_CONFIG = VADParams(confidence=0.4, start_secs=0.1, stop_secs=0.1, min_volume=0.5)
 DEMO_CONFIG = VADParams(confidence=0.7, start_secs=0.05, stop_secs=1.5, min_volume=1.0)
 
+LOCAL_LLM_MODEL = "meta-llama/Llama-3.1-8B-Instruct"
+
 
 class EventMessage(BaseModel):
     message: str
 
 
 active_tasks: dict[str, PipelineTask] = {}
+context_windows: dict[str, ContextWindowProcessor] = {}
+tool_selections: dict[str, ToolSelectionProcessor] = {}
+
+
+async def warm_up_filler_audio() -> None:
+    """Render the filler phrases to PCM, served from the TTS audio cache when possible."""
+    phrases = [phrase for group in FILLER_PHRASES.values() for phrase in group]
+    try:
+        await filler_audio_cache.load(phrases)
+        print("🗣️  Filler audio cache ready")
+    except Exception as e:
+        print(f"❌ Filler audio warm-up failed, fillers go through TTS: {e}")
 
 
 async def create_pipeline_task(pipeline_metadata: PipelineMetadata):
@@ -98,7 +130,8 @@ async def create_pipeline_task(pipeline_metadata: PipelineMetadata):
     # Configure services based on API key (local vs cloud)
     if NVIDIA_API_KEY == "local":
         print("🏠 Using local NVIDIA services")
-        stt = RivaASRService(
+        stt = AdmittedRivaASRService(
+            stream=pipeline_metadata.stream_id,
             server=os.getenv("RIVA_ASR_SERVER"),
             api_key=NVIDIA_API_KEY,
             # model="parakeet-0.6b-en-US-asr-streaming-throughput-asr-bls-ensemble",
@@ -109,22 +142,18 @@ async def create_pipeline_task(pipeline_metadata: PipelineMetadata):
             idle_timeout=15,
             # automatic_punctuation=True,
         )
-        tts = RivaTTSService(
-            server=os.getenv("RIVA_TTS_SERVER"),
-            api_key=NVIDIA_API_KEY,
-            language="en-US",
-            sample_rate=16000,
-        )
         llm = NimLLMService(
             api_key=NVIDIA_API_KEY,
             base_url=os.getenv("VLLM_BASE_URL"),
-            model="meta-llama/Llama-3.1-8B-Instruct",
+            model=LOCAL_LLM_MODEL,
             max_tokens=4096,
             # temperature=0.5,
         )
+        llm_backend = f"local:{LOCAL_LLM_MODEL}"
     else:
         print("☁️  Using cloud NVIDIA services")
-        stt = RivaASRService(
+        stt = AdmittedRivaASRService(
+            stream=pipeline_metadata.stream_id,
             server="grpc.nvcf.nvidia.com:443",
             api_key=NVIDIA_API_KEY,
             language="en-US",
@@ -135,55 +164,79 @@ async def create_pipeline_task(pipeline_metadata: PipelineMetadata):
                 ("authorization", f"Bearer {NVIDIA_API_KEY}"),
             ],
         )
-        tts = RivaTTSService(
-            server="grpc.nvcf.nvidia.com:443",
-            api_key=NVIDIA_API_KEY,
-            language="en-US",
-            sample_rate=16000,
-            metadata=[
-                ("function-id", "0149dedb-2be8-4195-b9a0-e57e0e14f972"),
-                ("authorization", f"Bearer {NVIDIA_API_KEY}"),
-            ],
-        )
         llm = NimLLMService(api_key=NVIDIA_API_KEY, model="meta/llama-3.1-8b-instruct")
-
-    llm.register_function(None, handle_function)
+        llm_backend = "cloud:meta/llama-3.1-8b-instruct"
+    tts = create_riva_tts_service(cache=tts_audio_cache, stream=pipeline_metadata.stream_id)
+
+    # A client with a signed vehicle token keeps its AC settings across reconnects, any
+    # other stream gets a row of its own that is deleted when the stream ends
+    vehicle_id = None
+    vehicle_token = pipeline_metadata.websocket.query_params.get("vehicle_token")
+    if vehicle_token:
+        try:
+            vehicle_id = verify_vehicle_token(vehicle_token)
+        except VehicleTokenError as e:
+            print(f"⚠️  Ignoring vehicle token of stream {pipeline_metadata.stream_id}: {e}")
+    stream_scoped_vehicle = vehicle_id is None
+    vehicle_id = vehicle_id or f"{STREAM_VEHICLE_PREFIX}{pipeline_metadata.stream_id}"
+    llm.register_function(
+        None, partial(handle_function, vehicle_id=vehicle_id), start_callback=start_function
+    )
     print("🤖 LLM configured with function calling")
 
     # Setup transcript synchronization
     stt_transcript_synchronization = UserTranscriptSynchronization()
     print("📝 Transcript sync enabled")
 
-    # Create filler processor
-    filler_processor = FillerProcessor()
+    # Create filler processor, driven by the LLM's time to first token
+    response_monitor = LLMResponseMonitor(llm_backend)
+    filler_processor = FillerProcessor(response_monitor=response_monitor)
     print("🎯 Filler processor created")
 
-    # Setup LLM context with system prompt
-    SYSTEM_PROMPT = SYSTEM_PROMPT_TEMPLATE.format(
-        vllm_chat_prompt_fix=VLLM_CHAT_PROMPT_FIX,
-        current_temp=get_temp(),
-        current_fan_speed=get_fan_speed(),
-        current_front_defrost=get_front_defrost_status(),
-    )
-
     # Define available tools for LLM
-    tools = [front_defrost_on_tool, set_temp_tool, set_fan_speed_tool]
+    tools = registry.schemas()
     print("🔧 Tools registered:", [tool["function"]["name"] for tool in tools])
 
-    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    # Setup LLM context with the shared system prompt and the car status, served from the
+    # AC settings cache and kept in sync with it
+    status_message = {
+        "role": "system",
+        "content": build_car_status_prompt(await ac_settings_cache.get(vehicle_id)),
+    }
+
+    def on_ac_settings_changed(settings: dict) -> None:
+        status_message["content"] = build_car_status_prompt(settings)
+
+    unsubscribe_ac_settings = ac_settings_cache.subscribe(vehicle_id, on_ac_settings_changed)
+    car_status = CarStatusProcessor(status_message)
+
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}, status_message]
     context = OpenAILLMContext(messages, tools)
+    context_window = ContextWindowProcessor(pinned_messages=messages)
+    context_windows[pipeline_metadata.stream_id] = context_window
+    tool_selection = ToolSelectionProcessor()
+    tool_selections[pipeline_metadata.stream_id] = tool_selection
+    fast_path = FastPathProcessor(context, vehicle_id)
     context_aggregator = llm.create_context_aggregator(context)
     print("💬 LLM context initialized")
 
+    audio_packetizer = AudioPacketizerProcessor()
+
     # Build the processing pipeline with filler processor
     pipeline = Pipeline([
         transport.input(),  # WebSocket input
         stt,  # Speech-to-text
         stt_transcript_synchronization,  # User transcript sync
+        fast_path,  # Run simple AC commands without the LLM
         filler_processor,  # Add filler processor after STT
         context_aggregator.user(),  # User context processing
+        tool_selection,  # Offer only the tools relevant to the request
+        car_status,  # Move the car status after the cached prompt prefix
+        context_window,  # Keep the context within the token budget
         llm,  # LLM processing
+        response_monitor,  # Time to first token for the filler
         tts,  # Text-to-speech
+        audio_packetizer,  # Fixed-duration audio packets
         transport.output(),  # WebSocket output
         context_aggregator.assistant(),  # Assistant context processing
     ])
@@ -211,22 +264,65 @@ async def create_pipeline_task(pipeline_metadata: PipelineMetadata):
         """Initialize conversation when client connects."""
         print("👋 Client connected - starting conversation")
         # messages.append({"role": "system", "content": GREETING_PROMPT})
-        await task.queue_frames([LLMMessagesFrame(messages)])
+        # Copies, the LLM service adds a `name` field to the messages it receives this way
+        await task.queue_frames([LLMMessagesFrame([dict(message) for message in messages])])
 
     # Handle client disconnections
     @transport.event_handler("on_client_disconnected")
     async def on_client_disconnected(transport, client) -> None:
         """Clean up when client disconnects."""
         print("👋 Client disconnected")
+        unsubscribe_ac_settings()
+        try:
+            await ac_settings_cache.release(vehicle_id, delete=stream_scoped_vehicle)
+        except Exception as e:
+            print(f"❌ Failed to release AC settings: {e}")
         if pipeline_metadata.stream_id in active_tasks:
             del active_tasks[pipeline_metadata.stream_id]
+        context_windows.pop(pipeline_metadata.stream_id, None)
+        tool_selections.pop(pipeline_metadata.stream_id, None)
 
     print("✨ Pipeline task ready")
     return task
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up Postgres, the AC settings cache, vLLM prefix cache, TTS pool and fillers."""
+    try:
+        await pg_pool.open()
+        await ac_settings_cache.start()
+        print("🗄️  Postgres pool and AC settings cache ready")
+    except Exception as e:
+        print(f"❌ Postgres warm-up failed, connecting lazily: {e}")
+    if os.getenv("NVIDIA_API_KEY") == "local":
+        try:
+            await warm_up_prefix_cache(
+                base_url=os.getenv("VLLM_BASE_URL"),
+                api_key="local",
+                model=LOCAL_LLM_MODEL,
+                tools=registry.schemas(),
+            )
+            print("🔥 vLLM prefix cache warmed up")
+        except Exception as e:
+            print(f"❌ vLLM prefix cache warm-up failed: {e}")
+    if LLM_TOOL_SUBSETTING and LLM_PREFIX_CACHING:
+        print("⚠️  LLM_PREFIX_CACHING is on, tool subsetting keeps sending the full tool list")
+    try:
+        await tts_pool.start()
+    except Exception as e:
+        print(f"❌ TTS pool warm-up failed: {e}")
+    # In the background, fillers fall back to TTS until their audio is ready
+    filler_audio_task = asyncio.create_task(warm_up_filler_audio())
+    yield
+    filler_audio_task.cancel()
+    await tts_pool.stop()
+    await ac_settings_cache.stop()
+    await pg_pool.close()
+
+
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware with appropriate configuration
 app.add_middleware(
@@ -236,6 +332,8 @@ app.add_middleware(
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
 )
+# Every voice pipeline holds an ASR slot while connected, refuse clients beyond them
+app.add_middleware(ASRCapacityMiddleware)
 
 app.include_router(websocket_router)
 app.include_router(tts.router)
@@ -272,6 +370,49 @@ async def broadcast_message(event: EventMessage):
     return {"status": "success", "sent_to": len(active_tasks)}
 
 
+@app.post("/api/vehicles/token")
+async def vehicle_token():
+    """Issue a token for a new vehicle, pass it as `?vehicle_token=` to keep its settings."""
+    try:
+        return {"vehicle_token": issue_vehicle_token()}
+    except VehicleTokenError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+
+@app.get("/api/tools/stats")
+async def tool_stats():
+    """Per-tool call counts and latency histograms."""
+    return registry.stats()
+
+
+@app.get("/api/llm/ttft")
+async def llm_ttft():
+    """Rolling time-to-first-token statistics per LLM backend."""
+    return ttft_stats.to_dict()
+
+
+@app.get("/api/speech/admission")
+async def speech_admission():
+    """Concurrency, queue depth, shed requests and queue wait of Riva TTS and ASR."""
+    return admission_stats()
+
+
+@app.get("/api/streams/context")
+async def stream_context():
+    """Estimated LLM context size and tool selection of every active stream."""
+    return {
+        stream_id: {
+            "tokens": window.token_count,
+            "token_budget": window.token_budget,
+            "folded_turns": window.folded_turns,
+            "tool_selection": tool_selections[stream_id].stats()
+            if stream_id in tool_selections
+            else None,
+        }
+        for stream_id, window in context_windows.items()
+    }
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Start the Speech-to-Speech Bot server.")
     parser.add_argument("--host", type=str, default="0.0.0.0", help="Host to run the server on.")
@@ -1,6 +1,11 @@
 import os
+from typing import Any
+import asyncio
+from collections.abc import Callable
 
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+import psycopg2.extensions
 
 PG_HOST = os.getenv("POSTGRES_HOST")
 PG_PORT = os.getenv("POSTGRES_PORT")
@@ -8,14 +13,177 @@ PG_DBNAME = os.getenv("POSTGRES_DBNAME")
 PG_USER = os.getenv("POSTGRES_USER")
 PG_PASSWORD = os.getenv("POSTGRES_PASSWORD")
 
+PG_CONN_STRING = (
+    f"host={PG_HOST} user={PG_USER} dbname={PG_DBNAME} password={PG_PASSWORD} port={PG_PORT}"
+)
+PG_POOL_MIN_SIZE = int(os.getenv("POSTGRES_POOL_MIN_SIZE", "2"))
+PG_POOL_MAX_SIZE = int(os.getenv("POSTGRES_POOL_MAX_SIZE", "10"))
+PG_ACQUIRE_TIMEOUT = float(os.getenv("POSTGRES_ACQUIRE_TIMEOUT", "2.0"))
 
-def pg_connect(
-    conn_string=f"host={PG_HOST} user={PG_USER} dbname={PG_DBNAME} password={PG_PASSWORD} port={PG_PORT}",
-):
+
+def pg_connect(conn_string=PG_CONN_STRING):
     conn = psycopg2.connect(conn_string)
     return conn.cursor()
 
 
+class PoolTimeoutError(TimeoutError):
+    """Raised when no pooled connection becomes free within the acquire timeout."""
+
+
+class _PreparedConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers whether the pool statements were prepared on it."""
+
+    prepared = False
+
+
+class PostgresPool:
+    """Async facade over a psycopg2 connection pool.
+
+    psycopg2 is blocking, so every query runs in a worker thread via `asyncio.to_thread`
+    and never stalls the event loop that drives the pipelines. An `asyncio.Semaphore`
+    sized to the pool bounds the number of in-flight queries, which lets callers wait
+    for a connection with a timeout instead of failing with `PoolError`.
+
+    Statements registered in `statements` are `PREPARE`d once on every connection the
+    first time it is used, and executed by name afterwards.
+
+    Args:
+        statements: Mapping of prepared statement name to the SQL it is prepared from.
+        conn_string: libpq connection string.
+        min_size: Number of connections opened (and warmed up) by `open()`.
+        max_size: Upper bound of concurrently open connections.
+        acquire_timeout: Seconds to wait for a free connection.
+    """
+
+    def __init__(
+        self,
+        statements: dict[str, str] | None = None,
+        conn_string: str = PG_CONN_STRING,
+        min_size: int = PG_POOL_MIN_SIZE,
+        max_size: int = PG_POOL_MAX_SIZE,
+        acquire_timeout: float = PG_ACQUIRE_TIMEOUT,
+    ):
+        self.statements = statements or {}
+        self.conn_string = conn_string
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self._pool: ThreadedConnectionPool | None = None
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._open_lock = asyncio.Lock()
+
+    async def open(self) -> None:
+        """Create the pool and warm up `min_size` connections with all statements prepared."""
+        async with self._open_lock:
+            if self._pool is not None:
+                return
+            self._pool = await asyncio.to_thread(
+                ThreadedConnectionPool,
+                self.min_size,
+                self.max_size,
+                self.conn_string,
+                connection_factory=_PreparedConnection,
+            )
+            await asyncio.to_thread(self._warm_up)
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.closeall)
+
+    def _prepare(self, conn: _PreparedConnection) -> None:
+        with conn.cursor() as cur:
+            for name, sql in self.statements.items():
+                try:
+                    cur.execute(f"PREPARE {name} AS {sql}")
+                except psycopg2.Error as e:
+                    conn.rollback()
+                    # Usually a schema that lacks a migration, e.g. the vehicle_id column
+                    raise RuntimeError(
+                        f"Failed to prepare {name}, are the migrations/ applied? {e}"
+                    ) from e
+        conn.commit()
+        conn.prepared = True
+
+    def _warm_up(self) -> None:
+        # Check out every idle connection at once so each one gets its statements prepared
+        conns = [self._pool.getconn() for _ in range(self.min_size)]
+        try:
+            for conn in conns:
+                if not conn.prepared:
+                    self._prepare(conn)
+        finally:
+            for conn in conns:
+                self._pool.putconn(conn)
+
+    def _execute(self, work: Callable[[psycopg2.extensions.cursor], Any]) -> Any:
+        conn = self._pool.getconn()
+        try:
+            if not conn.prepared:
+                self._prepare(conn)
+            with conn.cursor() as cur:
+                result = work(cur)
+            conn.commit()
+            return result
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            # Drop connections that died mid-query so the next caller gets a fresh one
+            self._pool.putconn(conn, close=bool(conn.closed))
+
+    async def _run(self, work: Callable[[psycopg2.extensions.cursor], Any]) -> Any:
+        if self._pool is None:
+            await self.open()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.acquire_timeout)
+        except TimeoutError as e:
+            raise PoolTimeoutError(
+                f"No Postgres connection available within {self.acquire_timeout}s"
+            ) from e
+        try:
+            return await asyncio.to_thread(self._execute, work)
+        finally:
+            self._semaphore.release()
+
+    async def fetchone(self, statement: str, *args: Any) -> tuple | None:
+        """Execute a prepared statement and return its first row."""
+        query = self._execute_sql(statement, args)
+
+        def work(cur: psycopg2.extensions.cursor) -> tuple | None:
+            cur.execute(query, args)
+            return cur.fetchone()
+
+        return await self._run(work)
+
+    async def fetchall(self, statement: str, *args: Any) -> list[tuple]:
+        """Execute a prepared statement and return all rows."""
+        query = self._execute_sql(statement, args)
+
+        def work(cur: psycopg2.extensions.cursor) -> list[tuple]:
+            cur.execute(query, args)
+            return cur.fetchall()
+
+        return await self._run(work)
+
+    async def execute(self, statement: str, *args: Any) -> int:
+        """Execute a prepared statement in its own transaction and return the row count."""
+        query = self._execute_sql(statement, args)
+
+        def work(cur: psycopg2.extensions.cursor) -> int:
+            cur.execute(query, args)
+            return cur.rowcount
+
+        return await self._run(work)
+
+    @staticmethod
+    def _execute_sql(statement: str, args: tuple) -> str:
+        if not args:
+            return f"EXECUTE {statement}"
+        return f"EXECUTE {statement} ({', '.join(['%s'] * len(args))})"
+
+
 if __name__ == "__main__":
     cur = pg_connect()
     cur.execute("UPDATE ac_settings SET temperature = 25")
@@ -0,0 +1,338 @@
+"""LLM context helpers: stable prompt prefix for vLLM prefix caching and context budgeting."""
+
+import os
+import json
+
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletionToolParam
+from pipecat.frames.frames import Frame
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContextFrame
+
+from src.llm.intent import detect_intents
+from src.llm.prompt import (
+    SYSTEM_PROMPT,
+    CAR_STATUS_PROMPT_TEMPLATE,
+    CONTEXT_SUMMARY_PROMPT_TEMPLATE,
+)
+from src.llm.tools.registry import registry
+
+LLM_CONTEXT_TOKEN_BUDGET = int(os.getenv("LLM_CONTEXT_TOKEN_BUDGET", "4000"))
+LLM_CONTEXT_SUMMARY_CHARS = int(os.getenv("LLM_CONTEXT_SUMMARY_CHARS", "1200"))
+LLM_TOOL_SUBSETTING = os.getenv("LLM_TOOL_SUBSETTING", "true").lower() == "true"
+# Whether the LLM server reuses cached prompt prefixes, as vLLM with prefix caching does.
+# Then the cached full tool list always prefills less than a subset, see
+# `estimate_prefill_tokens`, and tool subsetting keeps sending the full list
+LLM_PREFIX_CACHING = os.getenv("LLM_PREFIX_CACHING", "false").lower() == "true"
+
+
+def build_car_status_prompt(settings: dict | None) -> str:
+    """Render the car status message from the AC settings."""
+    settings = settings or {}
+    front_defrost_on = settings.get("front_defrost_on")
+    if front_defrost_on is not None:
+        front_defrost_on = "on" if front_defrost_on else "off"
+    return CAR_STATUS_PROMPT_TEMPLATE.format(
+        current_temp=settings.get("temperature"),
+        current_fan_speed=settings.get("fan_speed"),
+        current_front_defrost=front_defrost_on,
+    )
+
+
+class CarStatusProcessor(FrameProcessor):
+    """Keeps the car status message right before the latest user message.
+
+    The static system prompt stays the first message and the conversation grows after it,
+    so every request shares its prefix with the previous one. Only the small status
+    message moves along, which is updated in place when the settings change.
+    """
+
+    def __init__(self, status_message: dict):
+        super().__init__()
+        self._status_message = status_message
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection) -> None:
+        await super().process_frame(frame, direction)
+
+        if direction == FrameDirection.DOWNSTREAM and isinstance(frame, OpenAILLMContextFrame):
+            self._place(frame.context.messages)
+
+        await self.push_frame(frame, direction)
+
+    def _place(self, messages: list[dict]) -> None:
+        for index, message in enumerate(messages):
+            if message is self._status_message:
+                del messages[index]
+                break
+        for index in range(len(messages) - 1, 0, -1):
+            if messages[index].get("role") == "user":
+                messages.insert(index, self._status_message)
+                return
+        messages.append(self._status_message)
+
+
+def estimate_tokens(message: dict) -> int:
+    """Rough token count of a chat message, about four characters per token for English."""
+    content = message.get("content") or ""
+    if not isinstance(content, str):
+        content = json.dumps(content)
+    size = len(content)
+    if "tool_calls" in message:
+        size += len(json.dumps(message["tool_calls"]))
+    # Role header and separators of the chat template
+    return size // 4 + 4
+
+
+def _summarize_message(message: dict, max_chars: int = 120) -> str | None:
+    role = message.get("role")
+    if "tool_calls" in message:
+        calls = ", ".join(
+            f"{call['function']['name']}({call['function']['arguments']})"
+            for call in message["tool_calls"]
+        )
+        text = f"Assistant called {calls}"
+    elif role == "tool":
+        text = f"Tool result: {message.get('content')}"
+    elif role in {"user", "assistant"} and isinstance(message.get("content"), str):
+        text = f"{role.capitalize()}: {message['content']}"
+    else:
+        return None
+    text = " ".join(text.split())
+    return text if len(text) <= max_chars else text[: max_chars - 3] + "..."
+
+
+class ContextWindowProcessor(FrameProcessor):
+    """Keeps the LLM context within a token budget during long drives.
+
+    The system prompt, the car status message and the summary message are pinned. The
+    rest of the conversation is split into turns that start at a user message, so an
+    assistant tool call always stays together with its tool results. When the context
+    exceeds `token_budget`, the oldest turns are dropped and folded into the summary
+    message, which keeps at most `summary_chars` characters of the most recent history.
+
+    Folding rewrites the messages after the system prompt, so it only happens when the
+    budget is exceeded and then frees a quarter of the budget at once.
+    """
+
+    def __init__(
+        self,
+        pinned_messages: list[dict],
+        token_budget: int = LLM_CONTEXT_TOKEN_BUDGET,
+        summary_chars: int = LLM_CONTEXT_SUMMARY_CHARS,
+    ):
+        super().__init__()
+        self.token_budget = token_budget
+        self.summary_chars = summary_chars
+        self.token_count = 0
+        self.folded_turns = 0
+        self._pinned_ids = {id(message) for message in pinned_messages}
+        self._summary = ""
+        self._summary_message: dict | None = None
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection) -> None:
+        await super().process_frame(frame, direction)
+
+        if direction == FrameDirection.DOWNSTREAM and isinstance(frame, OpenAILLMContextFrame):
+            self._fit(frame.context.messages)
+
+        await self.push_frame(frame, direction)
+
+    def _is_pinned(self, message: dict) -> bool:
+        return id(message) in self._pinned_ids or message is self._summary_message
+
+    def _fit(self, messages: list[dict]) -> None:
+        self.token_count = sum(estimate_tokens(message) for message in messages)
+        if self.token_count <= self.token_budget:
+            return
+
+        turns: list[list[dict]] = []
+        for message in messages:
+            if self._is_pinned(message):
+                continue
+            if not turns or message.get("role") == "user":
+                turns.append([])
+            turns[-1].append(message)
+
+        target = self.token_budget * 3 // 4
+        if self._summary_message is None:
+            # Room for the summary message about to be added
+            target -= self.summary_chars // 4 + 16
+        folded: list[dict] = []
+        # Never drop the latest turn, it holds the request being answered
+        while len(turns) > 1 and self.token_count > target:
+            turn = turns.pop(0)
+            self.token_count -= sum(estimate_tokens(message) for message in turn)
+            folded.extend(turn)
+        if not folded:
+            return
+        self.folded_turns += 1
+
+        lines = [line for line in map(_summarize_message, folded) if line]
+        self._summary = " ".join([self._summary, *lines]).strip()[-self.summary_chars :]
+        summary = CONTEXT_SUMMARY_PROMPT_TEMPLATE.format(summary=self._summary)
+
+        if self._summary_message is None:
+            self._summary_message = {"role": "system", "content": summary}
+            # Right after the system prompt, ahead of the conversation
+            messages.insert(1, self._summary_message)
+        else:
+            self.token_count -= estimate_tokens(self._summary_message)
+            self._summary_message["content"] = summary
+        self.token_count += estimate_tokens(self._summary_message)
+
+        folded_ids = {id(message) for message in folded}
+        messages[:] = [message for message in messages if id(message) not in folded_ids]
+
+
+def estimate_tool_tokens(tools: list[ChatCompletionToolParam]) -> int:
+    """Rough token count of the tool definitions sent with a request."""
+    return len(json.dumps(tools)) // 4 if tools else 0
+
+
+def select_tools(text: str) -> list[ChatCompletionToolParam]:
+    """Advertised tools relevant to the utterance, or all of them when unsure."""
+    intents = detect_intents(text)
+    tools = registry.schemas(intents) if intents else []
+    # No intent, or one no advertised tool serves, e.g. navigation: google_map is
+    # dispatchable but not advertised
+    return tools or registry.schemas()
+
+
+def estimate_prefill_tokens(
+    tools: list[ChatCompletionToolParam],
+    previous: list[ChatCompletionToolParam] | None,
+    history_tokens: int,
+    new_tokens: int,
+    prefix_caching: bool = LLM_PREFIX_CACHING,
+) -> int:
+    """Rough prompt tokens the LLM server prefills for a request offering `tools`.
+
+    The system prompt is the same for every request and left out. The tools follow right
+    after it, so with prefix caching a request offering the same tools as the stream's
+    previous request only prefills the messages added since, while any other tool list
+    also prefills the whole conversation behind it again. The full tool list is cached
+    for every stream by `warm_up_prefix_cache`, a subset pays for its own tokens.
+
+    Args:
+        tools: Tools offered with the request.
+        previous: Tools offered with the stream's previous request, None for the first.
+        history_tokens: Tokens of the messages after the system prompt.
+        new_tokens: Tokens of the messages added since the previous request.
+        prefix_caching: Whether the LLM server caches prompt prefixes.
+    """
+    if not prefix_caching:
+        return estimate_tool_tokens(tools) + history_tokens
+    if tools == previous:
+        return new_tokens
+    tool_tokens = 0 if tools == registry.schemas() else estimate_tool_tokens(tools)
+    return tool_tokens + history_tokens
+
+
+class ToolSelectionProcessor(FrameProcessor):
+    """Sends only the tools relevant to the latest user message when that is cheaper.
+
+    The tool schemas are a large part of the prompt of a small model. The latest user
+    message is classified with the keyword groups of `src.llm.intent` and the context's
+    tools are narrowed to the matching ones, falling back to every advertised tool when
+    nothing matches. Follow-up requests after tool results keep the turn's selection.
+
+    Changing the tools also changes the prompt prefix the LLM server may have cached, so
+    the subset is only sent when `estimate_prefill_tokens` says it prefills fewer tokens
+    than the full list. Without prefix caching every request prefills its whole prompt
+    and a subset always saves its missing tools. With prefix caching the full list is
+    already cached and always wins, so subsetting only pays off on servers that do not
+    cache prefixes.
+
+    Args:
+        enabled: Select tools at all, otherwise the context keeps the full list.
+        prefix_caching: Whether the LLM server caches prompt prefixes.
+    """
+
+    def __init__(
+        self, enabled: bool = LLM_TOOL_SUBSETTING, prefix_caching: bool = LLM_PREFIX_CACHING
+    ):
+        super().__init__()
+        self.enabled = enabled
+        self.prefix_caching = prefix_caching
+        self.subset_requests = 0
+        self.full_requests = 0
+        # Estimated prefill of the requests so far, and of sending the full list each time
+        self.prefill_tokens = 0
+        self.full_prefill_tokens = 0
+        self._previous: list[ChatCompletionToolParam] | None = None
+        self._previous_history_tokens = 0
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection) -> None:
+        await super().process_frame(frame, direction)
+
+        if (
+            self.enabled
+            and direction == FrameDirection.DOWNSTREAM
+            and isinstance(frame, OpenAILLMContextFrame)
+        ):
+            text = self._last_user_text(frame.context.messages)
+            if text is not None:
+                frame.context.set_tools(self.choose_tools(text, frame.context.messages))
+
+        await self.push_frame(frame, direction)
+
+    def choose_tools(self, text: str, messages: list[dict]) -> list[ChatCompletionToolParam]:
+        full = registry.schemas()
+        subset = select_tools(text)
+        history_tokens = sum(estimate_tokens(message) for message in messages[1:])
+        new_tokens = max(history_tokens - self._previous_history_tokens, 0)
+
+        def cost(tools: list[ChatCompletionToolParam]) -> int:
+            return estimate_prefill_tokens(
+                tools, self._previous, history_tokens, new_tokens, self.prefix_caching
+            )
+
+        full_cost = cost(full)
+        subset_cost = cost(subset)
+        # Baseline of always sending the full list, for the savings estimate
+        self.full_prefill_tokens += estimate_prefill_tokens(
+            full,
+            None if self._previous is None else full,
+            history_tokens,
+            new_tokens,
+            self.prefix_caching,
+        )
+        if subset_cost < full_cost:
+            tools, self.prefill_tokens = subset, self.prefill_tokens + subset_cost
+            self.subset_requests += 1
+        else:
+            tools, self.prefill_tokens = full, self.prefill_tokens + full_cost
+            self.full_requests += 1
+        self._previous = tools
+        self._previous_history_tokens = history_tokens
+        return tools
+
+    def stats(self) -> dict:
+        return {
+            "prefix_caching": self.prefix_caching,
+            "subset_requests": self.subset_requests,
+            "full_requests": self.full_requests,
+            "prefill_tokens": self.prefill_tokens,
+            "full_list_prefill_tokens": self.full_prefill_tokens,
+        }
+
+    @staticmethod
+    def _last_user_text(messages: list[dict]) -> str | None:
+        for message in reversed(messages):
+            if message.get("role") == "user":
+                content = message.get("content")
+                return content if isinstance(content, str) else None
+        return None
+
+
+async def warm_up_prefix_cache(
+    base_url: str, api_key: str, model: str, tools: list[ChatCompletionToolParam]
+) -> None:
+    """Pre-fill the vLLM prefix cache with the system prompt and tool definitions."""
+    client = AsyncOpenAI(base_url=base_url, api_key=api_key)
+    await client.chat.completions.create(
+        model=model,
+        messages=[{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": ""}],
+        tools=tools,
+        max_tokens=1,
+    )
@@ -0,0 +1,209 @@
+"""Deterministic fast path for simple AC commands that skips the LLM round-trip."""
+
+import os
+import re
+import json
+import uuid
+import logging
+from dataclasses import dataclass
+
+from pipecat.frames.frames import Frame, TTSSpeakFrame, TranscriptionFrame
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+
+from src.llm.state import current_vehicle_id
+from src.llm.tools.registry import registry
+
+logger = logging.getLogger(__name__)
+
+FAST_PATH_COMMANDS = os.getenv("FAST_PATH_COMMANDS", "true").lower() == "true"
+
+_UNITS = {
+    "zero": 0,
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+    "eleven": 11,
+    "twelve": 12,
+    "thirteen": 13,
+    "fourteen": 14,
+    "fifteen": 15,
+    "sixteen": 16,
+    "seventeen": 17,
+    "eighteen": 18,
+    "nineteen": 19,
+}
+_TENS = {"twenty": 20, "thirty": 30}
+
+_NUMBER = (
+    rf"\d{{1,2}}|(?:{'|'.join(_TENS)})(?: (?:{'|'.join(list(_UNITS)[1:10])}))?"
+    rf"|{'|'.join(sorted(_UNITS, key=len, reverse=True))}"
+)
+
+# Politeness around the command, e.g. "hey, could you set the fan to 3 please"
+_PREFIX = r"(?:(?:hey|ok|okay|please|can you|could you|would you|will you) )*"
+_SUFFIX = r"(?: (?:please|thanks|thank you|now))*"
+
+_COMMANDS = {
+    "set_fan_speed": [
+        rf"(?:set|turn|change|put) (?:the )?fan(?: speed)?(?: up| down)? (?:to|at) "
+        rf"(?P<n>{_NUMBER})",
+        rf"fan(?: speed)?(?: to| at)? (?P<n>{_NUMBER})",
+        r"(?:turn|switch) (?P<off>off) (?:the )?fan",
+        r"(?:turn|switch) (?:the )?fan (?P<off>off)",
+        r"fan (?P<off>off)",
+    ],
+    "set_temp": [
+        rf"(?:set|turn|change|put) (?:the )?(?:temperature|temp|ac)(?: up| down)? (?:to|at) "
+        rf"(?P<n>{_NUMBER})(?: degrees?)?(?: celsius)?",
+        rf"(?:temperature|temp)(?: to| at)? (?P<n>{_NUMBER})(?: degrees?)?(?: celsius)?",
+    ],
+    "front_windshield_defroster": [
+        r"(?:turn|switch) (?P<state>on|off) (?:the )?(?:front )?(?:windshield )?"
+        r"(?:defrost|defroster|defogger)",
+        r"(?:turn|switch) (?:the )?(?:front )?(?:windshield )?(?:defrost|defroster|defogger) "
+        r"(?P<state>on|off)",
+        r"(?:front )?(?:windshield )?(?:defrost|defroster|defogger) (?P<state>on|off)",
+    ],
+}
+
+# The whole utterance must be the command, anything more goes to the LLM
+COMMAND_GRAMMAR = [
+    (tool, re.compile(rf"{_PREFIX}(?:{pattern}){_SUFFIX}"))
+    for tool, patterns in _COMMANDS.items()
+    for pattern in patterns
+]
+
+CONFIRMATION_TEMPLATES = {
+    "set_fan_speed": "Okay, fan speed is now {fan_speed}.",
+    "set_temp": "Okay, temperature set to {temperature} degrees.",
+    "front_windshield_defroster": "Okay, front defrost is {front_defrost}.",
+}
+
+
+_DECIMAL = re.compile(r"\d[.,]\d")
+
+
+def _parse_number(text: str) -> int:
+    if text.isdigit():
+        return int(text)
+    words = text.split()
+    if words[0] in _TENS:
+        return _TENS[words[0]] + (_UNITS[words[1]] if len(words) > 1 else 0)
+    return _UNITS[text]
+
+
+def normalize_utterance(text: str) -> str:
+    """Lowercase the transcript and drop punctuation, ASR output varies in both."""
+    text = text.lower().replace("a/c", "ac").replace("°", " degrees ")
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+@dataclass
+class FastPathCommand:
+    tool: str
+    args: dict
+
+
+def parse_command(text: str) -> FastPathCommand | None:
+    """Match the utterance against the command grammar, None unless it is unambiguous."""
+    if _DECIMAL.search(text):
+        # The LLM rounds decimals as the tool schemas ask, e.g. "fan speed to 3.5"
+        return None
+    text = normalize_utterance(text)
+    for tool, pattern in COMMAND_GRAMMAR:
+        match = pattern.fullmatch(text)
+        if match is None:
+            continue
+        groups = match.groupdict()
+        if tool == "set_fan_speed":
+            fan_speed = 0 if groups.get("off") else _parse_number(groups["n"])
+            return FastPathCommand(tool, {"fan_speed": fan_speed})
+        if tool == "set_temp":
+            return FastPathCommand(tool, {"temp": _parse_number(groups["n"])})
+        return FastPathCommand(tool, {"status": groups["state"] == "on"})
+    return None
+
+
+class FastPathProcessor(FrameProcessor):
+    """Runs simple AC commands directly, without waiting for the LLM.
+
+    Placed after transcript synchronization. A final transcription that fully matches
+    `COMMAND_GRAMMAR` runs the registered tool, speaks a templated confirmation and is
+    not passed on, so neither the filler nor the LLM sees it. The user message, the tool
+    call, its result and the confirmation are appended to the context as if the LLM had
+    made the call, so later turns see a consistent history. Everything else, including
+    commands whose tool fails, continues to the LLM.
+
+    Args:
+        context: The LLM context of the pipeline.
+        vehicle_id: Vehicle the commands act on.
+    """
+
+    def __init__(
+        self, context: OpenAILLMContext, vehicle_id: str, enabled: bool = FAST_PATH_COMMANDS
+    ):
+        super().__init__()
+        self._context = context
+        self._vehicle_id = vehicle_id
+        self.enabled = enabled
+        self.handled = 0
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection) -> None:
+        await super().process_frame(frame, direction)
+
+        if (
+            self.enabled
+            and direction == FrameDirection.DOWNSTREAM
+            and isinstance(frame, TranscriptionFrame)
+            and frame.text
+        ):
+            command = parse_command(frame.text)
+            if command is not None and await self._run(frame.text, command):
+                return
+
+        await self.push_frame(frame, direction)
+
+    async def _run(self, text: str, command: FastPathCommand) -> bool:
+        tool = registry.get(command.tool)
+        token = current_vehicle_id.set(self._vehicle_id)
+        try:
+            # The plan gives the clamped values the confirmation reports
+            updates, _ = tool.plan(tool.coerce(command.args))
+            result = await registry.call(command.tool, command.args)
+        except Exception as e:
+            logger.warning(f"⚠️ Fast path for '{text}' failed, falling back to the LLM: {e}")
+            return False
+        finally:
+            current_vehicle_id.reset(token)
+
+        confirmation = CONFIRMATION_TEMPLATES[command.tool].format(
+            **updates, front_defrost="on" if updates.get("front_defrost_on") else "off"
+        )
+        tool_call_id = f"fast_path_{uuid.uuid4().hex[:12]}"
+        self._context.add_messages([
+            {"role": "user", "content": text},
+            {
+                "role": "assistant",
+                "tool_calls": [
+                    {
+                        "id": tool_call_id,
+                        "type": "function",
+                        "function": {"name": command.tool, "arguments": json.dumps(command.args)},
+                    }
+                ],
+            },
+            {"role": "tool", "content": json.dumps(result), "tool_call_id": tool_call_id},
+            {"role": "assistant", "content": confirmation},
+        ])
+        self.handled += 1
+        logger.info(f"⚡ Fast path ran {command.tool}({command.args}) for '{text}'")
+        await self.push_frame(TTSSpeakFrame(confirmation))
+        return True
@@ -0,0 +1,104 @@
+"""Keyword-based intent detection shared by the filler processor and tool selection."""
+
+import re
+from dataclasses import field, dataclass
+
+# Keyword groups in priority order, matched as whole words in any letter case
+INTENT_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "temperature": (
+        "temperature",
+        "temp",
+        "hot",
+        "cold",
+        "climate",
+        "ac",
+        "warmer",
+        "cooler",
+        "heat",
+        "cool",
+        "air conditioning",
+        "a/c",
+        "aircon",
+        "air con",
+    ),
+    "fan": ("fan", "air", "blow", "blower", "windy", "breeze", "airflow"),
+    "defrost": ("defrost", "windshield", "window", "front", "glass", "ice"),
+    "navigation": ("navigate", "directions", "map", "route"),
+}
+
+# Plurals and simple inflections, e.g. "fans", "heating", "windows"
+_SUFFIX = r"(?:s|es|ing|ed|er)?"
+
+# Keyword to intent, a keyword listed twice belongs to the higher-priority intent
+_KEYWORD_INTENTS: dict[str, str] = {}
+for _intent, _keywords in INTENT_KEYWORDS.items():
+    for _keyword in _keywords:
+        _KEYWORD_INTENTS.setdefault(_keyword, _intent)
+
+
+def _trie_regex(words: list[str]) -> str:
+    """Alternation of the words factored by common prefix, e.g. `c(?:old|ool(?:er)?)`.
+
+    Python's regex engine tries the branches of an alternation one by one, so factoring
+    them makes every position cost at most one branch per character.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # Quantifiers are greedy, so the longest keyword is tried first
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+INTENT_PATTERN = re.compile(rf"(?<!\w)({_trie_regex(list(_KEYWORD_INTENTS))}){_SUFFIX}(?!\w)")
+_PRIORITY = {intent: index for index, intent in enumerate(INTENT_KEYWORDS)}
+
+
+@dataclass
+class IntentMatch:
+    """Result of matching a transcript against the intent keywords.
+
+    Attributes:
+        intent: Highest-priority intent found, None when no keyword occurs.
+        intents: Every intent found, in priority order.
+        spans: `(intent, start, end)` of every matched keyword, in text order.
+    """
+
+    intent: str | None = None
+    intents: list[str] = field(default_factory=list)
+    spans: list[tuple[str, int, int]] = field(default_factory=list)
+
+
+def match_intent(text: str) -> IntentMatch:
+    """Find the intent keywords in the text with one pass of `INTENT_PATTERN`.
+
+    Matching runs on the lowercased text, which for ASCII has the same offsets.
+    """
+    text = text.lower()
+    match = INTENT_PATTERN.search(text)
+    # Most transcripts match nothing, and a failed search is cheaper than finditer
+    if match is None:
+        return IntentMatch()
+    spans = []
+    while match is not None:
+        spans.append((_KEYWORD_INTENTS[match.group(1)], match.start(), match.end()))
+        match = INTENT_PATTERN.search(text, match.end())
+    if len(spans) == 1:
+        return IntentMatch(intent=spans[0][0], intents=[spans[0][0]], spans=spans)
+    intents = sorted({intent for intent, _, _ in spans}, key=_PRIORITY.__getitem__)
+    return IntentMatch(intent=intents[0], intents=intents, spans=spans)
+
+
+def detect_intents(text: str) -> list[str]:
+    """Return every intent whose keywords occur in the text, in priority order."""
+    return match_intent(text).intents
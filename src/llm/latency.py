@@ -0,0 +1,110 @@
+"""Rolling time-to-first-token statistics of the LLM backends."""
+
+import os
+import time
+from collections import deque
+
+from pipecat.frames.frames import (
+    Frame,
+    LLMTextFrame,
+    LLMFullResponseEndFrame,
+    LLMFullResponseStartFrame,
+    FunctionCallInProgressFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+LLM_TTFT_WINDOW = int(os.getenv("LLM_TTFT_WINDOW", "50"))
+
+
+class RollingLatency:
+    """The last `window` latency samples of one backend."""
+
+    def __init__(self, window: int = LLM_TTFT_WINDOW):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+    def to_dict(self) -> dict:
+        def ms(value: float | None) -> float | None:
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "samples": len(self._samples),
+            "p50_ms": ms(self.percentile(0.5)),
+            "p90_ms": ms(self.percentile(0.9)),
+            "last_ms": ms(self._samples[-1] if self._samples else None),
+        }
+
+
+class TTFTStats:
+    """Process-wide time-to-first-token samples, keyed by LLM backend."""
+
+    def __init__(self, window: int = LLM_TTFT_WINDOW):
+        self.window = window
+        self._backends: dict[str, RollingLatency] = {}
+
+    def observe(self, backend: str, seconds: float) -> None:
+        latency = self._backends.get(backend)
+        if latency is None:
+            latency = self._backends[backend] = RollingLatency(self.window)
+        latency.observe(seconds)
+
+    def predict(self, backend: str, q: float = 0.75) -> float | None:
+        """Expected time to first token, None until the backend has answered once."""
+        latency = self._backends.get(backend)
+        return latency.percentile(q) if latency is not None else None
+
+    def to_dict(self) -> dict[str, dict]:
+        return {backend: latency.to_dict() for backend, latency in self._backends.items()}
+
+
+ttft_stats = TTFTStats()
+
+
+class LLMResponseMonitor(FrameProcessor):
+    """Placed right after the LLM, records the time to its first token for `backend`.
+
+    The time runs from the start of a response to its first text or tool call.
+    `answers` counts the responses that started speaking, so the filler can tell whether
+    the answer arrived while it was waiting.
+
+    Args:
+        backend: Name the samples are recorded under, e.g. the model name.
+        stats: Statistics shared by all pipelines.
+    """
+
+    def __init__(self, backend: str, stats: TTFTStats = ttft_stats):
+        super().__init__()
+        self.backend = backend
+        self.stats = stats
+        self.answers = 0
+        self._started_at: float | None = None
+        self._answered = False
+
+    def predicted_ttft(self) -> float | None:
+        return self.stats.predict(self.backend)
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection) -> None:
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, LLMFullResponseStartFrame):
+            self._started_at = time.perf_counter()
+            self._answered = False
+        elif isinstance(frame, (LLMTextFrame, FunctionCallInProgressFrame)):
+            if self._started_at is not None:
+                self.stats.observe(self.backend, time.perf_counter() - self._started_at)
+                self._started_at = None
+            if isinstance(frame, LLMTextFrame) and not self._answered:
+                self._answered = True
+                self.answers += 1
+        elif isinstance(frame, LLMFullResponseEndFrame):
+            self._started_at = None
+
+        await self.push_frame(frame, direction)
@@ -9,7 +9,7 @@ Below is the core rules you should follow in the interaction with the users.
 - Keep the response within twenty words.
 - Ignore incomplete utterances like "hey", "uh", "hmm", "mm" without context - simply say "How can I help you?"
 - No special characters (#@) in responses - text will be read by TTS
-- The car status can be traced in the context
+- The current car status is the system message right before the latest user message. It is always up to date, car settings mentioned earlier in the conversation may be stale
 - If user said the current setting is their favorite one or he/she want you to remember the setting (fan, AC and defrost), please remember the current setting. After that, everytime user wants to reset/set the car system to favorite setting, please use tools to adjust fan, AC and defrost to the favorite setting you just replied.
 
 
@@ -43,14 +43,22 @@ You should:
 ## At the end of the conversation
 - Wish the user have a great day with proper politeness
 
-Now, below is the current car status that you can directly refer to:
+Please provide a comfortable driving experience for the user by request.
+"""
+
+# Identical for every stream, so vLLM can reuse the cached prefix across streams and turns
+SYSTEM_PROMPT = SYSTEM_PROMPT_TEMPLATE.format(vllm_chat_prompt_fix=VLLM_CHAT_PROMPT_FIX)
+
+# Live status, kept in a small message after the static prefix and updated in place
+CAR_STATUS_PROMPT_TEMPLATE = """Now, below is the current car status that you can directly refer to:
 AC temperature: {current_temp}°C
 Fan speed: {current_fan_speed}
 Windshield defrost: {current_front_defrost}
-
-Please provide a comfortable driving experience for the user by request.
 """
 
+# Earlier turns folded out of the context window
+CONTEXT_SUMMARY_PROMPT_TEMPLATE = """Summary of the earlier conversation: {summary}"""
+
 
 BROADCAST_PROMPT_TEMPLATE = """Please report exactly: `{message}` without any other information."""
 
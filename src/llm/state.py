@@ -0,0 +1,365 @@
+"""Async access to the per-vehicle `ac_settings` state rows."""
+
+import os
+import json
+import asyncio
+import logging
+import contextlib
+from contextvars import ContextVar
+from dataclasses import field, dataclass
+from collections.abc import Callable
+
+import psycopg2
+
+from src.llm.connects import PG_CONN_STRING, PostgresPool
+from src.llm.vehicles import STREAM_VEHICLE_PREFIX
+
+logger = logging.getLogger(__name__)
+
+AC_SETTINGS_CHANNEL = "ac_settings_changed"
+AC_SETTINGS_POLL_INTERVAL = float(os.getenv("AC_SETTINGS_POLL_INTERVAL", "0.5"))
+AC_SETTINGS_WRITE_BEHIND = os.getenv("AC_SETTINGS_WRITE_BEHIND", "false").lower() == "true"
+AC_SETTINGS_WRITE_DELAY = float(os.getenv("AC_SETTINGS_WRITE_DELAY", "0.5"))
+# Stream-scoped rows untouched for `AC_SETTINGS_STREAM_TTL` seconds are left over by a
+# process that died before its streams ended, they are swept every `..._SWEEP_INTERVAL`
+AC_SETTINGS_SWEEP_INTERVAL = float(os.getenv("AC_SETTINGS_SWEEP_INTERVAL", "600"))
+AC_SETTINGS_STREAM_TTL = float(os.getenv("AC_SETTINGS_STREAM_TTL", "3600"))
+
+# Row new vehicles are seeded from, see `migrations/002_ac_settings_vehicle_id.sql`
+DEFAULT_VEHICLE_ID = "default"  # keep in sync with `ac_settings_insert`
+
+# Vehicle the running tool call acts on, set by `handle_function` for each pipeline
+current_vehicle_id: ContextVar[str] = ContextVar("current_vehicle_id", default=DEFAULT_VEHICLE_ID)
+
+AC_SETTINGS_STATEMENTS = {
+    "ac_settings_select": (
+        "SELECT temperature, fan_speed, front_defrost_on FROM ac_settings WHERE vehicle_id = $1"
+    ),
+    "ac_settings_select_many": (
+        "SELECT vehicle_id, temperature, fan_speed, front_defrost_on FROM ac_settings"
+        " WHERE vehicle_id = ANY($1::text[])"
+    ),
+    "ac_settings_insert": (
+        "INSERT INTO ac_settings (vehicle_id, temperature, fan_speed, front_defrost_on)"
+        " SELECT $1, temperature, fan_speed, front_defrost_on FROM ac_settings"
+        " WHERE vehicle_id = 'default'"
+        " ON CONFLICT (vehicle_id) DO NOTHING"
+    ),
+    # Rows of vehicles that only lived as long as their stream, never the seed row
+    "ac_settings_delete": (
+        "DELETE FROM ac_settings WHERE vehicle_id = $1 AND vehicle_id <> 'default'"
+    ),
+    # NULL leaves a column untouched, so one statement covers every combination of updates
+    "ac_settings_update": (
+        "UPDATE ac_settings SET"
+        " temperature = COALESCE($2::integer, temperature),"
+        " fan_speed = COALESCE($3::integer, fan_speed),"
+        " front_defrost_on = COALESCE($4::boolean, front_defrost_on),"
+        " updated_at = now()"
+        " WHERE vehicle_id = $1"
+    ),
+    # See `migrations/003_ac_settings_updated_at.sql`
+    "ac_settings_touch": (
+        "UPDATE ac_settings SET updated_at = now() WHERE vehicle_id = ANY($1::text[])"
+    ),
+    "ac_settings_sweep": (
+        "DELETE FROM ac_settings WHERE starts_with(vehicle_id, $1)"
+        " AND updated_at < now() - make_interval(secs => $2)"
+    ),
+}
+AC_SETTINGS_FIELDS = ("temperature", "fan_speed", "front_defrost_on")
+
+pg_pool = PostgresPool(statements=AC_SETTINGS_STATEMENTS)
+
+
+async def get_ac_settings(vehicle_id: str) -> dict | None:
+    """Read the AC settings of a vehicle, creating its row from the default on first use."""
+    row = await pg_pool.fetchone("ac_settings_select", vehicle_id)
+    if row is None:
+        await pg_pool.execute("ac_settings_insert", vehicle_id)
+        row = await pg_pool.fetchone("ac_settings_select", vehicle_id)
+        if row is None:
+            return None
+    return dict(zip(AC_SETTINGS_FIELDS, row, strict=True))
+
+
+async def get_many_ac_settings(vehicle_ids: list[str]) -> dict[str, dict]:
+    """Read the AC settings of several vehicles with one query."""
+    rows = await pg_pool.fetchall("ac_settings_select_many", vehicle_ids)
+    return {row[0]: dict(zip(AC_SETTINGS_FIELDS, row[1:], strict=True)) for row in rows}
+
+
+async def update_ac_settings(
+    vehicle_id: str,
+    temperature: int | None = None,
+    fan_speed: int | None = None,
+    front_defrost_on: bool | None = None,
+) -> None:
+    """Update any subset of a vehicle's AC settings in a single statement."""
+    await pg_pool.execute(
+        "ac_settings_update", vehicle_id, temperature, fan_speed, front_defrost_on
+    )
+
+
+async def delete_ac_settings(vehicle_id: str) -> None:
+    """Delete a vehicle's row, the default vehicle is kept."""
+    await pg_pool.execute("ac_settings_delete", vehicle_id)
+
+
+async def sweep_stream_ac_settings(live_vehicle_ids: list[str], ttl: float) -> None:
+    """Delete the stream-scoped rows idle for `ttl` seconds, except the live ones."""
+    if live_vehicle_ids:
+        await pg_pool.execute("ac_settings_touch", live_vehicle_ids)
+    await pg_pool.execute("ac_settings_sweep", STREAM_VEHICLE_PREFIX, ttl)
+
+
+@dataclass
+class _VehicleEntry:
+    settings: dict | None = None
+    pending: dict = field(default_factory=dict)
+    subscribers: list[Callable[[dict], None]] = field(default_factory=list)
+    load_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    flush_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    flush_task: asyncio.Task | None = None
+
+
+class ACSettingsCache:
+    """Process-wide, write-through cache of the `ac_settings` rows, keyed by vehicle.
+
+    Reads are served from memory. Writes go to Postgres first and then update the cached
+    copy. Every vehicle has its own row, so concurrent streams never wait on each other's
+    row lock. Changes made by other writers arrive through `LISTEN/NOTIFY` on
+    `AC_SETTINGS_CHANNEL` (see `migrations/001_ac_settings_notify.sql`); if the database
+    does not support it, the cached rows are polled every `poll_interval` seconds instead.
+
+    Subscribers registered with `subscribe()` are called with the new settings whenever
+    the cached value of their vehicle changes.
+
+    With `write_behind`, `update()` only records the desired state in memory and returns
+    at once. Pending changes are coalesced and written with a single UPDATE `write_delay`
+    seconds after the first of them, or earlier by `flush()`. Rapid toggles such as
+    "fan on, fan off, fan on" then cost one write of the final state.
+
+    Rows of stream-scoped vehicles are deleted by `release()`. Every `sweep_interval`
+    seconds the rows this process still uses are touched and any stream-scoped row idle
+    for `stream_ttl` seconds is deleted, which cleans up after processes that died.
+    """
+
+    def __init__(
+        self,
+        conn_string: str = PG_CONN_STRING,
+        channel: str = AC_SETTINGS_CHANNEL,
+        poll_interval: float = AC_SETTINGS_POLL_INTERVAL,
+        write_behind: bool = AC_SETTINGS_WRITE_BEHIND,
+        write_delay: float = AC_SETTINGS_WRITE_DELAY,
+        sweep_interval: float = AC_SETTINGS_SWEEP_INTERVAL,
+        stream_ttl: float = AC_SETTINGS_STREAM_TTL,
+    ):
+        self.conn_string = conn_string
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.write_behind = write_behind
+        self.write_delay = write_delay
+        self.sweep_interval = sweep_interval
+        self.stream_ttl = stream_ttl
+        self._vehicles: dict[str, _VehicleEntry] = {}
+        self._sync_task: asyncio.Task | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self._sweep_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Load the default vehicle and start following external changes."""
+        await self.get(DEFAULT_VEHICLE_ID)
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync())
+        if self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep())
+
+    async def stop(self) -> None:
+        await self.flush()
+        for task in (self._sync_task, self._sweep_task):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        self._sync_task = self._sweep_task = None
+
+    def _entry(self, vehicle_id: str) -> _VehicleEntry:
+        entry = self._vehicles.get(vehicle_id)
+        if entry is None:
+            entry = self._vehicles[vehicle_id] = _VehicleEntry()
+        return entry
+
+    async def get(self, vehicle_id: str) -> dict | None:
+        """Return a copy of the vehicle's cached settings, loading them on first use."""
+        entry = self._entry(vehicle_id)
+        if entry.settings is None:
+            async with entry.load_lock:
+                if entry.settings is None:
+                    await self.refresh(vehicle_id)
+        return dict(entry.settings) if entry.settings is not None else None
+
+    async def refresh(self, vehicle_id: str) -> None:
+        self._apply(vehicle_id, await get_ac_settings(vehicle_id))
+
+    async def refresh_all(self) -> None:
+        if not self._vehicles:
+            return
+        for vehicle_id, settings in (await get_many_ac_settings(list(self._vehicles))).items():
+            self._apply(vehicle_id, settings)
+
+    async def update(self, vehicle_id: str, **fields: int | bool | None) -> None:
+        """Write the given fields through to Postgres and the cache."""
+        fields = {key: value for key, value in fields.items() if value is not None}
+        # Loading the vehicle also creates its row, so the UPDATE below never misses
+        await self.get(vehicle_id)
+        entry = self._entry(vehicle_id)
+        if not self.write_behind:
+            await update_ac_settings(vehicle_id, **fields)
+            self._apply(vehicle_id, {**(entry.settings or {}), **fields})
+            return
+
+        entry.pending.update(fields)
+        self._apply(vehicle_id, {**(entry.settings or {}), **fields})
+        if entry.flush_task is None or entry.flush_task.done():
+            entry.flush_task = asyncio.create_task(self._flush_later(vehicle_id))
+
+    async def flush(self, vehicle_id: str | None = None) -> None:
+        """Write the pending changes of one vehicle, or of every vehicle, now."""
+        vehicle_ids = list(self._vehicles) if vehicle_id is None else [vehicle_id]
+        for vehicle_id in vehicle_ids:
+            entry = self._vehicles.get(vehicle_id)
+            if entry is None:
+                continue
+            async with entry.flush_lock:
+                if not entry.pending:
+                    continue
+                pending, entry.pending = entry.pending, {}
+                try:
+                    await update_ac_settings(vehicle_id, **pending)
+                except Exception:
+                    # Keep them for the next flush, newer changes take precedence
+                    entry.pending = {**pending, **entry.pending}
+                    raise
+
+    async def release(self, vehicle_id: str, delete: bool = False) -> None:
+        """Flush a vehicle and drop it from memory once no stream follows it.
+
+        With `delete`, the vehicle's row is deleted instead of flushed once no stream
+        follows it, for vehicles that only exist for the lifetime of one stream.
+        """
+        entry = self._vehicles.get(vehicle_id)
+        if delete and vehicle_id != DEFAULT_VEHICLE_ID and not (entry and entry.subscribers):
+            if entry is not None:
+                if entry.flush_task is not None:
+                    entry.flush_task.cancel()
+                del self._vehicles[vehicle_id]
+            await delete_ac_settings(vehicle_id)
+            return
+
+        await self.flush(vehicle_id)
+        entry = self._vehicles.get(vehicle_id)
+        if (
+            vehicle_id != DEFAULT_VEHICLE_ID
+            and entry is not None
+            and not entry.subscribers
+            and not entry.pending
+        ):
+            del self._vehicles[vehicle_id]
+
+    async def _flush_later(self, vehicle_id: str) -> None:
+        # Changes made while a flush is writing are left pending, write them too
+        while (entry := self._vehicles.get(vehicle_id)) is not None and entry.pending:
+            await asyncio.sleep(self.write_delay)
+            try:
+                await self.flush(vehicle_id)
+            except Exception as e:
+                logger.error(
+                    f"❌ Failed to write AC settings, retrying in {self.write_delay}s: {e}"
+                )
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            live = [v for v in self._vehicles if v.startswith(STREAM_VEHICLE_PREFIX)]
+            try:
+                await sweep_stream_ac_settings(live, self.stream_ttl)
+            except Exception as e:
+                logger.error(f"❌ Failed to sweep stream-scoped AC settings: {e}")
+
+    def subscribe(self, vehicle_id: str, callback: Callable[[dict], None]) -> Callable[[], None]:
+        """Register a change callback and return a function that unregisters it."""
+        subscribers = self._entry(vehicle_id).subscribers
+        subscribers.append(callback)
+        return lambda: subscribers.remove(callback)
+
+    def _apply(self, vehicle_id: str, settings: dict | None) -> None:
+        entry = self._vehicles.get(vehicle_id)
+        if settings is None or entry is None:
+            return
+        # Unflushed local changes are newer than anything read from the database
+        settings = {**settings, **entry.pending}
+        if settings == entry.settings:
+            return
+        entry.settings = settings
+        for callback in list(entry.subscribers):
+            try:
+                callback(dict(settings))
+            except Exception as e:
+                logger.error(f"❌ AC settings subscriber failed: {e}")
+
+    async def _sync(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ LISTEN {self.channel} unavailable, polling instead: {e}")
+                await self._poll()
+
+    async def _listen(self) -> None:
+        conn = await asyncio.to_thread(psycopg2.connect, self.conn_string)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        loop = asyncio.get_running_loop()
+        notified = asyncio.Event()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {self.channel}")
+            # Re-read once after LISTEN so nothing written before it is missed
+            await self.refresh_all()
+            loop.add_reader(conn.fileno(), notified.set)
+            logger.info(f"👂 Listening for AC settings changes on '{self.channel}'")
+            while True:
+                await notified.wait()
+                notified.clear()
+                conn.poll()
+                while conn.notifies:
+                    self._on_notify(conn.notifies.pop(0).payload)
+        finally:
+            loop.remove_reader(conn.fileno())
+            conn.close()
+
+    def _on_notify(self, payload: str) -> None:
+        try:
+            row = json.loads(payload)
+            vehicle_id = row["vehicle_id"]
+            settings = {name: row[name] for name in AC_SETTINGS_FIELDS}
+        except (ValueError, KeyError, TypeError):
+            # Payload is not the row itself, fall back to reading every cached vehicle
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self.refresh_all())
+            return
+        self._apply(vehicle_id, settings)
+
+    async def _poll(self) -> None:
+        # Retry LISTEN now and then, a restarted database may support it again
+        for _ in range(max(1, int(60 / self.poll_interval))):
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh_all()
+            except Exception as e:
+                logger.error(f"❌ Failed to poll AC settings: {e}")
+
+
+ac_settings_cache = ACSettingsCache()
@@ -0,0 +1,95 @@
+"""TTL + LRU result cache for read-only tools."""
+
+import json
+import time
+from typing import Any
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable, Awaitable
+
+
+def normalize_args(args: dict) -> str:
+    """Cache key for tool arguments, insensitive to key order, case and extra whitespace."""
+
+    def normalize(value: Any) -> Any:
+        if isinstance(value, str):
+            return " ".join(value.lower().split())
+        if isinstance(value, dict):
+            return {key: normalize(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [normalize(item) for item in value]
+        return value
+
+    return json.dumps(normalize(args), sort_keys=True, ensure_ascii=False)
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Mark the exception as retrieved when every caller stopped waiting for it
+    if not task.cancelled():
+        task.exception()
+
+
+class ToolResultCache:
+    """Size-bounded LRU cache whose entries expire after `ttl` seconds.
+
+    Concurrent calls with the same arguments are de-duplicated: only the first one runs
+    the tool, the others await its result. The tool runs in a task of its own, so the
+    callers waiting for it can be cancelled independently. Failed calls are not cached.
+
+    Args:
+        ttl: Seconds a result stays valid.
+        maxsize: Maximum number of cached results, the least recently used is evicted.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+    async def get_or_call(self, args: dict, call: Callable[[], Awaitable[Any]]) -> Any:
+        key = normalize_args(args)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            del self._entries[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            task = asyncio.create_task(self._call(key, call))
+            task.add_done_callback(_retrieve_exception)
+            self._in_flight[key] = task
+        # A waiter that is cancelled, e.g. by an interruption, leaves the call running
+        return await asyncio.shield(task)
+
+    async def _call(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await call()
+        finally:
+            del self._in_flight[key]
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def to_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -1,6 +1,7 @@
 from openai.types.chat import ChatCompletionToolParam
 
-from src.llm.connects import pg_connect
+from src.llm.state import ac_settings_cache, current_vehicle_id
+from src.llm.tools.registry import registry
 
 # Tool parameter definition
 set_fan_speed_tool = ChatCompletionToolParam(
@@ -22,26 +23,28 @@ set_fan_speed_tool = ChatCompletionToolParam(
 )
 
 
-def get_fan_speed():
-    cur = pg_connect()
-    try:
-        cur.execute("SELECT fan_speed FROM ac_settings")
-        result = cur.fetchone()
-        if result:
-            return result[0]
-        return None
-    finally:
-        cur.close()
-
-
-async def set_fan_speed_response(args) -> str:
+def plan_set_fan_speed(args: dict) -> tuple[dict, str]:
+    """Clamp the arguments and return the ac_settings update with its response."""
     fan_upper_limit = 5
     fan_lower_limit = 0
     fan_speed = int(args["fan_speed"])  # Directly convert to integer
     fan_speed = max(min(fan_speed, fan_upper_limit), fan_lower_limit)
+    return (
+        {"fan_speed": fan_speed},
+        f"The fan speed was set successfully. Current Fan speed: {fan_speed}",
+    )
+
 
-    cur = pg_connect()
-    cur.execute("UPDATE ac_settings SET fan_speed = %s", (fan_speed,))
-    cur.connection.commit()
-    cur.close()
-    return f"The fan speed was set successfully. Current Fan speed: {fan_speed}"
+async def set_fan_speed_response(args) -> str:
+    updates, response = plan_set_fan_speed(args)
+    await ac_settings_cache.update(current_vehicle_id.get(), **updates)
+    return response
+
+
+# Cold, hot and AC on/off requests also adjust the fan, see rules f, g and h of the prompt
+registry.register(
+    set_fan_speed_tool,
+    set_fan_speed_response,
+    plan=plan_set_fan_speed,
+    intents=("fan", "temperature"),
+)
@@ -1,6 +1,7 @@
 from openai.types.chat import ChatCompletionToolParam
 
-from src.llm.connects import pg_connect
+from src.llm.state import ac_settings_cache, current_vehicle_id
+from src.llm.tools.registry import registry
 
 # Tool parameter definition
 front_defrost_on_tool = ChatCompletionToolParam(
@@ -22,35 +23,25 @@ front_defrost_on_tool = ChatCompletionToolParam(
 )
 
 
-def get_front_defrost_status() -> str | None:
-    cur = pg_connect()
-    try:
-        cur.execute("SELECT front_defrost_on FROM ac_settings")
-        result = cur.fetchone()
-        if result:
-            return "on" if result[0] else "off"
-        return None
-    finally:
-        cur.close()
+def plan_front_defrost(args: dict) -> tuple[dict, str]:
+    """Return the ac_settings update with its response.
+
+    `status` is already coerced to a bool by the registry, including "true"/"false" strings.
+    """
+    status = args["status"]
+    return (
+        {"front_defrost_on": status},
+        f"Finished front defrost settings. Current Windshield defrost: {'on' if status else 'off'}.",
+    )
 
 
 # 除霜開關
 async def front_defrost_on_response(args) -> str:
-    status = args["status"]
+    updates, response = plan_front_defrost(args)
+    await ac_settings_cache.update(current_vehicle_id.get(), **updates)
+    return response
 
-    # handle string inputs for boolean
-    if isinstance(status, str):
-        if status.lower() == "true":
-            status = True
-        elif status.lower() == "false":
-            status = False
-
-    # ensure status is boolean
-    if not isinstance(status, bool):
-        raise TypeError("Front defrost must be Boolean.")
-
-    cur = pg_connect()
-    cur.execute("UPDATE ac_settings SET front_defrost_on = %s", (status,))
-    cur.connection.commit()
-    cur.close()
-    return f"Finished front defrost settings. Current Windshield defrost: {'on' if status else 'off'}."
+
+registry.register(
+    front_defrost_on_tool, front_defrost_on_response, plan=plan_front_defrost, intents=("defrost",)
+)
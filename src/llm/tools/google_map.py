@@ -1,7 +1,11 @@
+import os
 import random
 
 from openai.types.chat import ChatCompletionToolParam
 
+from src.llm.tools.cache import ToolResultCache
+from src.llm.tools.registry import registry
+
 # Tool parameter definition
 google_map_tool = ChatCompletionToolParam(
     type="function",
@@ -27,3 +31,13 @@ async def google_map_response(args) -> str:
     location = args["location"]
     num = round(random.uniform(1, 10), 1)
     return f"The nearest {location} is {num} kilometers away. I will navigate you to the {location} now. Please follow the directions on the map."
+
+
+# Dispatchable, but not advertised to the LLM
+registry.register(
+    google_map_tool,
+    google_map_response,
+    advertise=False,
+    cache=ToolResultCache(ttl=float(os.getenv("GOOGLE_MAP_CACHE_TTL", "300"))),
+    intents=("navigation",),
+)
@@ -1,38 +1,175 @@
-from .fan import set_fan_speed_response
-from .time import get_time_response
-from .weather import get_weather_response
-from .google_map import google_map_response
-from .temperature import set_temp_response
-from .front_windshield import front_defrost_on_response
+import os
+import time
+from typing import Any
+import asyncio
+from weakref import WeakKeyDictionary
+from dataclasses import field, dataclass
+from collections.abc import Callable, Awaitable
 
+from pipecat.services.ai_services import LLMService
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
 
-async def handle_function(
-    function_name, tool_call_id, args, llm, context, result_callback
-) -> None:
-    if function_name == "front_windshield_defroster":
-        response = await front_defrost_on_response(args)
-        await result_callback(response)
+from src.llm.state import DEFAULT_VEHICLE_ID, ac_settings_cache, current_vehicle_id
+from src.llm.tools.registry import registry
+
+# Importing the tool modules registers them
+from . import fan, weather, google_map, temperature, front_windshield  # noqa: F401
+from . import time as _time_tool  # noqa: F401
+
+TOOL_CALL_BATCHING = os.getenv("TOOL_CALL_BATCHING", "true").lower() == "true"
+TOOL_TURN_TIMEOUT = float(os.getenv("TOOL_TURN_TIMEOUT", "5.0"))
+
+
+ResultCallback = Callable[[Any], Awaitable[None]]
+
+
+@dataclass
+class ToolCallBatch:
+    """Tool calls of one assistant turn, collected until the last one arrives.
+
+    The LLM service announces every tool call of a response through the start callback
+    while it streams, and only invokes the handlers once the response is complete. So by
+    the time the first handler runs, `expected` holds the number of calls in the turn.
+
+    A response that is interrupted after announcing its calls never runs them, so the
+    count restarts with the first announcement of every response. A new response always
+    follows a new context message, `anchor` is the last message of the counted response.
+    """
+
+    vehicle_id: str = DEFAULT_VEHICLE_ID
+    expected: int = 0
+    calls: list[tuple[str, dict, ResultCallback]] = field(default_factory=list)
+    anchor: dict | None = None
+
+    def announce(self, context: OpenAILLMContext) -> None:
+        """Count a tool call announced by the response to `context`."""
+        messages = context.get_messages()
+        anchor = messages[-1] if messages else None
+        if anchor is not self.anchor:
+            # First announcement of a new response, calls left over were never completed
+            self.anchor = anchor
+            self.calls.clear()
+            self.expected = 0
+        self.expected += 1
+
+    async def run(self) -> None:
+        """Run the turn's tool calls concurrently and report each result in call order.
 
-    elif function_name == "set_temp":
-        response = await set_temp_response(args)
-        await result_callback(response)
+        All ac_settings writes depend on the vehicle's row, so they are merged into one
+        UPDATE (one transaction) that runs as a single job. Every other call is
+        independent and runs as its own job. Jobs still running at the turn deadline
+        are cancelled and reported as timed out.
+        """
+        calls, self.calls, self.expected = self.calls, [], 0
+        results: list = [None] * len(calls)
+        start = time.perf_counter()
 
-    elif function_name == "set_fan_speed":
-        response = await set_fan_speed_response(args)
-        await result_callback(response)
+        jobs, ac_job, ac_indexes = self._start_jobs(calls, results, start)
+        if jobs:
+            await self._collect(jobs, calls, results, ac_job)
 
-    elif function_name == "google_map":
-        response = await google_map_response(args)
-        await result_callback(response)
+        # Batched writes share the latency of the combined UPDATE
+        elapsed = time.perf_counter() - start
+        for index in ac_indexes:
+            error = isinstance(results[index], dict)
+            registry.get(calls[index][0]).stats.observe(elapsed, error=error)
+
+        for (_, _, result_callback), result in zip(calls, results, strict=True):
+            await result_callback(result)
+
+    def _start_jobs(
+        self, calls: list[tuple[str, dict, ResultCallback]], results: list, start: float
+    ) -> tuple[dict[asyncio.Task, list[int]], asyncio.Task | None, list[int]]:
+        """Plan the ac_settings writes into one update and start a task per job.
+
+        Returns the jobs with the indexes of the calls they answer, the job of the
+        ac_settings update and the indexes of the calls merged into it. The planned
+        calls' results are filled in right away.
+        """
+        updates = {}
+        ac_indexes = []
+        ac_job = None
+        jobs: dict[asyncio.Task, list[int]] = {}
+        for index, (function_name, args, _) in enumerate(calls):
+            tool = registry.get(function_name)
+            if tool is None or tool.plan is None:
+                jobs[asyncio.create_task(registry.call(function_name, args))] = [index]
+                continue
+            try:
+                update, results[index] = tool.plan(tool.coerce(args))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"❌ Invalid arguments for {function_name}: {e}")
+                tool.stats.observe(time.perf_counter() - start, error=True)
+                results[index] = {"error": f"Invalid arguments for {function_name}: {e}"}
+                continue
+            # Later calls win, e.g. "fan on, fan off, fan on" ends with the fan on
+            updates.update(update)
+            ac_indexes.append(index)
+
+        if updates:
+            ac_job = asyncio.create_task(ac_settings_cache.update(self.vehicle_id, **updates))
+            jobs[ac_job] = ac_indexes
+        return jobs, ac_job, ac_indexes
+
+    @staticmethod
+    async def _collect(
+        jobs: dict[asyncio.Task, list[int]],
+        calls: list[tuple[str, dict, ResultCallback]],
+        results: list,
+        ac_job: asyncio.Task | None,
+    ) -> None:
+        """Wait for the jobs until the turn deadline and store their results."""
+        done, pending = await asyncio.wait(jobs, timeout=TOOL_TURN_TIMEOUT)
+        for task in pending:
+            task.cancel()
+            for index in jobs[task]:
+                function_name = calls[index][0]
+                print(f"❌ {function_name} timed out after {TOOL_TURN_TIMEOUT}s")
+                results[index] = {"error": f"{function_name} timed out"}
+        for task in done:
+            # exception() raises on a cancelled task instead of returning the cancellation
+            error = "cancelled" if task.cancelled() else task.exception()
+            for index in jobs[task]:
+                function_name = calls[index][0]
+                if error is not None:
+                    print(f"❌ {function_name} failed: {error}")
+                    results[index] = {"error": f"Failed to run {function_name}: {error}"}
+                elif task is not ac_job:
+                    # The ac_settings update returns nothing, its calls keep their planned responses
+                    results[index] = task.result()
+
+
+_batches: WeakKeyDictionary = WeakKeyDictionary()
+
+
+async def start_function(function_name: str, llm: LLMService, context: OpenAILLMContext) -> None:
+    """Count the tool calls announced for the current turn."""
+    _batches.setdefault(context, ToolCallBatch()).announce(context)
+
+
+async def handle_function(
+    function_name: str,
+    tool_call_id: str,
+    args: dict,
+    llm: LLMService,
+    context: OpenAILLMContext,
+    result_callback: ResultCallback,
+    vehicle_id: str | None = None,
+) -> None:
+    """Run a tool call for the vehicle of the pipeline that registered this handler.
 
-    elif function_name == "get_current_weather":
-        response = await get_weather_response(args)
-        await result_callback(response)
+    Pipelines bind `vehicle_id` with `functools.partial` when registering the handler.
+    """
+    vehicle_id = vehicle_id or DEFAULT_VEHICLE_ID
+    # Tasks started from here inherit the vehicle, so tool handlers act on the right row
+    current_vehicle_id.set(vehicle_id)
 
-    elif function_name == "get_current_time":
-        response = await get_time_response(args)
-        await result_callback(response)
+    if not TOOL_CALL_BATCHING:
+        await result_callback(await registry.call(function_name, args))
+        return
 
-    else:
-        print(f"❌ Unknown function: {function_name}")
-        await result_callback({"error": f"Unknown function {function_name}"})
+    batch = _batches.setdefault(context, ToolCallBatch())
+    batch.vehicle_id = vehicle_id
+    batch.calls.append((function_name, args, result_callback))
+    if len(batch.calls) >= batch.expected:
+        await batch.run()
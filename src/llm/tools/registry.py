@@ -0,0 +1,208 @@
+"""Registry of the tools the LLM can call.
+
+Every tool module registers its schema and handler once at import. The registry builds an
+argument coercer from the JSON schema at registration time, dispatches calls with a dict
+lookup and records call counts and latency histograms per tool.
+"""
+
+import time
+import bisect
+from typing import Any
+from dataclasses import field, dataclass
+from collections.abc import Callable, Awaitable
+
+from openai.types.chat import ChatCompletionToolParam
+
+from src.llm.tools.cache import ToolResultCache
+
+# Upper bounds of the latency histogram buckets in milliseconds, the last bucket is open
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+@dataclass
+class ToolStats:
+    calls: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    histogram: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        self.calls += 1
+        self.errors += int(error)
+        self.total_seconds += seconds
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+
+    def to_dict(self) -> dict:
+        buckets = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [
+            f">{LATENCY_BUCKETS_MS[-1]}ms"
+        ]
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": round(self.total_seconds / self.calls * 1000, 3) if self.calls else 0.0,
+            "histogram": dict(zip(buckets, self.histogram, strict=True)),
+        }
+
+
+def _coerce_integer(name: str, value: Any) -> int:
+    # LLMs sometimes send numbers as strings, e.g. "3" or "22.0"
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            raise TypeError(f"{name} must be an integer.") from None
+    # The schemas ask the LLM to round, a fraction is not silently truncated
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError(f"{name} must be an integer.")
+    return value
+
+
+def _coerce_boolean(name: str, value: Any) -> bool:
+    # LLMs sometimes send booleans as strings
+    if isinstance(value, str):
+        if value.lower() == "true":
+            return True
+        if value.lower() == "false":
+            return False
+    if not isinstance(value, bool):
+        raise TypeError(f"{name} must be Boolean.")
+    return value
+
+
+def _coerce_string(name: str, value: Any) -> str:
+    return str(value)
+
+
+_COERCERS = {"integer": _coerce_integer, "boolean": _coerce_boolean, "string": _coerce_string}
+
+
+def compile_coercer(schema: ChatCompletionToolParam) -> Callable[[dict], dict]:
+    """Build a function that validates and coerces arguments against the tool schema."""
+    parameters = schema["function"].get("parameters", {})
+    required = tuple(parameters.get("required", ()))
+    properties = []
+    for name, spec in parameters.get("properties", {}).items():
+        coerce = _COERCERS.get(spec.get("type"), lambda _, value: value)
+        enum = frozenset(spec["enum"]) if "enum" in spec else None
+        properties.append((name, coerce, enum))
+
+    def coercer(args: dict) -> dict:
+        missing = [name for name in required if name not in args]
+        if missing:
+            raise ValueError(f"Missing required arguments: {', '.join(missing)}")
+        coerced = dict(args)
+        for name, coerce, enum in properties:
+            if name not in args:
+                continue
+            value = coerce(name, args[name])
+            if enum is not None and value not in enum:
+                raise ValueError(f"{name} must be one of {sorted(enum)}.")
+            coerced[name] = value
+        return coerced
+
+    return coercer
+
+
+@dataclass
+class Tool:
+    """A registered tool.
+
+    Attributes:
+        name: Function name the LLM calls.
+        schema: Tool definition sent to the LLM.
+        handler: Coroutine that runs the tool with coerced arguments.
+        coerce: Argument validator/coercer compiled from the schema.
+        plan: For tools that only write ac_settings, a function returning the column
+            updates and the response, so several calls can share one UPDATE.
+        advertise: Whether the schema is offered to the LLM.
+        cache: Result cache for read-only tools.
+        intents: Intents from `src.llm.intent` the tool is relevant to.
+        stats: Call count and latency histogram.
+    """
+
+    name: str
+    schema: ChatCompletionToolParam
+    handler: Callable[[dict], Awaitable[Any]]
+    coerce: Callable[[dict], dict]
+    plan: Callable[[dict], tuple[dict, str]] | None = None
+    advertise: bool = True
+    cache: ToolResultCache | None = None
+    intents: tuple[str, ...] = ()
+    stats: ToolStats = field(default_factory=ToolStats)
+
+
+class ToolRegistry:
+    def __init__(self):
+        self._tools: dict[str, Tool] = {}
+
+    def register(
+        self,
+        schema: ChatCompletionToolParam,
+        handler: Callable[[dict], Awaitable[Any]],
+        plan: Callable[[dict], tuple[dict, str]] | None = None,
+        advertise: bool = True,
+        cache: ToolResultCache | None = None,
+        intents: tuple[str, ...] = (),
+    ) -> Tool:
+        name = schema["function"]["name"]
+        if name in self._tools:
+            raise ValueError(f"Tool {name} is already registered")
+        tool = Tool(
+            name=name,
+            schema=schema,
+            handler=handler,
+            coerce=compile_coercer(schema),
+            plan=plan,
+            advertise=advertise,
+            cache=cache,
+            intents=intents,
+        )
+        self._tools[name] = tool
+        return tool
+
+    def get(self, name: str) -> Tool | None:
+        return self._tools.get(name)
+
+    def schemas(self, intents: list[str] | None = None) -> list[ChatCompletionToolParam]:
+        """Schemas of the advertised tools, in registration order.
+
+        Args:
+            intents: Only return the tools relevant to any of these intents.
+        """
+        return [
+            tool.schema
+            for tool in self._tools.values()
+            if tool.advertise and (intents is None or not set(intents).isdisjoint(tool.intents))
+        ]
+
+    async def call(self, name: str, args: dict) -> Any:
+        """Coerce the arguments, run the tool and record its latency."""
+        tool = self._tools.get(name)
+        if tool is None:
+            print(f"❌ Unknown function: {name}")
+            return {"error": f"Unknown function {name}"}
+        start = time.perf_counter()
+        try:
+            args = tool.coerce(args)
+            if tool.cache is not None:
+                result = await tool.cache.get_or_call(args, lambda: tool.handler(args))
+            else:
+                result = await tool.handler(args)
+        except Exception:
+            tool.stats.observe(time.perf_counter() - start, error=True)
+            raise
+        tool.stats.observe(time.perf_counter() - start)
+        return result
+
+    def stats(self) -> dict[str, dict]:
+        stats = {}
+        for name, tool in self._tools.items():
+            stats[name] = tool.stats.to_dict()
+            if tool.cache is not None:
+                stats[name]["cache"] = tool.cache.to_dict()
+        return stats
+
+
+registry = ToolRegistry()
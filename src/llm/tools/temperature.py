@@ -1,6 +1,7 @@
 from openai.types.chat import ChatCompletionToolParam
 
-from src.llm.connects import pg_connect
+from src.llm.state import ac_settings_cache, current_vehicle_id
+from src.llm.tools.registry import registry
 
 # Tool parameter definition
 set_temp_tool = ChatCompletionToolParam(
@@ -22,26 +23,21 @@ set_temp_tool = ChatCompletionToolParam(
 )
 
 
-# Get temp
-def get_temp():
-    cur = pg_connect()
-    try:
-        cur.execute("SELECT temperature FROM ac_settings")
-        result = cur.fetchone()
-        if result:
-            return result[0]
-        return None
-    finally:
-        cur.close()
+def plan_set_temp(args: dict) -> tuple[dict, str]:
+    """Clamp the arguments and return the ac_settings update with its response."""
+    temp = int(args["temp"])  # Directly convert to integer
+    temp = max(min(temp, 28), 16)  # Ensure temp is between 16 and 28
+    return (
+        {"temperature": temp},
+        f"The temperature was set successfully. Current AC temperature: {temp}°C",
+    )
 
 
 # 絕對溫度設定
 async def set_temp_response(args) -> str:
-    temp = int(args["temp"])  # Directly convert to integer
-    temp = max(min(temp, 28), 16)  # Ensure temp is between 16 and 28
+    updates, response = plan_set_temp(args)
+    await ac_settings_cache.update(current_vehicle_id.get(), **updates)
+    return response
+
 
-    cur = pg_connect()
-    cur.execute("UPDATE ac_settings SET temperature = %s", (temp,))
-    cur.connection.commit()
-    cur.close()
-    return f"The temperature was set successfully. Current AC temperature: {temp}°C"
+registry.register(set_temp_tool, set_temp_response, plan=plan_set_temp, intents=("temperature",))
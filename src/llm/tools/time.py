@@ -1,8 +1,12 @@
+import os
 import datetime
 from datetime import UTC
 
 from openai.types.chat import ChatCompletionToolParam
 
+from src.llm.tools.cache import ToolResultCache
+from src.llm.tools.registry import registry
+
 get_current_time = ChatCompletionToolParam(
     type="function",
     function={
@@ -20,3 +24,12 @@ get_current_time = ChatCompletionToolParam(
 async def get_time_response(args):
     now = datetime.datetime.now(UTC)
     return {"city": args["city"], "utc_time": now.strftime("%Y-%m-%d %H:%M:%S UTC")}
+
+
+# Dispatchable, but not advertised to the LLM
+registry.register(
+    get_current_time,
+    get_time_response,
+    advertise=False,
+    cache=ToolResultCache(ttl=float(os.getenv("TIME_CACHE_TTL", "1"))),
+)
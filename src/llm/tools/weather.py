@@ -1,7 +1,11 @@
+import os
 import random
 
 from openai.types.chat import ChatCompletionToolParam
 
+from src.llm.tools.cache import ToolResultCache
+from src.llm.tools.registry import registry
+
 get_current_weather = ChatCompletionToolParam(
     type="function",
     function={
@@ -33,3 +37,12 @@ async def get_weather_response(args):
         "temperature": random.choice(["18", "22", "26", "30"]),
         "unit": args["format"],
     }
+
+
+# Dispatchable, but not advertised to the LLM
+registry.register(
+    get_current_weather,
+    get_weather_response,
+    advertise=False,
+    cache=ToolResultCache(ttl=float(os.getenv("WEATHER_CACHE_TTL", "600"))),
+)
@@ -0,0 +1,60 @@
+"""Signed vehicle tokens, so a client can only act on the vehicle it was given."""
+
+import os
+import sys
+import hmac
+import uuid
+import hashlib
+
+VEHICLE_ID_SECRET = os.getenv("VEHICLE_ID_SECRET", "")
+# Rows of connections that name no vehicle, deleted when the connection ends or expires
+STREAM_VEHICLE_PREFIX = "stream:"
+
+
+class VehicleTokenError(ValueError):
+    """The token is malformed or was not signed with `VEHICLE_ID_SECRET`."""
+
+
+def _signature(vehicle_id: str, secret: str) -> str:
+    return hmac.new(secret.encode("utf-8"), vehicle_id.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def sign_vehicle_id(vehicle_id: str, secret: str = VEHICLE_ID_SECRET) -> str:
+    """Token of the form `<vehicle_id>.<HMAC-SHA256 of the id>`.
+
+    Raises:
+        VehicleTokenError: No secret is configured, or the id is reserved for streams.
+    """
+    if not secret:
+        raise VehicleTokenError("VEHICLE_ID_SECRET is not set")
+    if not vehicle_id or vehicle_id.startswith(STREAM_VEHICLE_PREFIX):
+        raise VehicleTokenError(f"Invalid vehicle id: {vehicle_id!r}")
+    return f"{vehicle_id}.{_signature(vehicle_id, secret)}"
+
+
+def issue_vehicle_token(secret: str = VEHICLE_ID_SECRET) -> str:
+    """Token of a new, unguessable vehicle id, e.g. for one browser."""
+    return sign_vehicle_id(uuid.uuid4().hex, secret)
+
+
+def verify_vehicle_token(token: str, secret: str = VEHICLE_ID_SECRET) -> str:
+    """Return the vehicle id of a token made by `sign_vehicle_id`.
+
+    Raises:
+        VehicleTokenError: No secret is configured, or the token is not validly signed.
+    """
+    if not secret:
+        raise VehicleTokenError("VEHICLE_ID_SECRET is not set, vehicle tokens are disabled")
+    vehicle_id, _, signature = token.rpartition(".")
+    if (
+        not vehicle_id
+        or vehicle_id.startswith(STREAM_VEHICLE_PREFIX)
+        or not hmac.compare_digest(signature, _signature(vehicle_id, secret))
+    ):
+        raise VehicleTokenError("Invalid vehicle token")
+    return vehicle_id
+
+
+if __name__ == "__main__":
+    # Provision a token for a known vehicle: python -m src.llm.vehicles <vehicle_id>
+    print(sign_vehicle_id(sys.argv[1]))
@@ -1,186 +1,472 @@
 """Streaming TTS WebSocket Router - Real-time character-by-character TTS."""
 
+import io
 import os
+from enum import StrEnum
 import json
-from typing import Optional
+import time
+import uuid
+import wave
+import asyncio
 import logging
+import itertools
+import contextlib
+from dataclasses import field, dataclass
+from collections.abc import AsyncIterator
 
 import dotenv
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from nvidia_pipecat.services.riva_speech import RivaTTSService, TTSAudioRawFrame
+from pydantic import Field, BaseModel
+from fastapi.responses import StreamingResponse
+
+from src.tts.pool import tts_pool
+from src.tts.cache import tts_audio_cache
+from src.tts.framing import BinaryFramer, AudioEncoding
+from src.tts.resample import SampleFormat, PolyphaseResampler, pcm16_to_float32
+from src.tts.segmenter import SegmentRules, TextSegmenter
+from src.tts.packetizer import AUDIO_PACKET_MS, AudioPacketizer
+from src.speech.admission import RIVA_TTS_MAX_CONCURRENCY
 
 logger = logging.getLogger(__name__)
 
 dotenv.load_dotenv()
 
+TTS_SYNTHESIS_LOOKAHEAD = int(os.getenv("TTS_SYNTHESIS_LOOKAHEAD", "2"))
+# Unsent audio per connection, 320000 bytes are 10 s of 16 kHz 16-bit mono
+TTS_OUTBOUND_HIGH_WATERMARK = int(os.getenv("TTS_OUTBOUND_HIGH_WATERMARK", "320000"))
+TTS_OUTBOUND_LOW_WATERMARK = int(os.getenv("TTS_OUTBOUND_LOW_WATERMARK", "160000"))
+TTS_SLOW_CONSUMER_POLICY = os.getenv("TTS_SLOW_CONSUMER_POLICY", "pause")
+TTS_BATCH_MAX_TEXTS = int(os.getenv("TTS_BATCH_MAX_TEXTS", "500"))
+# Riva TTS slots all batch requests together may hold, at most half of the admission
+# limit so live speech always finds a free slot
+TTS_BATCH_MAX_CONCURRENCY = max(
+    1, min(int(os.getenv("TTS_BATCH_MAX_CONCURRENCY", "8")), RIVA_TTS_MAX_CONCURRENCY // 2)
+)
+TTS_BATCH_CONCURRENCY = min(
+    int(os.getenv("TTS_BATCH_CONCURRENCY", "4")), TTS_BATCH_MAX_CONCURRENCY
+)
+# Batch jobs are not waited on by a listener, they may queue behind live speech longer
+TTS_BATCH_QUEUE_DEADLINE = float(os.getenv("TTS_BATCH_QUEUE_DEADLINE", "60.0"))
+# Sample rates a /tts client may ask for, the audio is resampled from the pool's rate
+TTS_OUTPUT_SAMPLE_RATES = (8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000)
+
 # Create router
 router = APIRouter()
 
 
 class StreamingTTSHandler:
-    def __init__(self):
-        self.tts_service = None
-        self.buffer = ""  # 累積的文字緩衝區
-        self.last_sent_length = 0  # 已經轉換的文字長度
-        self.sentence_endings = {".", "!", "?", "。", "！", "？"}  # 句子結束標點
-        self.pause_chars = {",", ";", "，", "；", "\n"}  # 需要暫停的標點
-        self.min_chunk_length = 3  # 最小處理塊長度（字符數）
-
-    async def get_tts_service(self) -> RivaTTSService:
-        """Get or create TTS service."""
-        nvidia_api_key = os.getenv("NVIDIA_API_KEY", "local")
-        if self.tts_service is None:
-            if nvidia_api_key == "local":
-                logger.info("🏠 Using local NVIDIA TTS service")
-                self.tts_service = RivaTTSService(
-                    server=os.getenv("RIVA_TTS_SERVER"),
-                    api_key=nvidia_api_key,
-                    language="en-US",
-                    sample_rate=16000,
-                )
-            else:
-                logger.info("☁️ Using cloud NVIDIA TTS service")
-                self.tts_service = RivaTTSService(
-                    server="grpc.nvcf.nvidia.com:443",
-                    api_key=nvidia_api_key,
-                    language="en-US",
-                    sample_rate=16000,
-                    metadata=[
-                        ("function-id", "0149dedb-2be8-4195-b9a0-e57e0e14f972"),
-                        ("authorization", f"Bearer {nvidia_api_key}"),
-                    ],
-                )
-        return self.tts_service
-
-    def should_process_chunk(self, text: str) -> bool:
-        """判斷是否應該處理當前文字塊."""
-        # 如果遇到句子結束標點，立即處理
-        if any(char in self.sentence_endings for char in text):
-            return True
-
-        # 如果遇到暫停標點且長度足夠，處理
-        if any(char in self.pause_chars for char in text) and len(text) >= self.min_chunk_length:
-            return True
-
-        # 如果累積的文字長度達到最小處理長度
-        return len(text) >= self.min_chunk_length * 2
-
-    def extract_processable_text(self) -> Optional[str]:
-        """從緩衝區提取可處理的文字."""
-        if len(self.buffer) <= self.last_sent_length:
-            return None
-
-        # 獲取新增的文字
-        new_text = self.buffer[self.last_sent_length :]
-
-        # 檢查是否應該處理
-        if not self.should_process_chunk(new_text):
-            return None
-
-        # 找到最佳切割點
-        cut_point = len(new_text)
-
-        # 如果包含句子結束標點，在標點後切割
-        for i, char in enumerate(new_text):
-            if char in self.sentence_endings:
-                cut_point = i + 1
-                break
-
-        # 如果包含暫停標點，在適當位置切割
-        if cut_point == len(new_text):
-            for i, char in enumerate(new_text):
-                if char in self.pause_chars and i >= self.min_chunk_length:
-                    cut_point = i + 1
-                    break
-
-        # 提取要處理的文字
-        text_to_process = new_text[:cut_point].strip()
-
-        if text_to_process:
-            self.last_sent_length += cut_point
-            return text_to_process
+    def __init__(self, pipeline: "SynthesisPipeline", rules: SegmentRules | None = None):
+        self.pipeline = pipeline  # 合成與發送音頻的管線
+        self.segmenter = TextSegmenter(rules)  # 增量切分文字，只保留尚未轉換的部分
 
-        return None
-
-    async def process_streaming_text(self, new_text: str, websocket: WebSocket) -> None:
+    async def process_streaming_text(self, new_text: str) -> None:
         """處理流式文字輸入."""
-        # 添加新文字到緩衝區
-        self.buffer += new_text
-        logger.debug(f"📝 Buffer updated: '{self.buffer}' (length: {len(self.buffer)})")
+        # 只掃描新增的文字
+        for segment in self.segmenter.push(new_text):
+            logger.info(f"🔊 Processing TTS for: '{segment.text}'")
+            await self.pipeline.submit(
+                segment.text,
+                {
+                    "type": "chunk_complete",
+                    "buffer_length": self.segmenter.total_chars,
+                    "processed_length": segment.end,
+                },
+            )
+
+    async def handle_message(self, data: str) -> None:
+        """處理一則客戶端消息: JSON 指令或純文字."""
+        try:
+            # 解析消息
+            if not data.startswith("{"):
+                # 直接文字輸入
+                await self.process_streaming_text(data)
+                return
+            message = json.loads(data)
+            message_type = message.get("type", "text")
+
+            if message_type == "text":
+                # 處理新的文字輸入
+                text = message.get("text", "")
+                if text:
+                    await self.process_streaming_text(text)
+            elif message_type == "flush":
+                # 強制處理剩餘文字
+                await self.flush_remaining_text()
+            elif message_type == "reset":
+                # 重置處理器
+                await self.reset()
+            else:
+                await self.pipeline.send_message({
+                    "type": "error",
+                    "error": f"Unknown message type: {message_type}",
+                })
+        except json.JSONDecodeError:
+            # 如果不是JSON，當作純文字處理
+            await self.process_streaming_text(data)
+        except Exception as e:
+            logger.error(f"❌ Error processing message: {e}")
+            await self.pipeline.send_message({"type": "error", "error": str(e)})
+
+    async def flush_remaining_text(self) -> None:
+        """處理緩衝區中剩餘的文字."""
+        segment = self.segmenter.flush()
+        if segment is not None:
+            logger.info(f"🔄 Flushing remaining text: '{segment.text}'")
+            await self.pipeline.submit(segment.text, {"type": "flush_complete"})
 
-        # 提取可處理的文字
-        text_to_process = self.extract_processable_text()
+    async def reset(self) -> None:
+        """重置處理器狀態."""
+        self.segmenter.reset()
+        self.pipeline.cancel_pending()
+        await self.pipeline.send_message({"type": "reset_complete"})
+        logger.info("🔄 TTS handler reset")
 
-        if text_to_process:
-            logger.info(f"🔊 Processing TTS for: '{text_to_process}'")
 
-            try:
-                # 生成語音
-                tts_service = await self.get_tts_service()
-                audio_generator = tts_service.run_tts(text=text_to_process)
-
-                chunk_count = 0
-                async for chunk in audio_generator:
-                    if isinstance(chunk, TTSAudioRawFrame):
-                        # 立即發送音頻塊
-                        await websocket.send_bytes(chunk.audio)
-                        chunk_count += 1
-
-                # 發送處理完成通知
-                await websocket.send_text(
-                    json.dumps({
-                        "type": "chunk_complete",
-                        "text": text_to_process,
-                        "chunks": chunk_count,
-                        "buffer_length": len(self.buffer),
-                        "processed_length": self.last_sent_length,
-                    })
+class SlowConsumerPolicy(StrEnum):
+    """What a connection does once its unsent audio reaches the high watermark."""
+
+    # Start no further segments until the client caught up to the low watermark
+    PAUSE = "pause"
+    # Drop the segments queued behind the one being sent, like a reset would
+    DROP = "drop"
+    # Close the connection
+    DISCONNECT = "disconnect"
+
+
+_connection_ids = itertools.count(1)
+_batch_ids = itertools.count(1)
+# Shared by the workers of every batch request
+_batch_slots = asyncio.Semaphore(TTS_BATCH_MAX_CONCURRENCY)
+
+
+@dataclass(frozen=True)
+class OutputFormat:
+    """Audio format negotiated by a /tts client."""
+
+    sample_rate: int
+    sample_format: SampleFormat = SampleFormat.INT16
+
+
+@dataclass(eq=False)
+class _Segment:
+    id: int
+    text: str
+    done_message: dict
+    generation: int
+    audio: asyncio.Queue = field(default_factory=asyncio.Queue)
+    task: asyncio.Task | None = None
+    error: Exception | None = None
+    dropped: bool = False
+
+
+class SynthesisPipeline:
+    """Synthesizes the text segments of one connection ahead of the audio being sent.
+
+    Every submitted segment is queued for a single sender task, which streams the
+    segments' audio strictly in submission order. While one segment is being sent, up to
+    `lookahead` later segments synthesize concurrently, later ones wait for their turn
+    before they call Riva. `submit()` never waits, so the receive loop keeps reading
+    messages such as a reset. JSON messages go through the same queue, so they never
+    overtake the audio sent before them.
+
+    Synthesis is faster than playback, so a slow client makes the unsent audio grow. Once it
+    reaches `high_watermark` bytes, `policy` applies: no lookahead segment starts until the
+    client is back below `low_watermark`, the queued segments are dropped, or the
+    connection is closed. A paused segment waits before it is admitted, so it holds no
+    TTS admission slot or pool stream. The segment being sent is never paused, the client
+    is waiting for it.
+
+    The audio is resampled to the client's sample rate before it is packetized, by one
+    resampler for the whole connection, so its filter runs on uninterrupted across chunks
+    and segments. The watermarks count the audio as synthesized.
+
+    Args:
+        websocket: Connection the audio and messages are sent to.
+        lookahead: Segments queued behind the one being sent.
+        output: Sample rate and format sent, defaults to 16-bit PCM at the pool's rate.
+        framer: Send everything as binary frames, None for raw PCM and JSON text. Its
+            sample rate and encoding must match `output`.
+        high_watermark: Unsent audio bytes that trigger the policy.
+        low_watermark: Unsent audio bytes at which paused synthesis resumes.
+        policy: Slow-consumer policy, see `SlowConsumerPolicy`.
+        packet_ms: Duration of the audio packets sent.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        lookahead: int = TTS_SYNTHESIS_LOOKAHEAD,
+        output: OutputFormat | None = None,
+        framer: BinaryFramer | None = None,
+        high_watermark: int = TTS_OUTBOUND_HIGH_WATERMARK,
+        low_watermark: int = TTS_OUTBOUND_LOW_WATERMARK,
+        policy: SlowConsumerPolicy | str = TTS_SLOW_CONSUMER_POLICY,
+        packet_ms: int = AUDIO_PACKET_MS,
+    ):
+        self.websocket = websocket
+        self.lookahead = max(lookahead, 0)
+        self.output = output or OutputFormat(tts_pool.sample_rate)
+        self.framer = framer
+        # Fair-queuing key of the TTS admission control
+        self.stream = f"/tts:{next(_connection_ids)}"
+        self.high_watermark = high_watermark
+        self.low_watermark = min(low_watermark, high_watermark)
+        self.policy = SlowConsumerPolicy(policy)
+        self.queued_bytes = 0
+        self.max_queued_bytes = 0
+        self.high_watermark_hits = 0
+        self.dropped_segments = 0
+        self.paused_seconds = 0.0
+        self._drained = asyncio.Condition()
+        self._sending: _Segment | None = None
+        # Id of the segment being sent or sent last, the lookahead counts from it
+        self._sent_id = 0
+        self._paused_at: float | None = None
+        self._closing = False
+        self.resampler = PolyphaseResampler(tts_pool.sample_rate, self.output.sample_rate)
+        self.packetizer = AudioPacketizer(sample_rate=self.output.sample_rate, packet_ms=packet_ms)
+        self._segment_ids = itertools.count(1)
+        self._outbox: asyncio.Queue[_Segment | dict] = asyncio.Queue()
+        self._pending: set[_Segment] = set()
+        # Bumped by cancel_pending(), audio of older segments is no longer sent
+        self._generation = 0
+        self._sender: asyncio.Task | None = None
+
+    @classmethod
+    async def negotiate(cls, websocket: WebSocket) -> "SynthesisPipeline | None":
+        """Pipeline for the output format the client's query parameters ask for.
+
+        An unsupported format is reported to the client and closes the connection, None is
+        returned then.
+        """
+        try:
+            output = create_output_format(websocket)
+            framer = create_framer(websocket, output)
+        except ValueError as e:
+            await websocket.send_text(json.dumps({"type": "error", "error": str(e)}))
+            await websocket.close(code=1008)
+            return None
+        return cls(websocket, output=output, framer=framer)
+
+    def start(self) -> None:
+        self._sender = asyncio.create_task(self._send_loop())
+
+    async def stop(self) -> None:
+        self.cancel_pending()
+        if self._sender is not None:
+            self._sender.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sender
+            self._sender = None
+
+    async def submit(self, text: str, done_message: dict) -> None:
+        """Queue a segment for synthesis, `done_message` is sent after its audio."""
+        segment = _Segment(
+            id=next(self._segment_ids),
+            text=text,
+            done_message=done_message,
+            generation=self._generation,
+        )
+        self._outbox.put_nowait(segment)
+        self._pending.add(segment)
+        segment.task = asyncio.create_task(self._synthesize(segment))
+        # Also runs for a task cancelled before it started, unlike a finally clause
+        segment.task.add_done_callback(lambda _: self._finish(segment))
+
+    async def send_message(self, message: dict) -> None:
+        """Send a JSON message after everything queued so far."""
+        await self._outbox.put(message)
+
+    def cancel_pending(self) -> None:
+        """Stop synthesizing and sending the queued segments."""
+        self._generation += 1
+        for segment in list(self._pending):
+            segment.task.cancel()
+
+    async def _wait_for_turn(self, segment: _Segment) -> None:
+        """Wait until the segment is within the lookahead and synthesis is not paused."""
+        async with self._drained:
+            await self._drained.wait_for(
+                lambda: (
+                    segment is self._sending
+                    or (segment.id <= self._sent_id + self.lookahead and self._paused_at is None)
                 )
-
-                logger.info(f"✅ Sent {chunk_count} audio chunks for: '{text_to_process}'")
-
+            )
+
+    async def _synthesize(self, segment: _Segment) -> None:
+        try:
+            await self._wait_for_turn(segment)
+            async for frame in tts_pool.run_tts(segment.text, stream=self.stream):
+                segment.audio.put_nowait(frame.audio)
+                if self.queued_bytes < self.high_watermark <= self.queued_bytes + len(frame.audio):
+                    self.high_watermark_hits += 1
+                self.queued_bytes += len(frame.audio)
+                self.max_queued_bytes = max(self.max_queued_bytes, self.queued_bytes)
+                if self.queued_bytes >= self.high_watermark:
+                    await self._on_high_watermark()
+        except Exception as e:
+            segment.error = e
+
+    def _finish(self, segment: _Segment) -> None:
+        self._pending.discard(segment)
+        # End marker, also after a cancellation
+        segment.audio.put_nowait(None)
+
+    async def _on_high_watermark(self) -> None:
+        if self.policy == SlowConsumerPolicy.DISCONNECT:
+            if not self._closing:
+                self._closing = True
+                logger.warning(f"⚠️ Closing slow TTS client with {self.queued_bytes} bytes unsent")
+                await self.websocket.close(code=1008, reason="Slow consumer")
+            # Also cancels this segment, nothing more is synthesized for the connection
+            self.cancel_pending()
+        elif self.policy == SlowConsumerPolicy.DROP:
+            for queued in list(self._pending):
+                if queued is not self._sending:
+                    queued.dropped = True
+                    queued.task.cancel()
+        elif self._paused_at is None:
+            # Segments already synthesizing finish, the client waits for them
+            self._paused_at = time.monotonic()
+
+    async def _notify_drained(self) -> None:
+        if self._paused_at is not None and self.queued_bytes <= self.low_watermark:
+            self.paused_seconds += time.monotonic() - self._paused_at
+            self._paused_at = None
+        async with self._drained:
+            self._drained.notify_all()
+
+    async def _send_loop(self) -> None:
+        while True:
+            item = await self._outbox.get()
+            try:
+                if isinstance(item, _Segment):
+                    await self._send_segment(item)
+                else:
+                    await self._send_message(item)
             except Exception as e:
-                logger.error(f"❌ TTS processing error: {e}")
-                await websocket.send_text(
-                    json.dumps({"type": "error", "error": str(e), "text": text_to_process})
-                )
-
-    async def flush_remaining_text(self, websocket: WebSocket) -> None:
-        """處理緩衝區中剩餘的文字."""
-        if len(self.buffer) > self.last_sent_length:
-            remaining_text = self.buffer[self.last_sent_length :].strip()
-            if remaining_text:
-                logger.info(f"🔄 Flushing remaining text: '{remaining_text}'")
-
-                try:
-                    tts_service = await self.get_tts_service()
-                    audio_generator = tts_service.run_tts(text=remaining_text)
-
-                    chunk_count = 0
-                    async for chunk in audio_generator:
-                        if isinstance(chunk, TTSAudioRawFrame):
-                            await websocket.send_bytes(chunk.audio)
-                            chunk_count += 1
-
-                    await websocket.send_text(
-                        json.dumps({
-                            "type": "flush_complete",
-                            "text": remaining_text,
-                            "chunks": chunk_count,
-                        })
-                    )
+                # Keep draining the queue, the receive loop notices the disconnect
+                logger.error(f"❌ Failed to send TTS output: {e}")
+
+    async def _send_segment(self, segment: _Segment) -> None:
+        self._sending = segment
+        self._sent_id = segment.id
+        await self._notify_drained()
+        chunk_count = 0
+        while (audio := await segment.audio.get()) is not None:
+            self.queued_bytes -= len(audio)
+            if self.queued_bytes <= self.low_watermark:
+                await self._notify_drained()
+            if segment.generation != self._generation or segment.dropped:
+                continue
+            # 音頻轉換為客戶端的取樣率，重新切成固定長度的封包後立即發送
+            for packet in self.packetizer.push(self.resampler.process(audio)):
+                chunk_count += await self._send_audio(segment.id, packet)
+        if segment.generation != self._generation or segment.dropped:
+            self.resampler.reset()
+            self.packetizer.reset()
+        elif (packet := self.packetizer.flush()) is not None:
+            chunk_count += await self._send_audio(segment.id, packet)
+        if segment.generation != self._generation:
+            return
+
+        if segment.dropped:
+            self.dropped_segments += 1
+            logger.warning(f"⚠️ Dropped TTS segment for slow client: '{segment.text}'")
+            message = {"type": "segment_dropped", "chunks": chunk_count}
+        elif segment.error is not None:
+            logger.error(f"❌ TTS processing error: {segment.error}")
+            message = {"type": "error", "error": str(segment.error)}
+        else:
+            # 發送處理完成通知
+            message = {**segment.done_message, "chunks": chunk_count}
+            logger.info(f"✅ Sent {chunk_count} audio chunks for: '{segment.text}'")
+        await self._send_message(
+            {**message, "text": segment.text, "segment_id": segment.id}, segment.id
+        )
+
+    async def _send_audio(self, segment_id: int, pcm: bytes) -> int:
+        """Send a packet of PCM, returns the number of WebSocket messages."""
+        if self.framer is None:
+            if self.output.sample_format == SampleFormat.FLOAT32:
+                pcm = pcm16_to_float32(pcm)
+            await self.websocket.send_bytes(pcm)
+            return 1
+        frames = self.framer.audio(segment_id, pcm)
+        for frame in frames:
+            await self.websocket.send_bytes(frame)
+        return len(frames)
+
+    def stats(self) -> dict:
+        return {
+            "sample_rate": self.output.sample_rate,
+            "sample_format": self.output.sample_format.value,
+            "queued_bytes": self.queued_bytes,
+            "max_queued_bytes": self.max_queued_bytes,
+            "queued_items": self._outbox.qsize(),
+            "synthesizing": len(self._pending),
+            "high_watermark": self.high_watermark,
+            "low_watermark": self.low_watermark,
+            "policy": self.policy.value,
+            "paused": self._paused_at is not None,
+            "high_watermark_hits": self.high_watermark_hits,
+            "paused_seconds": round(self.paused_seconds, 3),
+            "dropped_segments": self.dropped_segments,
+        }
+
+    async def _send_message(self, message: dict, segment_id: int | None = None) -> None:
+        """Send a JSON message, in binary mode the one ending `segment_id` if given."""
+        if self.framer is None:
+            await self.websocket.send_text(json.dumps(message))
+        elif segment_id is None:
+            await self.websocket.send_bytes(self.framer.control(message))
+        else:
+            for frame in self.framer.end(segment_id, message):
+                await self.websocket.send_bytes(frame)
+
+
+def create_output_format(websocket: WebSocket) -> OutputFormat:
+    """Output requested by the `sample_rate` and `sample_format` query parameters.
+
+    Raises:
+        ValueError: Unsupported sample rate or unknown sample format.
+    """
+    sample_rate = websocket.query_params.get("sample_rate", str(tts_pool.sample_rate))
+    if not sample_rate.isdigit() or int(sample_rate) not in TTS_OUTPUT_SAMPLE_RATES:
+        raise ValueError(
+            f"Unsupported sample rate: {sample_rate}, use one of {TTS_OUTPUT_SAMPLE_RATES}"
+        )
+    sample_format = websocket.query_params.get("sample_format", SampleFormat.INT16)
+    try:
+        sample_format = SampleFormat(sample_format)
+    except ValueError:
+        raise ValueError(f"Unknown sample format: {sample_format}") from None
+    return OutputFormat(int(sample_rate), sample_format)
 
-                    self.last_sent_length = len(self.buffer)
 
-                except Exception as e:
-                    logger.error(f"❌ Error flushing text: {e}")
-                    await websocket.send_text(json.dumps({"type": "error", "error": str(e)}))
+def create_framer(websocket: WebSocket, output: OutputFormat) -> BinaryFramer | None:
+    """Framer requested by the `protocol` and `encoding` query parameters.
 
-    def reset(self) -> None:
-        """重置處理器狀態."""
-        self.buffer = ""
-        self.last_sent_length = 0
-        logger.info("🔄 TTS handler reset")
+    Raises:
+        ValueError: Unknown protocol or encoding, an encoding that does not fit `output`,
+            or Opus without opuslib.
+    """
+    protocol = websocket.query_params.get("protocol", "json")
+    if protocol == "json":
+        return None
+    if protocol != "binary":
+        raise ValueError(f"Unknown protocol: {protocol}")
+    encoding = websocket.query_params.get("encoding", AudioEncoding.PCM16)
+    try:
+        encoding = AudioEncoding(encoding)
+    except ValueError:
+        raise ValueError(f"Unknown encoding: {encoding}") from None
+    if output.sample_format == SampleFormat.FLOAT32:
+        # μ-law and Opus encode the 16-bit samples themselves
+        if encoding not in (AudioEncoding.PCM16, AudioEncoding.FLOAT32):
+            raise ValueError(f"Encoding {encoding} cannot carry float32 samples")
+        encoding = AudioEncoding.FLOAT32
+    return BinaryFramer(encoding, sample_rate=output.sample_rate)
 
 
 # 為每個WebSocket連接創建獨立的處理器
@@ -193,54 +479,21 @@ async def websocket_streaming_tts(websocket: WebSocket) -> None:
     await websocket.accept()
     logger.info("👋 Client connected to Streaming TTS WebSocket")
 
+    # 協商輸出格式（取樣率、取樣格式、JSON 或二進位封包）
+    pipeline = await SynthesisPipeline.negotiate(websocket)
+    if pipeline is None:
+        return
+
     # 為這個連接創建處理器
-    handler = StreamingTTSHandler()
+    pipeline.start()
+    handler = StreamingTTSHandler(pipeline)
     active_handlers[websocket] = handler
 
     try:
         while True:
             data = await websocket.receive_text()
             logger.debug(f"📨 Received: {data}")
-
-            try:
-                # 解析消息
-                if data.startswith("{"):
-                    message = json.loads(data)
-                    message_type = message.get("type", "text")
-
-                    if message_type == "text":
-                        # 處理新的文字輸入
-                        text = message.get("text", "")
-                        if text:
-                            await handler.process_streaming_text(text, websocket)
-
-                    elif message_type == "flush":
-                        # 強制處理剩餘文字
-                        await handler.flush_remaining_text(websocket)
-
-                    elif message_type == "reset":
-                        # 重置處理器
-                        handler.reset()
-                        await websocket.send_text(json.dumps({"type": "reset_complete"}))
-
-                    else:
-                        await websocket.send_text(
-                            json.dumps({
-                                "type": "error",
-                                "error": f"Unknown message type: {message_type}",
-                            })
-                        )
-
-                else:
-                    # 直接文字輸入
-                    await handler.process_streaming_text(data, websocket)
-
-            except json.JSONDecodeError as e:
-                # 如果不是JSON，當作純文字處理
-                await handler.process_streaming_text(data, websocket)
-            except Exception as e:
-                logger.error(f"❌ Error processing message: {e}")
-                await websocket.send_text(json.dumps({"type": "error", "error": str(e)}))
+            await handler.handle_message(data)
 
     except WebSocketDisconnect:
         logger.info("👋 Client disconnected from Streaming TTS WebSocket")
@@ -249,20 +502,131 @@ async def websocket_streaming_tts(websocket: WebSocket) -> None:
     finally:
         # 清理處理器
         active_handlers.pop(websocket, None)
+        await pipeline.stop()
+
+
+def _wav(pcm: bytes, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def _multipart_part(boundary: str, headers: dict[str, str], body: bytes) -> bytes:
+    lines = [f"--{boundary}", *(f"{name}: {value}" for name, value in headers.items())]
+    return "\r\n".join(lines).encode("ascii") + b"\r\n\r\n" + body + b"\r\n"
+
+
+class TTSBatchRequest(BaseModel):
+    texts: list[str] = Field(min_length=1, max_length=TTS_BATCH_MAX_TEXTS)
+    concurrency: int = Field(default=TTS_BATCH_CONCURRENCY, ge=1, le=TTS_BATCH_MAX_CONCURRENCY)
+
+
+async def _batch_parts(texts: list[str], concurrency: int, boundary: str) -> AsyncIterator[bytes]:
+    """Synthesize the texts with `concurrency` workers, yielding each part as it finishes."""
+    # One fair-queuing stream for the whole batch, live connections keep getting turns
+    stream = f"/tts/batch:{next(_batch_ids)}"
+    jobs: asyncio.Queue[tuple[int, str]] = asyncio.Queue()
+    for job in enumerate(texts):
+        jobs.put_nowait(job)
+    # Bounded, workers wait while the client is slow to read
+    results: asyncio.Queue[tuple[int, bytes | None, Exception | None]] = asyncio.Queue(
+        maxsize=concurrency
+    )
+
+    async def worker() -> None:
+        while not jobs.empty():
+            index, text = jobs.get_nowait()
+            try:
+                async with _batch_slots:
+                    frames = tts_pool.run_tts(
+                        text, stream=stream, deadline=TTS_BATCH_QUEUE_DEADLINE
+                    )
+                    result = (index, b"".join([frame.audio async for frame in frames]), None)
+            except Exception as e:
+                result = (index, None, e)
+            await results.put(result)
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(texts)))]
+    started = time.monotonic()
+    failed = 0
+    try:
+        for _ in texts:
+            index, audio, error = await results.get()
+            if error is not None:
+                failed += 1
+                logger.error(f"❌ Batch TTS failed for text {index}: {error}")
+                headers = {"Content-Type": "application/json", "X-Text-Index": str(index)}
+                yield _multipart_part(
+                    boundary, headers, json.dumps({"index": index, "error": str(error)}).encode()
+                )
+                continue
+            headers = {
+                "Content-Type": "audio/wav",
+                "Content-Disposition": f'attachment; filename="{index:05d}.wav"',
+                "X-Text-Index": str(index),
+            }
+            yield _multipart_part(boundary, headers, _wav(audio, tts_pool.sample_rate))
+        yield f"--{boundary}--\r\n".encode("ascii")
+        logger.info(
+            f"✅ Batch TTS of {len(texts)} texts ({failed} failed) in"
+            f" {time.monotonic() - started:.2f}s with {len(workers)} workers"
+        )
+    finally:
+        # Also reached when the client goes away mid-stream
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+@router.post("/tts/batch")
+async def tts_batch(request: TTSBatchRequest) -> StreamingResponse:
+    """Synthesize many texts concurrently, streamed back as multipart WAVs in finishing order.
+
+    Every part carries the position of its text in `X-Text-Index`. A text that could not
+    be synthesized gets an `application/json` part with the error instead.
+    """
+    boundary = uuid.uuid4().hex
+    return StreamingResponse(
+        _batch_parts(request.texts, request.concurrency, boundary),
+        media_type=f"multipart/mixed; boundary={boundary}",
+    )
 
 
 @router.get("/tts/info")
-async def streaming_tts_info():
+async def streaming_tts_info() -> dict:
     """Get streaming TTS service information."""
     return {
         "service": "NVIDIA Riva Streaming TTS",
         "websocket_endpoint": "/tts",
+        "batch_endpoint": "/tts/batch",
         "features": [
             "Real-time character-by-character TTS",
             "Intelligent text chunking",
             "Streaming audio output",
+            "Pipelined synthesis of upcoming segments",
+            "Opt-in binary framing with pcm16, mulaw or opus payloads",
+            "Outbound watermarks with a slow-consumer policy",
+            "Fixed-duration audio packets",
+            "Per-connection output sample rate and int16 or float32 samples",
             "Buffer management",
         ],
+        "pool": tts_pool.stats(),
+        "cache": tts_audio_cache.to_dict(),
+        "output_format": {
+            "connect": "/tts?sample_rate=48000&sample_format=float32",
+            "sample_rate": tts_pool.sample_rate,
+            "sample_rates": list(TTS_OUTPUT_SAMPLE_RATES),
+            "sample_formats": [sample_format.value for sample_format in SampleFormat],
+        },
+        "binary_protocol": {
+            "connect": "/tts?protocol=binary&encoding=mulaw",
+            "encodings": [encoding.value for encoding in AudioEncoding],
+            "header": "!BBBBIII: version, type, flags, encoding, segment_id, seq, sample_rate",
+        },
         "message_types": {
             "text": {"type": "text", "text": "Your streaming text here"},
             "flush": {"type": "flush"},
@@ -278,3 +642,18 @@ async def streaming_tts_info():
             ],
         },
     }
+
+
+@router.get("/tts/connections")
+async def tts_connection_stats() -> list[dict]:
+    """Outbound queue depth and slow-consumer counters of every /tts connection."""
+    return [
+        {"client": str(websocket.client), **handler.pipeline.stats()}
+        for websocket, handler in active_handlers.items()
+    ]
+
+
+@router.get("/tts/cache")
+async def tts_cache_stats() -> dict:
+    """Hit rate and bytes saved by the TTS audio cache."""
+    return tts_audio_cache.to_dict()
@@ -0,0 +1,154 @@
+"""Process-wide admission control for the Riva speech services."""
+
+import os
+import time
+import asyncio
+import logging
+import contextlib
+from collections import OrderedDict, deque
+from collections.abc import Hashable, AsyncIterator
+
+from src.llm.latency import RollingLatency
+
+logger = logging.getLogger(__name__)
+
+RIVA_TTS_MAX_CONCURRENCY = int(os.getenv("RIVA_TTS_MAX_CONCURRENCY", "16"))
+RIVA_ASR_MAX_CONCURRENCY = int(os.getenv("RIVA_ASR_MAX_CONCURRENCY", "8"))
+# Seconds a request may wait for a slot, later its audio would come too late to matter
+RIVA_TTS_QUEUE_DEADLINE = float(os.getenv("RIVA_TTS_QUEUE_DEADLINE", "3.0"))
+RIVA_ASR_QUEUE_DEADLINE = float(os.getenv("RIVA_ASR_QUEUE_DEADLINE", "10.0"))
+# Queue wait samples kept for the percentiles
+ADMISSION_WAIT_WINDOW = 200
+
+
+class AdmissionDeadlineError(TimeoutError):
+    """A request waited longer than its deadline for a slot and was shed."""
+
+
+class AdmissionController:
+    """Limits the concurrent calls to one service, queuing the rest fairly.
+
+    Waiting requests are grouped by stream, e.g. a /tts connection or a pipeline, and a
+    freed slot goes to the streams in turn instead of to the oldest request, so a stream
+    with many queued segments cannot starve the others. A request still waiting at its
+    deadline is shed with `AdmissionDeadlineError`.
+
+    Args:
+        name: Service name used in logs and metrics.
+        limit: Concurrent calls.
+        deadline: Default seconds a request may wait, None to wait forever.
+    """
+
+    def __init__(self, name: str, limit: int, deadline: float | None = None):
+        self.name = name
+        self.limit = limit
+        self.deadline = deadline
+        self.in_use = 0
+        self.admitted = 0
+        self.shed = 0
+        self.wait = RollingLatency(ADMISSION_WAIT_WINDOW)
+        self._waiting: OrderedDict[Hashable, deque[asyncio.Future]] = OrderedDict()
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiting.values())
+
+    @property
+    def saturated(self) -> bool:
+        """Whether a new request would have to queue."""
+        return self.in_use >= self.limit or bool(self._waiting)
+
+    async def acquire(self, stream: Hashable, deadline: float | None = None) -> None:
+        """Wait for a slot, to be given back with `release()`.
+
+        Args:
+            stream: Requests of the same stream share one turn of the round robin.
+            deadline: Seconds to wait, defaults to the controller's deadline.
+
+        Raises:
+            AdmissionDeadlineError: No slot was free within the deadline.
+        """
+        if deadline is None:
+            deadline = self.deadline
+        if self.in_use < self.limit and not self._waiting:
+            self.in_use += 1
+            self.admitted += 1
+            self.wait.observe(0.0)
+            return
+
+        started = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(stream, deque()).append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), deadline)
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted while the wait ended, pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._forget(stream, waiter)
+            if isinstance(e, TimeoutError):
+                self.shed += 1
+                logger.warning(f"⚠️ Shed {self.name} request after waiting {deadline}s")
+                raise AdmissionDeadlineError(
+                    f"{self.name} is at capacity, no slot within {deadline}s"
+                ) from e
+            raise
+        self.admitted += 1
+        self.wait.observe(time.monotonic() - started)
+
+    def release(self) -> None:
+        self.in_use -= 1
+        self._dispatch()
+
+    @contextlib.asynccontextmanager
+    async def admit(self, stream: Hashable, deadline: float | None = None) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block, see `acquire()`."""
+        await self.acquire(stream, deadline)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _dispatch(self) -> None:
+        while self.in_use < self.limit and self._waiting:
+            stream, waiters = next(iter(self._waiting.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                # Round robin, the stream's next request waits for the other streams
+                self._waiting.move_to_end(stream)
+            else:
+                del self._waiting[stream]
+            if not waiter.done():
+                self.in_use += 1
+                waiter.set_result(None)
+
+    def _forget(self, stream: Hashable, waiter: asyncio.Future) -> None:
+        waiters = self._waiting.get(stream)
+        if waiters is None:
+            return
+        with contextlib.suppress(ValueError):
+            waiters.remove(waiter)
+        if not waiters:
+            del self._waiting[stream]
+
+    def to_dict(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_use": self.in_use,
+            "queued": self.queued,
+            "waiting_streams": len(self._waiting),
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "deadline_s": self.deadline,
+            "wait": self.wait.to_dict(),
+        }
+
+
+tts_admission = AdmissionController("Riva TTS", RIVA_TTS_MAX_CONCURRENCY, RIVA_TTS_QUEUE_DEADLINE)
+asr_admission = AdmissionController("Riva ASR", RIVA_ASR_MAX_CONCURRENCY, RIVA_ASR_QUEUE_DEADLINE)
+
+
+def admission_stats() -> dict[str, dict]:
+    return {"tts": tts_admission.to_dict(), "asr": asr_admission.to_dict()}
@@ -0,0 +1,124 @@
+"""Riva ASR service whose recognition stream is admitted by the ASR admission control."""
+
+from typing import Any
+import logging
+from collections.abc import Callable, Awaitable, MutableMapping
+
+from pipecat.frames.frames import EndFrame, ErrorFrame, StartFrame, CancelFrame
+from nvidia_pipecat.services.riva_speech import RivaASRService
+
+from src.speech.admission import AdmissionController, AdmissionDeadlineError, asr_admission
+
+logger = logging.getLogger(__name__)
+
+ASGIApp = Callable[
+    [
+        MutableMapping,
+        Callable[[], Awaitable[MutableMapping]],
+        Callable[[MutableMapping], Awaitable],
+    ],
+    Awaitable[None],
+]
+
+
+class AdmittedRivaASRService(RivaASRService):
+    """RivaASRService that holds an ASR admission slot from pipeline start to end.
+
+    A pipeline keeps one recognition stream open for its lifetime, idle or not, so the
+    slot is taken when the pipeline starts and given back when it ends or is cancelled.
+    `RIVA_ASR_MAX_CONCURRENCY` therefore caps the connected voice clients, and
+    `ASRCapacityMiddleware` turns clients away before their pipeline starts. A pipeline
+    that still gets no slot within the queue deadline, e.g. when another client took the
+    last one in between, ends with a fatal ErrorFrame instead of opening yet another
+    stream on an overloaded server.
+
+    Args:
+        stream: Fair-queuing key, e.g. the pipeline's stream id.
+    """
+
+    def __init__(self, *, stream: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._stream = stream
+        self._admitted = False
+
+    async def start(self, frame: StartFrame) -> None:
+        try:
+            await asr_admission.acquire(self._stream)
+        except AdmissionDeadlineError as e:
+            await self.push_error(ErrorFrame(str(e), fatal=True))
+            return
+        self._admitted = True
+        await super().start(frame)
+
+    async def stop(self, frame: EndFrame) -> None:
+        try:
+            await super().stop(frame)
+        finally:
+            self._release()
+
+    async def cancel(self, frame: CancelFrame) -> None:
+        try:
+            await super().cancel(frame)
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        if self._admitted:
+            self._admitted = False
+            asr_admission.release()
+
+
+class ASRCapacityMiddleware:
+    """Refuses voice WebSocket handshakes while every ASR slot is held.
+
+    The refusal is an HTTP 503 where the server supports the ASGI WebSocket denial
+    response extension, otherwise the handshake is closed with code 1013 (try again
+    later), so the client never gets a pipeline that cannot hear it.
+
+    Args:
+        app: The wrapped ASGI app.
+        path_prefix: Paths of the voice pipeline WebSockets.
+        controller: Admission control the pipelines' ASR services take their slot from.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        path_prefix: str = "/ws",
+        controller: AdmissionController = asr_admission,
+    ):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.controller = controller
+
+    async def __call__(
+        self,
+        scope: MutableMapping,
+        receive: Callable[[], Awaitable[MutableMapping]],
+        send: Callable[[MutableMapping], Awaitable],
+    ) -> None:
+        if (
+            scope["type"] != "websocket"
+            or not scope["path"].startswith(self.path_prefix)
+            or not self.controller.saturated
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        self.controller.shed += 1
+        logger.warning(f"⚠️ Refused voice connection, all {self.controller.limit} ASR slots in use")
+        # The handshake request, the connection is refused before it is accepted
+        await receive()
+        reason = f"{self.controller.name} is at capacity, try again later"
+        if "websocket.http.response" in scope.get("extensions", {}):
+            await send({
+                "type": "websocket.http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"retry-after", b"5"),
+                ],
+            })
+            await send({"type": "websocket.http.response.body", "body": reason.encode("utf-8")})
+        else:
+            await send({"type": "websocket.close", "code": 1013, "reason": reason})
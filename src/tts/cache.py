@@ -0,0 +1,248 @@
+"""Content-addressed cache of synthesized speech with a memory and an mmap disk tier."""
+
+import os
+import mmap
+from typing import Any
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from collections import OrderedDict
+from collections.abc import Callable, AsyncIterator
+
+from pipecat.frames.frames import Frame, ErrorFrame, TTSStartedFrame, TTSStoppedFrame
+from nvidia_pipecat.services.riva_speech import RivaTTSService, TTSAudioRawFrame
+
+from src.speech.admission import AdmissionDeadlineError, tts_admission
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "")
+# Long LLM sentences rarely repeat, caching them would only churn the LRU
+TTS_CACHE_MAX_TEXT_CHARS = int(os.getenv("TTS_CACHE_MAX_TEXT_CHARS", "200"))
+# Open memory maps kept around, each holds a file descriptor
+TTS_CACHE_MAX_OPEN_FILES = 128
+# Audio of a cache hit is yielded in chunks of this many seconds
+TTS_CACHE_CHUNK_SECONDS = 0.1
+
+
+def normalize_text(text: str) -> str:
+    """Text as the cache sees it, whitespace does not change the speech."""
+    return " ".join(text.split())
+
+
+def cache_key(text: str, voice: str, language: str, sample_rate: int) -> str:
+    raw = "\x00".join([normalize_text(text), voice, language, str(sample_rate)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTSAudioCache:
+    """16-bit mono PCM keyed by normalized text, voice, language and sample rate.
+
+    The memory tier is an LRU bounded by `max_bytes` of audio. With `cache_dir`, every
+    entry is also written to `<cache_dir>/<key[:2]>/<key>.pcm` and read back through
+    `mmap`, so the disk tier survives restarts and its pages are shared with the OS page
+    cache instead of copied onto the heap.
+
+    Args:
+        max_bytes: Audio bytes kept in memory.
+        cache_dir: Directory of the disk tier, empty to keep the cache in memory only.
+        max_text_chars: Longer texts are not cached.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = TTS_CACHE_MAX_BYTES,
+        cache_dir: str = TTS_CACHE_DIR,
+        max_text_chars: int = TTS_CACHE_MAX_TEXT_CHARS,
+    ):
+        self.max_bytes = max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_text_chars = max_text_chars
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._maps: OrderedDict[str, mmap.mmap] = OrderedDict()
+
+    def cacheable(self, text: str) -> bool:
+        return 0 < len(text) <= self.max_text_chars
+
+    def get(self, key: str) -> bytes | mmap.mmap | None:
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            self.bytes_saved += len(audio)
+            return audio
+        audio = self._map(key)
+        if audio is not None:
+            self.disk_hits += 1
+            self.bytes_saved += len(audio)
+            return audio
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, audio: bytes) -> None:
+        if not audio:
+            return
+        if len(audio) <= self.max_bytes:
+            if key in self._memory:
+                self._memory_bytes -= len(self._memory.pop(key))
+            self._memory[key] = audio
+            self._memory_bytes += len(audio)
+            while self._memory_bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+        if self.cache_dir is not None:
+            try:
+                await asyncio.to_thread(self._write, key, audio)
+            except OSError as e:
+                logger.error(f"❌ Failed to write TTS cache entry: {e}")
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pcm"
+
+    def _write(self, key: str, audio: bytes) -> None:
+        path = self._path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, a crash never leaves a truncated entry
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(audio)
+        os.replace(tmp_path, path)
+
+    def _map(self, key: str) -> mmap.mmap | None:
+        mapped = self._maps.get(key)
+        if mapped is not None:
+            self._maps.move_to_end(key)
+            return mapped
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # ValueError: an empty file cannot be mapped
+            return None
+        self._maps[key] = mapped
+        while len(self._maps) > TTS_CACHE_MAX_OPEN_FILES:
+            # Slices handed out earlier are copies, closing the map is safe
+            self._maps.popitem(last=False)[1].close()
+        return mapped
+
+    async def run_tts(
+        self,
+        text: str,
+        synthesize: Callable[[str], AsyncIterator[Frame]],
+        sample_rate: int,
+        voice: str = "",
+        language: str = "en-US",
+    ) -> AsyncIterator[Frame]:
+        """Yield the frames of `synthesize(text)`, served from the cache when possible.
+
+        A hit yields the audio between TTS started and stopped frames. A miss passes the
+        synthesized frames through and caches the audio once the synthesis completes
+        without an error.
+        """
+        if not self.cacheable(text):
+            async for frame in synthesize(text):
+                yield frame
+            return
+
+        key = cache_key(text, voice, language, sample_rate)
+        audio = self.get(key)
+        if audio is not None:
+            # `_map` may close a map while this generator is suspended, copy it out first
+            audio = bytes(audio)
+            chunk_size = int(sample_rate * TTS_CACHE_CHUNK_SECONDS) * 2
+            yield TTSStartedFrame()
+            for start in range(0, len(audio), chunk_size):
+                yield TTSAudioRawFrame(
+                    audio=audio[start : start + chunk_size],
+                    sample_rate=sample_rate,
+                    num_channels=1,
+                )
+            yield TTSStoppedFrame()
+            return
+
+        chunks = []
+        failed = False
+        async for frame in synthesize(text):
+            if isinstance(frame, TTSAudioRawFrame):
+                chunks.append(frame.audio)
+            elif isinstance(frame, ErrorFrame):
+                failed = True
+            yield frame
+        # Only reached when the consumer read every frame, partial audio is never cached
+        if not failed:
+            await self.put(key, b"".join(chunks))
+
+    def to_dict(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "max_bytes": self.max_bytes,
+            "disk": str(self.cache_dir) if self.cache_dir is not None else None,
+        }
+
+
+tts_audio_cache = TTSAudioCache()
+
+
+class CachedRivaTTSService(RivaTTSService):
+    """RivaTTSService that serves repeated texts from a `TTSAudioCache`.
+
+    Texts missing from the cache are synthesized within the TTS admission control, a
+    request shed at its queue deadline turns into an ErrorFrame.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rate: int = 16000,
+        language: str = "en-US",
+        cache: TTSAudioCache = tts_audio_cache,
+        stream: str | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(sample_rate=sample_rate, language=language, **kwargs)
+        self._cache = cache
+        self._cache_sample_rate = sample_rate
+        self._cache_language = language
+        # Same format as `riva_tts_voice()`, so the pool and the pipelines share entries
+        self._cache_voice = f"{self._voice_id}@{kwargs.get('server')}"
+        self._stream = stream or self.name
+
+    async def run_tts(self, text: str) -> AsyncIterator[Frame]:
+        async for frame in self._cache.run_tts(
+            text,
+            self._synthesize,
+            sample_rate=self._cache_sample_rate,
+            voice=self._cache_voice,
+            language=self._cache_language,
+        ):
+            yield frame
+
+    async def _synthesize(self, text: str) -> AsyncIterator[Frame]:
+        try:
+            await tts_admission.acquire(self._stream)
+        except AdmissionDeadlineError as e:
+            yield ErrorFrame(str(e))
+            return
+        try:
+            async for frame in super().run_tts(text):
+                yield frame
+        finally:
+            tts_admission.release()
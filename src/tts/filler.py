@@ -1,144 +1,170 @@
-import random
+import os
 import time
+import random
+import asyncio
 
-from pipecat.frames.frames import TTSSpeakFrame, TranscriptionFrame
+from pipecat.frames.frames import (
+    EndFrame,
+    CancelFrame,
+    TTSSpeakFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+    TTSAudioRawFrame,
+    TranscriptionFrame,
+    StartInterruptionFrame,
+)
 from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 
+from src.llm.intent import match_intent
+from src.llm.latency import LLMResponseMonitor
+from src.tts.filler_audio import FillerAudioCache, filler_audio_cache
+
+# Speak a filler at once when the LLM usually takes longer than this to start answering
+FILLER_TTFT_THRESHOLD = float(os.getenv("FILLER_TTFT_THRESHOLD", "1.0"))
+# Otherwise speak it only if the LLM has not started answering after this many seconds
+FILLER_DELAY = float(os.getenv("FILLER_DELAY", "0.8"))
+
+# Acknowledgments per intent, see `src.llm.intent.INTENT_KEYWORDS`
+FILLER_PHRASES: dict[str, list[str]] = {
+    "temperature": [
+        "Let me check the temperature.",
+        "I'll look into the temperature settings.",
+        "Just a second, checking temp.",
+        "Hang tight, I'm on it.",
+        "One moment, please.",
+        "Let me take a quick look.",
+        "Checking temperature now.",
+        "Give me a moment.",
+    ],
+    "fan": [
+        "I'll adjust the fan for you.",
+        "Let me help with the airflow.",
+        "One sec, working on it.",
+        "Fan settings coming up.",
+        "Making the air better.",
+        "Got it, changing airflow.",
+        "I'll get on that.",
+    ],
+    "defrost": [
+        "I'll check the defrost settings.",
+        "Let me help with the windshield.",
+        "Just a second.",
+        "Hang on, working on it.",
+        "Let me take care of that.",
+        "Working on the front glass.",
+    ],
+    "navigation": [
+        "I'll help you with navigation.",
+        "Let me get those directions.",
+        "Finding the best route.",
+        "Hold on, checking the map.",
+        "Let me plan that out.",
+        "One sec, mapping now.",
+        "Got it, setting your route.",
+        "Loading directions.",
+        "Hang tight, getting the map.",
+        "I'll guide you there.",
+    ],
+}
+
 
 class FillerProcessor(FrameProcessor):
-    """Processor that provides immediate acknowledgment responses to user speech."""
+    """Processor that provides immediate acknowledgment responses to user speech.
 
-    def __init__(self):
+    With a `response_monitor`, fillers are only spoken when the answer is expected to
+    be slow: right away if the predicted time to first token exceeds `ttft_threshold`,
+    otherwise once `filler_delay` seconds pass without the LLM starting to answer. A
+    pending filler is dropped when the answer, an interruption or new speech comes first.
+    """
+
+    def __init__(
+        self,
+        audio_cache: FillerAudioCache = filler_audio_cache,
+        response_monitor: LLMResponseMonitor | None = None,
+        ttft_threshold: float = FILLER_TTFT_THRESHOLD,
+        filler_delay: float = FILLER_DELAY,
+    ):
         super().__init__()
+        self._audio_cache = audio_cache
+        self._response_monitor = response_monitor
+        self._ttft_threshold = ttft_threshold
+        self._filler_delay = filler_delay
+        self._pending_filler: asyncio.Task | None = None
         self._last_filler_time = 0
         self._min_filler_interval = 2.0  # Minimum seconds between fillers
 
     async def process_frame(self, frame, direction):
         await super().process_frame(frame, direction)
 
+        if isinstance(frame, (StartInterruptionFrame, EndFrame, CancelFrame)):
+            await self._cancel_pending_filler()
+
         # Only process transcription frames going downstream (from STT)
         if direction == FrameDirection.DOWNSTREAM and isinstance(frame, TranscriptionFrame):
             if frame.text and frame.text.strip():
+                await self._cancel_pending_filler()
                 current_time = time.time()
 
                 # Throttle fillers to avoid overwhelming the user
                 if current_time - self._last_filler_time > self._min_filler_interval:
-                    self._last_filler_time = current_time
-
                     # Generate contextual acknowledgment
                     acknowledgment = self._get_contextual_acknowledgment(frame.text)
-
-                    # Send the filler immediately
-                    await self.push_frame(TTSSpeakFrame(acknowledgment))
+                    if acknowledgment:
+                        await self._schedule_filler(acknowledgment)
 
         # Always pass the original frame through
         await self.push_frame(frame, direction)
 
-    def _get_contextual_acknowledgment(self, text: str) -> str:
-        """Generate context-aware acknowledgment based on user input."""
-        text_lower = text.lower()
-
-        # Context-aware acknowledgments
-        if any(
-            word in text_lower
-            for word in [
-                "temperature",
-                "temp",
-                "hot",
-                "cold",
-                "climate",
-                " ac ",
-                "warmer",
-                "cooler",
-                "heat",
-                "cool",
-                "air conditioning",
-                "a/c",
-                "aircon",
-                "air con",
-            ]
-        ):
-            return random.choice([
-                "Let me check the temperature.",
-                "I'll look into the temperature settings.",
-                "Just a second, checking temp.",
-                "Hang tight, I'm on it.",
-                "One moment, please.",
-                "Let me take a quick look.",
-                "Checking temperature now.",
-                "Give me a moment.",
-            ])
-        elif any(
-            word in text_lower
-            for word in ["fan", "air", "blow", "blower", "windy", "breeze", "airflow"]
-        ):
-            return random.choice([
-                "I'll adjust the fan for you.",
-                "Let me help with the airflow.",
-                "One sec, working on it.",
-                "Fan settings coming up.",
-                "Making the air better.",
-                "Got it, changing airflow.",
-                "I'll get on that.",
-            ])
-        elif any(
-            word in text_lower
-            for word in ["defrost", "windshield", "window", "front", "glass", "ice"]
-        ):
-            return random.choice([
-                "I'll check the defrost settings.",
-                "Let me help with the windshield.",
-                "Just a second.",
-                "Hang on, working on it.",
-                "Let me take care of that.",
-                "Working on the front glass.",
-            ])
-        elif any(word in text_lower for word in ["navigate", "directions", "map", "route"]):
-            return random.choice([
-                "I'll help you with navigation.",
-                "Let me get those directions.",
-                "Finding the best route.",
-                "Hold on, checking the map.",
-                "Let me plan that out.",
-                "One sec, mapping now.",
-                "Got it, setting your route.",
-                "Loading directions.",
-                "Hang tight, getting the map.",
-                "I'll guide you there.",
-            ])
-        elif (
-            (
-                text_lower.strip()
-                in [
-                    "hey",
-                    "uh",
-                    "hmm",
-                    "mmm",
-                    "um",
-                    "ah",
-                    "well",
-                    "thanks",
-                    "hello",
-                    "good",
-                    "bye",
-                    "goodbye",
-                    "great",
-                ]
-            )
-            or text_lower.isalpha()
-            or any(
-                word in text_lower
-                for word in ["great thanks", "okay great thank you", "okay great"]
+    async def _schedule_filler(self, acknowledgment: str) -> None:
+        monitor = self._response_monitor
+        if monitor is None:
+            await self._push_filler(acknowledgment)
+            return
+        predicted = monitor.predicted_ttft()
+        if predicted is not None and predicted >= self._ttft_threshold:
+            await self._push_filler(acknowledgment)
+            return
+        self._pending_filler = self.create_task(
+            self._push_filler_unless_answered(acknowledgment, monitor.answers)
+        )
+
+    async def _push_filler_unless_answered(self, acknowledgment: str, answers: int) -> None:
+        await asyncio.sleep(self._filler_delay)
+        if self._response_monitor.answers == answers:
+            await self._push_filler(acknowledgment)
+
+    async def _cancel_pending_filler(self) -> None:
+        if self._pending_filler is not None:
+            if not self._pending_filler.done():
+                await self.cancel_task(self._pending_filler)
+            self._pending_filler = None
+
+    async def _push_filler(self, acknowledgment: str) -> None:
+        self._last_filler_time = time.time()
+        # Pre-rendered audio skips the TTS service
+        audio = self._audio_cache.get(acknowledgment)
+        if audio is not None:
+            await self.push_frame(TTSStartedFrame())
+            await self.push_frame(
+                TTSAudioRawFrame(
+                    audio=audio, sample_rate=self._audio_cache.sample_rate, num_channels=1
+                )
             )
-        ):
-            return ""
+            await self.push_frame(TTSStoppedFrame())
         else:
-            # return random.choice([
-            #     "Wait a sec.",
-            #     "Hold on.",
-            #     "Hang on a sec.",
-            #     "One moment.",
-            #     "Give me a second.",
-            # ])
-
-            return ""
+            await self.push_frame(TTSSpeakFrame(acknowledgment))
+
+    def _get_contextual_acknowledgment(self, text: str) -> str:
+        """Generate context-aware acknowledgment based on user input."""
+        # Context-aware acknowledgments, small talk and unknown requests get none
+        intent = match_intent(text).intent
+        if intent is not None:
+            return random.choice(FILLER_PHRASES[intent])
+        # return random.choice([
+        #     "Wait a sec.",
+        #     "Hold on.",
+        #     "Hang on a sec.",
+        #     "One moment.",
+        #     "Give me a second.",
+        # ])
+        return ""
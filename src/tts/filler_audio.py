@@ -0,0 +1,61 @@
+"""Filler phrases rendered to PCM once and served from memory."""
+
+import os
+import asyncio
+import logging
+
+from src.tts.pool import TTSServicePool, tts_pool
+
+logger = logging.getLogger(__name__)
+
+FILLER_AUDIO_CONCURRENCY = int(os.getenv("FILLER_AUDIO_CONCURRENCY", "4"))
+
+
+class FillerAudioCache:
+    """In-memory 16-bit mono PCM of the filler phrases.
+
+    `load()` synthesizes the phrases through the TTS pool, which serves them from the
+    synthesized speech cache. With its disk tier enabled (`TTS_CACHE_DIR`), no TTS request
+    is made after the first start.
+
+    Args:
+        sample_rate: Sample rate of the audio, must match the pipeline's output.
+    """
+
+    def __init__(self, sample_rate: int = 16000):
+        self.sample_rate = sample_rate
+        self._audio: dict[str, bytes] = {}
+
+    def get(self, text: str) -> bytes | None:
+        return self._audio.get(text)
+
+    async def load(self, phrases: list[str], pool: TTSServicePool = tts_pool) -> None:
+        """Render the phrases missing from memory."""
+        semaphore = asyncio.Semaphore(FILLER_AUDIO_CONCURRENCY)
+
+        async def load_phrase(text: str) -> None:
+            if text in self._audio:
+                return
+            async with semaphore:
+                audio = await self._synthesize(text, pool)
+            if not audio:
+                logger.warning(f"⚠️ No audio synthesized for filler: '{text}'")
+                return
+            self._audio[text] = audio
+
+        unique = list(dict.fromkeys(phrases))
+        results = await asyncio.gather(
+            *(load_phrase(text) for text in unique), return_exceptions=True
+        )
+        for text, result in zip(unique, results, strict=True):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Failed to prepare filler '{text}': {result}")
+        logger.info(f"🗣️ {len(self._audio)} filler phrases ready")
+
+    async def _synthesize(self, text: str, pool: TTSServicePool) -> bytes:
+        return b"".join([
+            frame.audio async for frame in pool.run_tts(text, stream="filler_warmup")
+        ])
+
+
+filler_audio_cache = FillerAudioCache()
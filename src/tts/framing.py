@@ -0,0 +1,245 @@
+"""Binary framing of the /tts output, with optional float32, μ-law or Opus audio payloads.
+
+Every WebSocket binary message is one frame: a 16-byte big-endian header followed by the
+payload.
+
+    offset  size  field
+    0       1     version, currently 1
+    1       1     frame type, 0 audio, 1 control (UTF-8 JSON)
+    2       1     flags, bit 0 marks the last frame of a segment
+    3       1     payload encoding, 0 pcm16 (little-endian), 1 μ-law, 2 Opus,
+                  3 float32 (little-endian)
+    4       4     segment id, counts the text segments of the connection from 1
+    8       4     sequence number within the segment, from 0
+    12      4     sample rate in Hz
+
+A segment's audio frames are followed by one control frame, e.g. `chunk_complete`, with
+the end-of-segment flag set. Control frames that belong to no segment have segment id 0.
+"""
+
+from enum import IntEnum, StrEnum
+import json
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.tts.resample import pcm16_to_float32
+
+try:
+    import opuslib
+except Exception:
+    # opuslib raises a plain Exception when the libopus shared library is missing
+    opuslib = None
+
+PROTOCOL_VERSION = 1
+HEADER = struct.Struct("!BBBBIII")
+FLAG_END_OF_SEGMENT = 0x01
+# Opus only accepts fixed frame sizes, 20 ms is the usual choice for speech
+OPUS_FRAME_SECONDS = 0.02
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+class FrameType(IntEnum):
+    AUDIO = 0
+    CONTROL = 1
+
+
+class AudioEncoding(StrEnum):
+    PCM16 = "pcm16"
+    MULAW = "mulaw"
+    OPUS = "opus"
+    FLOAT32 = "f32"
+
+
+_ENCODING_IDS = {
+    AudioEncoding.PCM16: 0,
+    AudioEncoding.MULAW: 1,
+    AudioEncoding.OPUS: 2,
+    AudioEncoding.FLOAT32: 3,
+}
+_ENCODINGS = {value: key for key, value in _ENCODING_IDS.items()}
+
+
+@dataclass
+class FrameHeader:
+    frame_type: FrameType
+    encoding: AudioEncoding
+    segment_id: int
+    seq: int
+    sample_rate: int
+    end_of_segment: bool
+
+
+def pack_frame(header: FrameHeader, payload: bytes) -> bytes:
+    flags = FLAG_END_OF_SEGMENT if header.end_of_segment else 0
+    return (
+        HEADER.pack(
+            PROTOCOL_VERSION,
+            header.frame_type,
+            flags,
+            _ENCODING_IDS[header.encoding],
+            header.segment_id,
+            header.seq,
+            header.sample_rate,
+        )
+        + payload
+    )
+
+
+def unpack_frame(data: bytes) -> tuple[FrameHeader, bytes]:
+    """Split a frame into its header and payload, the inverse of `pack_frame`."""
+    version, frame_type, flags, encoding, segment_id, seq, sample_rate = HEADER.unpack_from(data)
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported frame version {version}")
+    header = FrameHeader(
+        frame_type=FrameType(frame_type),
+        encoding=_ENCODINGS[encoding],
+        segment_id=segment_id,
+        seq=seq,
+        sample_rate=sample_rate,
+        end_of_segment=bool(flags & FLAG_END_OF_SEGMENT),
+    )
+    return header, data[HEADER.size :]
+
+
+# G.711 μ-law as in the CCITT reference coder, on 14-bit magnitudes
+_MULAW_BIAS = 0x21
+_MULAW_CLIP = 8159
+
+
+def mulaw_encode(pcm: bytes) -> bytes:
+    """Encode 16-bit little-endian PCM as 8-bit G.711 μ-law, halving its size."""
+    samples = np.frombuffer(pcm, dtype="<i2").astype(np.int32) >> 2
+    negative = samples < 0
+    magnitude = np.minimum(np.where(negative, -samples, samples), _MULAW_CLIP) + _MULAW_BIAS
+    # frexp returns the bit length of the magnitude as exponent
+    _, bit_length = np.frexp(magnitude)
+    segment = np.maximum(bit_length - 6, 0)
+    code = (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F)
+    code = np.where(segment > 7, 0x7F, code)
+    return (code ^ np.where(negative, 0x7F, 0xFF)).astype(np.uint8).tobytes()
+
+
+def _mulaw_decode_table() -> np.ndarray:
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (codes >> 4) & 0x07
+    magnitude = ((((codes & 0x0F) << 3) + 0x84) << exponent) - 0x84
+    return np.where(codes & 0x80, -magnitude, magnitude).astype("<i2")
+
+
+_MULAW_DECODE = _mulaw_decode_table()
+
+
+def mulaw_decode(data: bytes) -> bytes:
+    """Decode G.711 μ-law back to 16-bit little-endian PCM."""
+    return _MULAW_DECODE[np.frombuffer(data, dtype=np.uint8)].tobytes()
+
+
+class _OpusEncoder:
+    """Buffers PCM into whole 20 ms Opus frames, the last one padded with silence."""
+
+    def __init__(self, sample_rate: int):
+        if opuslib is None:
+            raise ValueError("Opus encoding requires the opuslib package")
+        if sample_rate not in OPUS_SAMPLE_RATES:
+            raise ValueError(f"Opus does not support a sample rate of {sample_rate} Hz")
+        self._encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_VOIP)
+        self._frame_samples = int(sample_rate * OPUS_FRAME_SECONDS)
+        self._frame_bytes = self._frame_samples * 2
+        self._pending = b""
+
+    def encode(self, pcm: bytes) -> list[bytes]:
+        self._pending += pcm
+        count = len(self._pending) // self._frame_bytes
+        packets = [
+            self._encoder.encode(
+                self._pending[i * self._frame_bytes : (i + 1) * self._frame_bytes],
+                self._frame_samples,
+            )
+            for i in range(count)
+        ]
+        self._pending = self._pending[count * self._frame_bytes :]
+        return packets
+
+    def reset(self) -> None:
+        self._pending = b""
+
+    def flush(self) -> list[bytes]:
+        if not self._pending:
+            return []
+        return self.encode(b"\x00" * (self._frame_bytes - len(self._pending)))
+
+
+class BinaryFramer:
+    """Builds the binary frames of one connection.
+
+    Segments are framed one after another, so the sequence number restarts whenever the
+    segment id changes.
+
+    Args:
+        encoding: Payload encoding of the audio frames.
+        sample_rate: Sample rate of the PCM passed to `audio()`.
+
+    Raises:
+        ValueError: Opus was requested but opuslib is not installed or the sample rate is
+            not one Opus supports.
+    """
+
+    def __init__(self, encoding: AudioEncoding, sample_rate: int):
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self._opus = _OpusEncoder(sample_rate) if encoding == AudioEncoding.OPUS else None
+        self._segment_id = 0
+        self._seq = 0
+
+    def _switch(self, segment_id: int) -> None:
+        if segment_id == self._segment_id:
+            return
+        self._segment_id = segment_id
+        self._seq = 0
+        if self._opus is not None:
+            # Audio left over from a segment that was cut off by a reset
+            self._opus.reset()
+
+    def _frame(
+        self, frame_type: FrameType, segment_id: int, payload: bytes, end: bool = False
+    ) -> bytes:
+        self._switch(segment_id)
+        self._seq += 1
+        header = FrameHeader(
+            frame_type=frame_type,
+            encoding=self.encoding,
+            segment_id=segment_id,
+            seq=self._seq - 1,
+            sample_rate=self.sample_rate,
+            end_of_segment=end,
+        )
+        return pack_frame(header, payload)
+
+    def audio(self, segment_id: int, pcm: bytes) -> list[bytes]:
+        """Frames of a chunk of 16-bit mono PCM, none while Opus waits for a full frame."""
+        self._switch(segment_id)
+        if self.encoding == AudioEncoding.MULAW:
+            payloads = [mulaw_encode(pcm)]
+        elif self.encoding == AudioEncoding.FLOAT32:
+            payloads = [pcm16_to_float32(pcm)]
+        elif self._opus is not None:
+            payloads = self._opus.encode(pcm)
+        else:
+            payloads = [pcm]
+        return [self._frame(FrameType.AUDIO, segment_id, payload) for payload in payloads]
+
+    def end(self, segment_id: int, message: dict) -> list[bytes]:
+        """Remaining audio of the segment and the control frame that ends it."""
+        frames = []
+        if self._opus is not None:
+            frames = [
+                self._frame(FrameType.AUDIO, segment_id, payload) for payload in self._opus.flush()
+            ]
+        frames.append(self.control(message, segment_id, end=True))
+        return frames
+
+    def control(self, message: dict, segment_id: int = 0, end: bool = False) -> bytes:
+        payload = json.dumps(message).encode("utf-8")
+        return self._frame(FrameType.CONTROL, segment_id, payload, end=end)
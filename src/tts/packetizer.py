@@ -0,0 +1,134 @@
+"""Re-chunking of synthesized PCM into fixed-duration packets."""
+
+import os
+
+from pipecat.frames.frames import (
+    Frame,
+    EndFrame,
+    CancelFrame,
+    TTSStoppedFrame,
+    OutputAudioRawFrame,
+    StartInterruptionFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+AUDIO_PACKET_MS = int(os.getenv("AUDIO_PACKET_MS", "40"))
+
+
+class AudioPacketizer:
+    """Cuts 16-bit PCM of any chunk size into packets of exactly `packet_ms`.
+
+    Riva returns chunks of very different sizes, and each one sent on its own costs a
+    message and a header. Whole packets are sliced straight out of the incoming chunk
+    through a memoryview, only the remainder is copied into a preallocated buffer until
+    the next chunk completes it.
+
+    Args:
+        sample_rate: Sample rate of the PCM.
+        num_channels: Interleaved channels of the PCM.
+        packet_ms: Duration of a packet, e.g. 20, 40 or 100.
+    """
+
+    def __init__(
+        self, sample_rate: int = 16000, num_channels: int = 1, packet_ms: int = AUDIO_PACKET_MS
+    ):
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self.packet_bytes = sample_rate * num_channels * 2 * packet_ms // 1000
+        self._buffer = bytearray(self.packet_bytes)
+        self._filled = 0
+
+    def push(self, audio: bytes) -> list[bytes]:
+        """Packets completed by this chunk, the rest waits for more audio or `flush()`."""
+        view = memoryview(audio)
+        packets = []
+        if self._filled:
+            take = min(len(view), self.packet_bytes - self._filled)
+            self._buffer[self._filled : self._filled + take] = view[:take]
+            self._filled += take
+            view = view[take:]
+            if self._filled < self.packet_bytes:
+                return packets
+            packets.append(bytes(self._buffer))
+            self._filled = 0
+
+        whole = len(view) - len(view) % self.packet_bytes
+        packets.extend(
+            bytes(view[start : start + self.packet_bytes])
+            for start in range(0, whole, self.packet_bytes)
+        )
+        rest = len(view) - whole
+        self._buffer[:rest] = view[whole:]
+        self._filled = rest
+        return packets
+
+    def flush(self) -> bytes | None:
+        """The last, shorter packet, at the end of a segment."""
+        if not self._filled:
+            return None
+        packet = bytes(self._buffer[: self._filled])
+        self._filled = 0
+        return packet
+
+    def reset(self) -> None:
+        """Drop the buffered audio, e.g. after an interruption."""
+        self._filled = 0
+
+
+class AudioPacketizerProcessor(FrameProcessor):
+    """Placed before the output transport, sends the TTS audio in fixed-duration packets.
+
+    Audio is flushed when the TTS finishes an utterance or the pipeline ends, and dropped
+    on an interruption along with the rest of the bot's speech. Other frames pass through
+    right away.
+
+    Args:
+        packet_ms: Duration of a packet.
+    """
+
+    def __init__(self, packet_ms: int = AUDIO_PACKET_MS, **kwargs):
+        super().__init__(**kwargs)
+        self._packet_ms = packet_ms
+        self._packetizer: AudioPacketizer | None = None
+        self._frame_type: type[OutputAudioRawFrame] = OutputAudioRawFrame
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection) -> None:
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, OutputAudioRawFrame) and direction == FrameDirection.DOWNSTREAM:
+            await self._push_audio(frame)
+            return
+        if isinstance(frame, StartInterruptionFrame | CancelFrame):
+            if self._packetizer is not None:
+                self._packetizer.reset()
+        elif isinstance(frame, TTSStoppedFrame | EndFrame):
+            await self._flush()
+        await self.push_frame(frame, direction)
+
+    async def _push_audio(self, frame: OutputAudioRawFrame) -> None:
+        packetizer = self._packetizer
+        if (
+            packetizer is None
+            or packetizer.sample_rate != frame.sample_rate
+            or packetizer.num_channels != frame.num_channels
+        ):
+            await self._flush()
+            packetizer = self._packetizer = AudioPacketizer(
+                frame.sample_rate, frame.num_channels, self._packet_ms
+            )
+        self._frame_type = type(frame)
+        for packet in packetizer.push(frame.audio):
+            await self._push_packet(packet)
+
+    async def _flush(self) -> None:
+        if self._packetizer is not None and (packet := self._packetizer.flush()) is not None:
+            await self._push_packet(packet)
+
+    async def _push_packet(self, packet: bytes) -> None:
+        await self.push_frame(
+            self._frame_type(
+                audio=packet,
+                sample_rate=self._packetizer.sample_rate,
+                num_channels=self._packetizer.num_channels,
+            )
+        )
@@ -0,0 +1,263 @@
+"""Process-wide pool of Riva TTS clients shared by the standalone TTS endpoints."""
+
+import os
+import asyncio
+import logging
+import contextlib
+from dataclasses import dataclass
+from collections.abc import Callable, AsyncIterator
+
+from pipecat.frames.frames import Frame
+from nvidia_pipecat.services.riva_speech import RivaTTSService, TTSAudioRawFrame
+
+from src.tts.cache import TTSAudioCache, CachedRivaTTSService, tts_audio_cache
+from src.speech.admission import tts_admission
+
+logger = logging.getLogger(__name__)
+
+TTS_POOL_SIZE = int(os.getenv("TTS_POOL_SIZE", "2"))
+TTS_POOL_MAX_STREAMS = int(os.getenv("TTS_POOL_MAX_STREAMS", "8"))
+TTS_POOL_ACQUIRE_TIMEOUT = float(os.getenv("TTS_POOL_ACQUIRE_TIMEOUT", "5.0"))
+TTS_POOL_HEALTH_INTERVAL = float(os.getenv("TTS_POOL_HEALTH_INTERVAL", "30.0"))
+# Consecutive failed synthesize calls before a client is replaced
+TTS_POOL_MAX_FAILURES = 3
+RIVA_TTS_VOICE_ID = os.getenv("RIVA_TTS_VOICE_ID", "English-US.Female-1")
+RIVA_TTS_CLOUD_SERVER = "grpc.nvcf.nvidia.com:443"
+
+
+def riva_tts_voice() -> str:
+    """Voice of the services `create_riva_tts_service` creates, as the audio cache keys it.
+
+    The server is part of the voice, the local and the cloud deployment may render the
+    same voice id differently.
+    """
+    if os.getenv("NVIDIA_API_KEY", "local") == "local":
+        return f"{RIVA_TTS_VOICE_ID}@{os.getenv('RIVA_TTS_SERVER')}"
+    return f"{RIVA_TTS_VOICE_ID}@{RIVA_TTS_CLOUD_SERVER}"
+
+
+def create_riva_tts_service(
+    sample_rate: int = 16000, cache: TTSAudioCache | None = None, stream: str | None = None
+) -> RivaTTSService:
+    """Create the local or cloud Riva TTS service, depending on the API key.
+
+    Args:
+        sample_rate: Sample rate of the synthesized audio.
+        cache: Serve repeated texts from this audio cache.
+        stream: Stream whose synthesize calls go through the TTS admission control.
+    """
+    service_class = RivaTTSService
+    kwargs = {}
+    if cache is not None:
+        service_class = CachedRivaTTSService
+        kwargs["cache"] = cache
+        kwargs["stream"] = stream
+    nvidia_api_key = os.getenv("NVIDIA_API_KEY", "local")
+    if nvidia_api_key == "local":
+        return service_class(
+            server=os.getenv("RIVA_TTS_SERVER"),
+            api_key=nvidia_api_key,
+            voice_id=RIVA_TTS_VOICE_ID,
+            language="en-US",
+            sample_rate=sample_rate,
+            **kwargs,
+        )
+    return service_class(
+        server=RIVA_TTS_CLOUD_SERVER,
+        api_key=nvidia_api_key,
+        voice_id=RIVA_TTS_VOICE_ID,
+        language="en-US",
+        sample_rate=sample_rate,
+        metadata=[
+            ("function-id", "0149dedb-2be8-4195-b9a0-e57e0e14f972"),
+            ("authorization", f"Bearer {nvidia_api_key}"),
+        ],
+        **kwargs,
+    )
+
+
+class TTSPoolTimeoutError(TimeoutError):
+    """No pooled TTS client had a free stream within the acquire timeout."""
+
+
+@dataclass
+class _PooledClient:
+    service: RivaTTSService
+    in_flight: int = 0
+    failures: int = 0
+    healthy: bool = True
+
+
+class TTSServicePool:
+    """A fixed number of Riva TTS clients, each multiplexing concurrent synthesize calls.
+
+    gRPC runs many calls over one channel, so every client serves up to `max_streams`
+    concurrent synthesize calls and requests go to the least busy healthy client.
+    Clients are created and probed by `start()`, so the channel setup happens before the
+    first request. A background task probes the clients every `health_interval`
+    seconds and replaces the ones that failed the probe or `TTS_POOL_MAX_FAILURES`
+    consecutive calls. Memory is bounded by `size`, whatever the number of connections.
+
+    Args:
+        size: Number of clients.
+        max_streams: Concurrent synthesize calls per client.
+        acquire_timeout: Seconds to wait for a free stream before `TTSPoolTimeoutError`.
+        health_interval: Seconds between health probes.
+        factory: Creates a client.
+        cache: Audio cache checked before a client is borrowed, None to disable.
+        sample_rate: Sample rate of the clients, part of the cache key.
+        voice: Voice of the clients, part of the cache key.
+    """
+
+    def __init__(
+        self,
+        size: int = TTS_POOL_SIZE,
+        max_streams: int = TTS_POOL_MAX_STREAMS,
+        acquire_timeout: float = TTS_POOL_ACQUIRE_TIMEOUT,
+        health_interval: float = TTS_POOL_HEALTH_INTERVAL,
+        factory: Callable[[], RivaTTSService] = create_riva_tts_service,
+        cache: TTSAudioCache | None = tts_audio_cache,
+        sample_rate: int = 16000,
+        voice: str | None = None,
+    ):
+        self.size = size
+        self.max_streams = max_streams
+        self.acquire_timeout = acquire_timeout
+        self.health_interval = health_interval
+        self.factory = factory
+        self.cache = cache
+        self.sample_rate = sample_rate
+        self.voice = riva_tts_voice() if voice is None else voice
+        self._clients: list[_PooledClient] = []
+        self._released: asyncio.Condition | None = None
+        self._health_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Create and probe the clients, then start the health checks."""
+        if self._released is not None:
+            return
+        self._released = asyncio.Condition()
+        self._clients = [_PooledClient(self.factory()) for _ in range(self.size)]
+        await asyncio.gather(*(self._probe(client) for client in self._clients))
+        self._health_task = asyncio.create_task(self._health_loop())
+        healthy = sum(client.healthy for client in self._clients)
+        logger.info(f"🔊 TTS pool ready with {healthy}/{self.size} healthy clients")
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+        self._clients = []
+        self._released = None
+
+    def _pick(self) -> _PooledClient | None:
+        candidates = [
+            client
+            for client in self._clients
+            if client.healthy and client.in_flight < self.max_streams
+        ]
+        if not candidates:
+            # Better a suspect client than none at all
+            candidates = [c for c in self._clients if c.in_flight < self.max_streams]
+        return min(candidates, key=lambda client: client.in_flight, default=None)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> AsyncIterator[RivaTTSService]:
+        """Borrow the least busy client for one synthesize call."""
+        if self._released is None:
+            await self.start()
+        released = self._released
+        async with released:
+            try:
+                await asyncio.wait_for(
+                    released.wait_for(lambda: self._pick() is not None), self.acquire_timeout
+                )
+            except TimeoutError as e:
+                raise TTSPoolTimeoutError(
+                    f"No TTS stream free within {self.acquire_timeout}s"
+                ) from e
+            client = self._pick()
+            client.in_flight += 1
+        try:
+            yield client.service
+        except Exception:
+            client.failures += 1
+            if client.failures >= TTS_POOL_MAX_FAILURES:
+                client.healthy = False
+            raise
+        else:
+            client.failures = 0
+        finally:
+            client.in_flight -= 1
+            async with released:
+                released.notify()
+
+    async def run_tts(
+        self, text: str, stream: str = "tts_pool", deadline: float | None = None
+    ) -> AsyncIterator[TTSAudioRawFrame]:
+        """Synthesize the text on a pooled client, yielding its audio frames.
+
+        Cache hits are served without borrowing a client. Synthesis waits for a slot of
+        the TTS admission control, queued fairly with the other requests of `stream`, for
+        at most `deadline` seconds or the admission control's default.
+
+        Raises:
+            AdmissionDeadlineError: Riva TTS stayed at capacity past the queue deadline.
+        """
+
+        async def synthesize(text: str) -> AsyncIterator[Frame]:
+            async with tts_admission.admit(stream, deadline), self.acquire() as service:
+                async for frame in service.run_tts(text=text):
+                    yield frame
+
+        if self.cache is None:
+            frames = synthesize(text)
+        else:
+            frames = self.cache.run_tts(
+                text, synthesize, sample_rate=self.sample_rate, voice=self.voice
+            )
+        async for frame in frames:
+            if isinstance(frame, TTSAudioRawFrame):
+                yield frame
+
+    async def _probe(self, client: _PooledClient) -> None:
+        audio_bytes = 0
+        try:
+            async with asyncio.timeout(self.acquire_timeout):
+                async for frame in client.service.run_tts(text="OK."):
+                    if isinstance(frame, TTSAudioRawFrame):
+                        audio_bytes += len(frame.audio)
+            # Riva reports some failures as an ErrorFrame instead of raising
+            if not audio_bytes:
+                raise RuntimeError("the probe synthesized no audio")
+        except Exception as e:
+            logger.warning(f"⚠️ TTS client failed its health probe: {e}")
+            client.healthy = False
+        else:
+            client.healthy = True
+            client.failures = 0
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for index, client in enumerate(self._clients):
+                if not client.healthy and client.in_flight == 0:
+                    # Replace the client, its channel may be broken for good
+                    client = self._clients[index] = _PooledClient(self.factory())
+                if client.in_flight == 0:
+                    await self._probe(client)
+            async with self._released:
+                self._released.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._clients),
+            "healthy": sum(client.healthy for client in self._clients),
+            "in_flight": sum(client.in_flight for client in self._clients),
+            "max_streams": self.max_streams,
+        }
+
+
+tts_pool = TTSServicePool()
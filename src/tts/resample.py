@@ -0,0 +1,103 @@
+"""Streaming polyphase resampling and sample format conversion of 16-bit PCM."""
+
+from enum import StrEnum
+import math
+import functools
+
+import numpy as np
+
+# Filter taps per polyphase branch, more taps give a steeper anti-aliasing filter
+RESAMPLER_TAPS_PER_PHASE = 16
+# Kaiser window shape, about 80 dB stopband attenuation
+RESAMPLER_KAISER_BETA = 8.0
+
+
+class SampleFormat(StrEnum):
+    INT16 = "int16"
+    FLOAT32 = "float32"
+
+
+@functools.lru_cache(maxsize=32)
+def _design_filter(up: int, down: int, taps_per_phase: int) -> np.ndarray:
+    """Low-pass prototype at the upsampled rate, as `up` polyphase branches."""
+    length = up * taps_per_phase
+    # Cut off at the lower of the two Nyquist frequencies, in cycles per upsampled sample
+    cutoff = 0.5 / max(up, down)
+    n = np.arange(length) - (length - 1) / 2
+    prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, RESAMPLER_KAISER_BETA)
+    # Zero stuffing divides the signal by `up`, the filter restores the level
+    prototype *= up / prototype.sum()
+    # Branch p holds the taps p, p + up, p + 2 * up, ..., shared by all resamplers
+    branches = prototype.reshape(taps_per_phase, up).T.copy()
+    branches.setflags(write=False)
+    return branches
+
+
+class PolyphaseResampler:
+    """Resamples a stream of 16-bit mono PCM from `input_rate` to `output_rate`.
+
+    The rate ratio is reduced to `up / down`, and every output sample is a dot product of
+    the last `taps_per_phase` input samples with one branch of a polyphase filter, all
+    output samples of a chunk at once. The input history and the output position carry
+    over from chunk to chunk, so a stream resampled in chunks is identical to the same
+    stream resampled in one piece, without clicks at the chunk boundaries.
+
+    Args:
+        input_rate: Sample rate of the incoming PCM.
+        output_rate: Sample rate of the returned PCM.
+        taps_per_phase: Filter length per polyphase branch.
+    """
+
+    def __init__(
+        self, input_rate: int, output_rate: int, taps_per_phase: int = RESAMPLER_TAPS_PER_PHASE
+    ):
+        divisor = math.gcd(input_rate, output_rate)
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+        self.taps = taps_per_phase
+        self._branches = _design_filter(self.up, self.down, taps_per_phase)
+        self._offsets = np.arange(self.taps)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the stream so far, e.g. when its audio is discarded."""
+        self._history = np.zeros(self.taps - 1, dtype=np.float64)
+        # Input samples consumed before the current chunk, and the next output sample
+        self._consumed = 0
+        self._next_output = 0
+
+    def process(self, pcm: bytes) -> bytes:
+        """Resample a chunk, returning every output sample its input completes."""
+        if self.up == self.down:
+            return pcm
+        samples = np.frombuffer(pcm, dtype="<i2").astype(np.float64)
+        if not len(samples):
+            return b""
+        extended = np.concatenate((self._history, samples))
+
+        # Output j sits at input position j * down / up, it needs the input up to there
+        available = self._consumed + len(samples)
+        last_output = (available * self.up - 1) // self.down
+        outputs = np.arange(self._next_output, last_output + 1, dtype=np.int64)
+        positions = outputs * self.down
+        newest = positions // self.up - self._consumed + self.taps - 1
+        # Row j holds the input samples newest, newest - 1, ... of output j
+        windows = extended[newest[:, None] - self._offsets[None, :]]
+        resampled = np.einsum("ij,ij->i", windows, self._branches[positions % self.up])
+
+        self._history = extended[len(extended) - (self.taps - 1) :]
+        self._consumed = available
+        self._next_output = last_output + 1
+        # Keep the counters small, they only matter relative to each other
+        if self._consumed >= self.down:
+            blocks = self._consumed // self.down
+            self._consumed -= blocks * self.down
+            self._next_output -= blocks * self.up
+        return np.clip(np.rint(resampled), -32768, 32767).astype("<i2").tobytes()
+
+
+def pcm16_to_float32(pcm: bytes) -> bytes:
+    """16-bit PCM to little-endian float32 in [-1, 1), the format Web Audio plays."""
+    return (np.frombuffer(pcm, dtype="<i2") / np.float32(32768)).astype("<f4").tobytes()
@@ -0,0 +1,127 @@
+"""Incremental segmentation of streamed LLM text into speakable chunks."""
+
+import os
+import re
+from dataclasses import dataclass
+
+TTS_SEGMENT_MIN_CLAUSE_CHARS = int(os.getenv("TTS_SEGMENT_MIN_CLAUSE_CHARS", "3"))
+TTS_SEGMENT_MAX_CHARS = int(os.getenv("TTS_SEGMENT_MAX_CHARS", "6"))
+
+
+@dataclass(frozen=True)
+class SegmentRules:
+    """When `TextSegmenter` cuts the pending text, checked in this order.
+
+    Attributes:
+        sentence_endings: Cut right after the first of these characters.
+        clause_breaks: Cut after the first of these characters that ends a clause of at
+            least `min_clause_chars` characters.
+        min_clause_chars: Shortest clause worth its own segment.
+        max_chars: Cut all pending text once it is this long, 0 to wait for punctuation.
+    """
+
+    sentence_endings: frozenset[str] = frozenset(".!?。！？")
+    clause_breaks: frozenset[str] = frozenset(",;，；\n")
+    min_clause_chars: int = TTS_SEGMENT_MIN_CLAUSE_CHARS
+    max_chars: int = TTS_SEGMENT_MAX_CHARS
+
+
+def _char_class(chars: frozenset[str]) -> re.Pattern | None:
+    if not chars:
+        return None
+    return re.compile(f"[{''.join(re.escape(char) for char in sorted(chars))}]")
+
+
+@dataclass
+class TextSegment:
+    """A chunk of text ready for synthesis.
+
+    Attributes:
+        text: The chunk without surrounding whitespace.
+        start: Offset of the chunk in the whole stream.
+        end: Offset right after the chunk in the whole stream.
+    """
+
+    text: str
+    start: int
+    end: int
+
+
+class TextSegmenter:
+    """Cuts streamed text into segments with work proportional to the new text only.
+
+    Only text that has not been emitted is kept, and scanning resumes where the last push
+    stopped, so every character is searched once whatever the length of the stream.
+
+    Args:
+        rules: Where to cut, see `SegmentRules`.
+    """
+
+    def __init__(self, rules: SegmentRules | None = None):
+        self.rules = rules or SegmentRules()
+        self._sentence_pattern = _char_class(self.rules.sentence_endings)
+        self._clause_pattern = _char_class(self.rules.clause_breaks)
+        self.reset()
+
+    @property
+    def pending(self) -> str:
+        """Text pushed but not emitted yet."""
+        return self._pending
+
+    def push(self, text: str) -> list[TextSegment]:
+        """Add streamed text and return the segments it completes."""
+        self._pending += text
+        self.total_chars += len(text)
+        segments = []
+        while (cut := self._find_cut()) is not None:
+            segment = self._emit(cut)
+            if segment is not None:
+                segments.append(segment)
+        return segments
+
+    def flush(self) -> TextSegment | None:
+        """Emit whatever text is pending, e.g. at the end of a response."""
+        return self._emit(len(self._pending)) if self._pending else None
+
+    def reset(self) -> None:
+        # Characters pushed and emitted since the last reset
+        self.total_chars = 0
+        self.processed_chars = 0
+        self._pending = ""
+        # Pending text before these offsets has no sentence ending or clause break
+        self._sentence_scan = 0
+        self._clause_scan = 0
+
+    def _find_cut(self) -> int | None:
+        pending = self._pending
+        if self._sentence_pattern is not None:
+            match = self._sentence_pattern.search(pending, self._sentence_scan)
+            if match is not None:
+                return match.end()
+            self._sentence_scan = len(pending)
+
+        if self._clause_pattern is not None:
+            start = max(self._clause_scan, self.rules.min_clause_chars)
+            match = self._clause_pattern.search(pending, start)
+            if match is not None:
+                return match.end()
+            self._clause_scan = len(pending)
+
+        if self.rules.max_chars and len(pending) >= self.rules.max_chars:
+            return len(pending)
+        return None
+
+    def _emit(self, cut: int) -> TextSegment | None:
+        raw = self._pending[:cut]
+        start = self.processed_chars
+        # Compact: emitted text is dropped and the scan offsets move along with it
+        self._pending = self._pending[cut:]
+        self._sentence_scan = max(self._sentence_scan - cut, 0)
+        self._clause_scan = max(self._clause_scan - cut, 0)
+        self.processed_chars += cut
+
+        text = raw.strip()
+        if not text:
+            return None
+        leading = len(raw) - len(raw.lstrip())
+        return TextSegment(text=text, start=start + leading, end=start + leading + len(text))
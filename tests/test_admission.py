@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from src.speech.admission import AdmissionController, AdmissionDeadlineError
+
+
+async def test_admits_up_to_the_limit():
+    controller = AdmissionController("test", limit=2)
+    await controller.acquire("a")
+    await controller.acquire("a")
+    assert controller.in_use == 2
+    waiter = asyncio.create_task(controller.acquire("a"))
+    await asyncio.sleep(0)
+    assert controller.queued == 1
+    controller.release()
+    await waiter
+    assert controller.in_use == 2
+    assert controller.queued == 0
+
+
+async def test_sheds_requests_past_the_deadline():
+    controller = AdmissionController("test", limit=1, deadline=0.01)
+    await controller.acquire("a")
+    with pytest.raises(AdmissionDeadlineError):
+        await controller.acquire("b")
+    assert controller.shed == 1
+    assert controller.queued == 0
+    controller.release()
+    assert controller.in_use == 0
+
+
+async def test_streams_take_turns():
+    controller = AdmissionController("test", limit=1)
+    await controller.acquire("busy")
+    order = []
+
+    async def request(stream: str, name: str) -> None:
+        async with controller.admit(stream):
+            order.append(name)
+
+    tasks = [
+        asyncio.create_task(request(stream, name))
+        for stream, name in [("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1")]
+    ]
+    await asyncio.sleep(0)
+    controller.release()
+    await asyncio.gather(*tasks)
+    assert order == ["a1", "b1", "a2", "a3"]
+
+
+async def test_cancelled_waiter_gives_up_its_place():
+    controller = AdmissionController("test", limit=1)
+    await controller.acquire("a")
+    waiter = asyncio.create_task(controller.acquire("b"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert controller.queued == 0
+    controller.release()
+    assert controller.in_use == 0
+    stats = controller.to_dict()
+    assert stats["admitted"] == 1
+    assert stats["limit"] == 1
+
+
+async def test_saturated_while_every_slot_is_held_or_requests_queue():
+    controller = AdmissionController("test", limit=1)
+    assert not controller.saturated
+    await controller.acquire("a")
+    assert controller.saturated
+    controller.release()
+    assert not controller.saturated
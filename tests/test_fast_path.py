@@ -0,0 +1,46 @@
+import pytest
+
+from src.llm.fast_path import parse_command, normalize_utterance
+
+
+@pytest.mark.parametrize(
+    ("text", "tool", "args"),
+    [
+        ("Set the fan speed to 3.", "set_fan_speed", {"fan_speed": 3}),
+        ("fan to five please", "set_fan_speed", {"fan_speed": 5}),
+        ("Hey, turn off the fan", "set_fan_speed", {"fan_speed": 0}),
+        ("Set the temperature to 22 degrees", "set_temp", {"temp": 22}),
+        ("temp twenty four", "set_temp", {"temp": 24}),
+        ("Set the A/C to 21°", "set_temp", {"temp": 21}),
+        ("Defrost on.", "front_windshield_defroster", {"status": True}),
+        (
+            "Turn off the front windshield defroster",
+            "front_windshield_defroster",
+            {"status": False},
+        ),
+    ],
+)
+def test_parse_command(text: str, tool: str, args: dict):
+    command = parse_command(text)
+    assert command is not None
+    assert command.tool == tool
+    assert command.args == args
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["Set the fan speed to 3 and the temperature to 22", "I'm cold", "What's the fan speed?", ""],
+)
+def test_parse_command_leaves_other_utterances_to_the_llm(text: str):
+    assert parse_command(text) is None
+
+
+@pytest.mark.parametrize("text", ["Set the fan speed to 3.5", "temperature 22,5 degrees"])
+def test_parse_command_leaves_decimals_to_the_llm(text: str):
+    assert parse_command(text) is None
+
+
+def test_normalize_utterance():
+    assert (
+        normalize_utterance("  Set the A/C to 21°,  please! ") == "set the ac to 21 degrees please"
+    )
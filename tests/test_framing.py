@@ -0,0 +1,71 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.tts.framing import (
+    HEADER,
+    FrameType,
+    FrameHeader,
+    BinaryFramer,
+    AudioEncoding,
+    pack_frame,
+    mulaw_decode,
+    mulaw_encode,
+    unpack_frame,
+)
+
+
+def test_pack_and_unpack_round_trip():
+    header = FrameHeader(
+        frame_type=FrameType.AUDIO,
+        encoding=AudioEncoding.MULAW,
+        segment_id=7,
+        seq=3,
+        sample_rate=8000,
+        end_of_segment=True,
+    )
+    frame = pack_frame(header, b"payload")
+    assert len(frame) == HEADER.size + len(b"payload")
+    assert unpack_frame(frame) == (header, b"payload")
+
+
+def test_unpack_rejects_other_versions():
+    frame = bytearray(
+        pack_frame(FrameHeader(FrameType.CONTROL, AudioEncoding.PCM16, 0, 0, 0, False), b"")
+    )
+    frame[0] = 2
+    with pytest.raises(ValueError, match="version"):
+        unpack_frame(bytes(frame))
+
+
+def test_mulaw_round_trip_is_close():
+    samples = np.linspace(-32768, 32767, 2000).astype("<i2")
+    encoded = mulaw_encode(samples.tobytes())
+    assert len(encoded) == len(samples)
+    decoded = np.frombuffer(mulaw_decode(encoded), dtype="<i2").astype(np.int32)
+    # μ-law keeps the relative error small, the quantization step grows with the level
+    error = np.abs(decoded - samples)
+    assert np.all(error <= np.maximum(np.abs(samples.astype(np.int32)) // 16, 8))
+
+
+def test_framer_sequences_segments():
+    framer = BinaryFramer(AudioEncoding.PCM16, sample_rate=16000)
+    frames = framer.audio(1, b"\x01\x00" * 4) + framer.audio(1, b"\x02\x00" * 4)
+    frames += framer.end(1, {"type": "chunk_complete"})
+    headers = [unpack_frame(frame)[0] for frame in frames]
+    assert [header.seq for header in headers] == [0, 1, 2]
+    assert [header.end_of_segment for header in headers] == [False, False, True]
+    header, payload = unpack_frame(frames[-1])
+    assert header.frame_type == FrameType.CONTROL
+    assert json.loads(payload) == {"type": "chunk_complete"}
+    # A new segment restarts the sequence numbers
+    assert unpack_frame(framer.audio(2, b"\x00\x00")[0])[0].seq == 0
+
+
+def test_framer_encodes_payloads():
+    pcm = np.array([0, 16384, -32768], dtype="<i2").tobytes()
+    mulaw = BinaryFramer(AudioEncoding.MULAW, sample_rate=8000).audio(1, pcm)
+    assert unpack_frame(mulaw[0])[1] == mulaw_encode(pcm)
+    pcm16 = BinaryFramer(AudioEncoding.PCM16, sample_rate=8000).audio(1, pcm)
+    assert unpack_frame(pcm16[0])[1] == pcm
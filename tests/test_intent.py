@@ -0,0 +1,40 @@
+from src.llm.intent import match_intent, detect_intents
+
+
+def test_no_keyword_matches_nothing():
+    match = match_intent("What's the weather like tomorrow?")
+    assert match.intent is None
+    assert match.intents == []
+    assert match.spans == []
+
+
+def test_single_keyword():
+    match = match_intent("I'm cold")
+    assert match.intent == "temperature"
+    assert match.spans == [("temperature", 4, 8)]
+
+
+def test_inflections_and_case():
+    assert match_intent("Turn on the FANS").intent == "fan"
+    assert match_intent("the windows are fogged").intent == "defrost"
+    assert match_intent("start heating").intent == "temperature"
+
+
+def test_whole_words_only():
+    # "ac" inside "back" and "air" inside "chair" are not keywords
+    assert match_intent("move my chair back").intent is None
+
+
+def test_priority_order_and_spans_in_text_order():
+    match = match_intent("fan up and make it warmer")
+    assert match.intent == "temperature"
+    assert match.intents == ["temperature", "fan"]
+    assert [intent for intent, _, _ in match.spans] == ["fan", "temperature"]
+
+
+def test_multi_word_keyword():
+    assert match_intent("switch on the air conditioning").intents == ["temperature"]
+
+
+def test_detect_intents():
+    assert detect_intents("navigate home and defrost the windshield") == ["defrost", "navigation"]
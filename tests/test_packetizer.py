@@ -0,0 +1,33 @@
+from src.tts.packetizer import AudioPacketizer
+
+
+def test_packets_have_a_fixed_size():
+    # 20 ms of 16 kHz 16-bit mono
+    packetizer = AudioPacketizer(sample_rate=16000, packet_ms=20)
+    assert packetizer.packet_bytes == 640
+    audio = bytes(range(256)) * 11
+    packets = []
+    for start in range(0, len(audio), 300):
+        packets += packetizer.push(audio[start : start + 300])
+    assert all(len(packet) == 640 for packet in packets)
+    rest = packetizer.flush()
+    assert b"".join(packets) + rest == audio
+    assert len(rest) == len(audio) % 640
+
+
+def test_chunk_spanning_several_packets():
+    packetizer = AudioPacketizer(sample_rate=16000, packet_ms=20)
+    assert packetizer.push(b"\x01" * 100) == []
+    packets = packetizer.push(b"\x02" * 1500)
+    assert [len(packet) for packet in packets] == [640, 640]
+    assert packets[0] == b"\x01" * 100 + b"\x02" * 540
+    assert packetizer.flush() == b"\x02" * 320
+
+
+def test_flush_and_reset():
+    packetizer = AudioPacketizer(sample_rate=8000, num_channels=2, packet_ms=10)
+    assert packetizer.packet_bytes == 320
+    assert packetizer.flush() is None
+    packetizer.push(b"\x00" * 100)
+    packetizer.reset()
+    assert packetizer.flush() is None
@@ -0,0 +1,46 @@
+import pytest
+
+from src.llm.tools.registry import compile_coercer
+
+SCHEMA = {
+    "type": "function",
+    "function": {
+        "name": "set_fan_speed",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "fan_speed": {"type": "integer"},
+                "status": {"type": "boolean"},
+                "mode": {"type": "string", "enum": ["auto", "manual"]},
+            },
+            "required": ["fan_speed"],
+        },
+    },
+}
+
+
+@pytest.mark.parametrize(("value", "expected"), [(3, 3), (3.0, 3), ("3", 3), (" 22.0", 22)])
+def test_integer_accepts_integral_values(value: object, expected: int):
+    assert compile_coercer(SCHEMA)({"fan_speed": value}) == {"fan_speed": expected}
+
+
+@pytest.mark.parametrize("value", [22.7, "22.7", "abc", "", True, False, None, [3]])
+def test_integer_rejects_other_values(value: object):
+    with pytest.raises(TypeError, match="fan_speed must be an integer"):
+        compile_coercer(SCHEMA)({"fan_speed": value})
+
+
+def test_boolean_accepts_strings():
+    coerce = compile_coercer(SCHEMA)
+    assert coerce({"fan_speed": 1, "status": "True"})["status"] is True
+    assert coerce({"fan_speed": 1, "status": "false"})["status"] is False
+    with pytest.raises(TypeError, match="status must be Boolean"):
+        coerce({"fan_speed": 1, "status": "yes"})
+
+
+def test_missing_and_enum_violations():
+    coerce = compile_coercer(SCHEMA)
+    with pytest.raises(ValueError, match="Missing required arguments: fan_speed"):
+        coerce({})
+    with pytest.raises(ValueError, match="mode must be one of"):
+        coerce({"fan_speed": 1, "mode": "turbo"})
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from src.tts.framing import BinaryFramer, AudioEncoding, unpack_frame
+from src.tts.resample import PolyphaseResampler, pcm16_to_float32
+
+
+def _tone(frequency: float, sample_rate: int, seconds: float) -> bytes:
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (np.sin(2 * np.pi * frequency * t) * 10000).astype("<i2").tobytes()
+
+
+@pytest.mark.parametrize(
+    ("input_rate", "output_rate"), [(16000, 48000), (16000, 22050), (22050, 8000)]
+)
+def test_output_length_follows_the_rate_ratio(input_rate: int, output_rate: int):
+    resampler = PolyphaseResampler(input_rate, output_rate)
+    output = resampler.process(_tone(440, input_rate, 1.0))
+    assert abs(len(output) // 2 - output_rate) <= 1
+
+
+def test_chunked_stream_equals_one_piece():
+    pcm = _tone(440, 16000, 0.5)
+    whole = PolyphaseResampler(16000, 44100).process(pcm)
+    resampler = PolyphaseResampler(16000, 44100)
+    chunks = [resampler.process(pcm[start : start + 322]) for start in range(0, len(pcm), 322)]
+    assert b"".join(chunks) == whole
+
+
+def test_keeps_the_level_of_a_tone():
+    output = PolyphaseResampler(16000, 48000).process(_tone(440, 16000, 0.5))
+    samples = np.frombuffer(output, dtype="<i2")[1000:]
+    assert np.abs(samples).max() == pytest.approx(10000, rel=0.05)
+
+
+def test_same_rate_passes_through_and_reset_forgets_the_stream():
+    pcm = _tone(440, 16000, 0.1)
+    assert PolyphaseResampler(16000, 16000).process(pcm) == pcm
+    resampler = PolyphaseResampler(16000, 24000)
+    first = resampler.process(pcm)
+    resampler.reset()
+    assert resampler.process(pcm) == first
+    assert resampler.process(b"") == b""
+
+
+def test_pcm16_to_float32():
+    pcm = np.array([0, 16384, -32768], dtype="<i2").tobytes()
+    assert np.frombuffer(pcm16_to_float32(pcm), dtype="<f4").tolist() == [0.0, 0.5, -1.0]
+
+
+def test_framer_sends_float32_samples():
+    pcm = np.array([0, 16384, -32768], dtype="<i2").tobytes()
+    frames = BinaryFramer(AudioEncoding.FLOAT32, sample_rate=48000).audio(1, pcm)
+    assert np.frombuffer(unpack_frame(frames[0])[1], dtype="<f4").tolist() == [0.0, 0.5, -1.0]
@@ -0,0 +1,52 @@
+from src.tts.segmenter import SegmentRules, TextSegmenter
+
+
+def test_cuts_after_sentence_endings():
+    segmenter = TextSegmenter(SegmentRules(max_chars=0))
+    assert segmenter.push("Hello") == []
+    segments = segmenter.push(" world! How are")
+    assert [segment.text for segment in segments] == ["Hello world!"]
+    assert segmenter.pending == " How are"
+    assert [segment.text for segment in segmenter.push(" you?")] == ["How are you?"]
+
+
+def test_offsets_cover_the_whole_stream():
+    segmenter = TextSegmenter(SegmentRules(max_chars=0))
+    text = "One. Two, three. Four"
+    segments = segmenter.push(text)
+    segments.append(segmenter.flush())
+    assert [text[segment.start : segment.end] for segment in segments] == [
+        segment.text for segment in segments
+    ]
+    assert segmenter.processed_chars == segmenter.total_chars == len(text)
+
+
+def test_clause_breaks_need_a_minimum_length():
+    segmenter = TextSegmenter(SegmentRules(min_clause_chars=5, max_chars=0))
+    assert segmenter.push("So, ") == []
+    assert [segment.text for segment in segmenter.push("then, next")] == ["So, then,"]
+
+
+def test_max_chars_cuts_without_punctuation():
+    segmenter = TextSegmenter(SegmentRules(max_chars=6))
+    assert [segment.text for segment in segmenter.push("abcdef")] == ["abcdef"]
+    assert segmenter.pending == ""
+
+
+def test_flush_and_reset():
+    segmenter = TextSegmenter(SegmentRules(max_chars=0))
+    segmenter.push("  unfinished ")
+    segment = segmenter.flush()
+    assert segment.text == "unfinished"
+    assert segmenter.flush() is None
+    segmenter.push("Left over")
+    segmenter.reset()
+    assert segmenter.pending == ""
+    assert segmenter.total_chars == 0
+    assert segmenter.flush() is None
+
+
+def test_whitespace_only_segments_are_skipped():
+    segmenter = TextSegmenter(SegmentRules(max_chars=0))
+    assert [segment.text for segment in segmenter.push("Hi. . !")] == ["Hi.", ".", "!"]
+    assert segmenter.push("   ") == []
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from src.llm.tools.cache import ToolResultCache, normalize_args
+
+
+def test_normalize_args():
+    assert normalize_args({"b": 1, "a": "  New   YORK "}) == normalize_args({
+        "a": "new york",
+        "b": 1,
+    })
+
+
+async def test_caches_results_until_they_expire():
+    cache = ToolResultCache(ttl=0.05)
+    calls = []
+
+    async def call() -> str:
+        calls.append(1)
+        return "sunny"
+
+    assert await cache.get_or_call({"city": "Taipei"}, call) == "sunny"
+    assert await cache.get_or_call({"city": " taipei"}, call) == "sunny"
+    assert len(calls) == 1
+    await asyncio.sleep(0.06)
+    await cache.get_or_call({"city": "Taipei"}, call)
+    assert len(calls) == 2
+    assert cache.to_dict()["hits"] == 1
+
+
+async def test_evicts_the_least_recently_used():
+    cache = ToolResultCache(ttl=60, maxsize=2)
+
+    async def call() -> int:
+        return 0
+
+    for city in ("a", "b", "a", "c"):
+        await cache.get_or_call({"city": city}, call)
+    assert cache.to_dict()["size"] == 2
+    assert cache.to_dict()["misses"] == 3
+
+
+async def test_concurrent_calls_share_one_run():
+    cache = ToolResultCache(ttl=60)
+    calls = []
+
+    async def call() -> str:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "rain"
+
+    results = await asyncio.gather(*(cache.get_or_call({"city": "x"}, call) for _ in range(3)))
+    assert results == ["rain"] * 3
+    assert len(calls) == 1
+
+
+async def test_cancelling_the_first_caller_leaves_the_others_running():
+    cache = ToolResultCache(ttl=60)
+
+    async def call() -> str:
+        await asyncio.sleep(0.01)
+        return "fog"
+
+    first = asyncio.create_task(cache.get_or_call({"city": "x"}, call))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(cache.get_or_call({"city": "x"}, call))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "fog"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_failures_are_not_cached():
+    cache = ToolResultCache(ttl=60)
+
+    async def call() -> str:
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_call({"city": "x"}, call)
+    assert cache.to_dict()["size"] == 0
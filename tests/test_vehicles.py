@@ -0,0 +1,48 @@
+import pytest
+
+from src.llm.vehicles import (
+    STREAM_VEHICLE_PREFIX,
+    VehicleTokenError,
+    sign_vehicle_id,
+    issue_vehicle_token,
+    verify_vehicle_token,
+)
+
+SECRET = "test-secret"  # noqa: S105
+
+
+def test_signed_token_round_trips():
+    token = sign_vehicle_id("car-42", SECRET)
+    assert verify_vehicle_token(token, SECRET) == "car-42"
+
+
+def test_issued_tokens_name_distinct_vehicles():
+    first = verify_vehicle_token(issue_vehicle_token(SECRET), SECRET)
+    second = verify_vehicle_token(issue_vehicle_token(SECRET), SECRET)
+    assert first != second
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "car-42",
+        "car-42.",
+        "car-43." + sign_vehicle_id("car-42", SECRET).rpartition(".")[2],
+        sign_vehicle_id("car-42", "other-secret"),
+    ],
+)
+def test_forged_tokens_are_rejected(token):
+    with pytest.raises(VehicleTokenError):
+        verify_vehicle_token(token, SECRET)
+
+
+def test_tokens_are_disabled_without_a_secret():
+    with pytest.raises(VehicleTokenError):
+        issue_vehicle_token("")
+    with pytest.raises(VehicleTokenError):
+        verify_vehicle_token(sign_vehicle_id("car-42", SECRET), "")
+
+
+def test_stream_scoped_ids_cannot_be_signed():
+    with pytest.raises(VehicleTokenError):
+        sign_vehicle_id(f"{STREAM_VEHICLE_PREFIX}abc", SECRET)